@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+龙析性能基准测试脚本
+
+用法:
+    python benchmark.py llm-client [--requests N] [--concurrency N] [--latency 秒]
+    python benchmark.py reports [--issues N]
+    python benchmark.py exclude [--names N] [--patterns N]
+    python benchmark.py walk [--path 目录] [--dirs N] [--files N] [--workers N]
+    python benchmark.py python-analyzer [--path 目录] [--files N] [--workers N]
+    python benchmark.py security-scan [--path 目录] [--files N]
+    python benchmark.py clones [--path 目录] [--files N] [--workers N]
+    python benchmark.py metrics [--path 目录] [--files N]
+    python benchmark.py server [--path 目录] [--jobs N] [--workers N] [--start-method spawn]
+    python benchmark.py jobs [--path 目录] [--workers N] [--cancel-after N]
+    python benchmark.py instrumentation [--path 目录] [--runs N] [--workers N]
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+from skill import CdanalyzerAgentSkill
+from src.analyzers import PylintRunner
+from src.clone_detector import CloneDetector, fingerprint_files
+from src.code_metrics import MetricsAggregator, compute_file_metrics
+from src.file_walker import ParallelWalker
+from src.issue_sink import IssueSink, SEVERITIES
+from src.languages import EXTENSION_LANGUAGES
+from src.line_counter import count_file_lines
+from src.path_matcher import ExcludeMatcher
+from src.instrumentation import NULL_INSTRUMENTATION
+from src.jobs import JobManager
+from src.server import AnalysisServer, AnalysisService
+from src.python_analyzer import analyze_python_file
+from src.security_scanner import RULES, scan_file
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """
+    模拟OpenAI兼容的 /chat/completions 接口
+    """
+    protocol_version = "HTTP/1.1"  # 支持keep-alive连接复用
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.received += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            rate_limited = server.received <= server.fail_first
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+        if rate_limited:
+            # 模拟提供商限流
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps({
+            "choices": [{"message": {"content": self._answer(request)}}]
+        }, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _answer(self, request: dict) -> str:
+        """
+        生成模拟回答：批量提示词返回JSON数组，其余返回固定建议
+        """
+        messages = request.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+        marker = "问题列表（JSON）：\n"
+        if marker not in prompt:
+            return "模拟的AI建议"
+        with self.server.lock:
+            self.server.batches += 1
+        if self.server.malformed_batches:
+            return "抱歉，无法按JSON格式回答"
+        items = json.loads(prompt.split(marker, 1)[1])
+        return "```json\n" + json.dumps(
+            [{"id": item["id"], "suggestion": "模拟的AI建议"} for item in items], ensure_ascii=False
+        ) + "\n```"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInLLMServer:
+    """
+    本地替身大模型服务，用于在无网络环境下测试和对比HTTP客户端性能
+    """
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, malformed_batches: bool = False):
+        """
+        Args:
+            latency: 每个请求的模拟响应延迟（秒）
+            fail_first: 前N个请求返回429限流响应
+            malformed_batches: 批量提示词是否返回无法解析的内容
+        """
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.fail_first = fail_first
+        self.server.malformed_batches = malformed_batches
+        self.server.batches = 0
+        self.server.lock = threading.Lock()
+        self.server.received = 0
+        self.server.active = 0
+        self.server.max_active = 0
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+async def _run_batches(call, total: int, concurrency: int) -> float:
+    """
+    以固定并发度发起total次调用，返回总耗时（秒）
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await call(f"prompt {i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - started
+
+
+async def bench_llm_client(total: int, concurrency: int, latency: float):
+    """
+    对比复用连接池的客户端与每次请求新建客户端的耗时
+    """
+    with StandInLLMServer(latency) as server:
+        skill = CdanalyzerAgentSkill()
+        skill.llm_configs["openai"] = {
+            "api_key": "benchmark", "base_url": server.base_url, "model": "stand-in", "top_p": 0.7
+        }
+        skill.llm_scheduler_config["max_in_flight"] = concurrency
+        pooled = await _run_batches(lambda prompt: skill._call_llm_api("openai", prompt), total, concurrency)
+        metrics = skill.get_llm_http_metrics()
+        await skill.close_http_client()
+
+        async def per_call(prompt):
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.post(f"{server.base_url}/chat/completions",
+                                             json={"model": "stand-in", "messages": [{"role": "user", "content": prompt}]})
+                response.raise_for_status()
+
+        fresh = await _run_batches(per_call, total, concurrency)
+
+    print(f"请求数: {total}，并发度: {concurrency}，服务端延迟: {latency * 1000:.1f}ms")
+    print(f"每次新建客户端: {fresh:.3f}s ({total / fresh:.1f} req/s)")
+    print(f"复用连接池:     {pooled:.3f}s ({total / pooled:.1f} req/s)，加速 {fresh / pooled:.2f}x")
+    print(f"连接池统计: {json.dumps(metrics, ensure_ascii=False)}")
+
+
+def build_synthetic_results(spool_dir: str, issue_count: int, file_count: int = 1000) -> dict:
+    """
+    构造包含issue_count个模拟问题的分析结果，用于报告生成相关的基准测试
+    """
+    rng = random.Random(0)
+    sink = IssueSink(spool_dir)
+    for i in range(issue_count):
+        sink.add({
+            "file": f"src/module_{i % file_count}.py",
+            "line": rng.randint(1, 2000),
+            "severity": rng.choice(SEVERITIES),
+            "type": rng.choice(["syntax_error", "code_style", "performance_issue", "security_vulnerability"]),
+            "message": f"模拟问题描述 {i}",
+            "solution": "参考编码规范修正",
+            "ai_suggestion": "无"
+        })
+    sink.close()
+    return {
+        "files_analyzed": [f"src/module_{i}.py" for i in range(file_count)],
+        "issues_found": sink,
+        "language_stats": {"python": {"files": file_count, "lines": file_count * 200,
+                                      "code": file_count * 150, "comment": file_count * 30, "blank": file_count * 20}},
+        "risk_counts": dict(sink.risk_counts),
+        "total_lines": file_count * 200
+    }
+
+
+async def bench_reports(issue_count: int):
+    """
+    对比三种报告格式依次生成与并行生成的耗时
+    """
+    skill = CdanalyzerAgentSkill()
+    skill.use_llm_config = 1
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = build_synthetic_results(temp_dir, issue_count)
+        formats = ["html", "pdf", "txt"]
+        _, sequential = await skill._generate_reports(results, os.path.join(temp_dir, "sequential"), formats,
+                                                      "benchmark", parallel=False)
+        _, parallel = await skill._generate_reports(results, os.path.join(temp_dir, "parallel"), formats,
+                                                    "benchmark", parallel=True)
+
+    print(f"问题数: {issue_count}")
+    print(f"依次生成: {json.dumps(sequential)}")
+    print(f"并行生成: {json.dumps(parallel)}，加速 {sequential['total'] / parallel['total']:.2f}x")
+
+
+def bench_exclude(name_count: int, pattern_count: int):
+    """
+    对比逐个fnmatch与预编译匹配器判断排除模式的耗时
+    """
+    rng = random.Random(0)
+    patterns = [".git", ".svn", "__pycache__", "*.gitignore", "node_modules", "*.min.js", "test_*"]
+    while len(patterns) < pattern_count:
+        i = len(patterns)
+        patterns.append(rng.choice([f"vendor{i}", f"*.ext{i}", f"tmp{i}_*", f"build{i}"]))
+    extensions = [".py", ".js", ".java", ".min.js", ".gitignore", ".ext9", ".txt"]
+    names = [f"file_{rng.randint(0, 100000)}{rng.choice(extensions)}" for _ in range(name_count)]
+
+    started = time.perf_counter()
+    naive = [any(fnmatch.fnmatch(name, pattern) for pattern in patterns) for name in names]
+    naive_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = ExcludeMatcher(patterns)
+    compiled = [matcher.excluded(name) for name in names]
+    compiled_time = time.perf_counter() - started
+
+    assert naive == compiled
+    print(f"名称数: {name_count}，模式数: {len(patterns)}")
+    print(f"逐个fnmatch:  {naive_time:.3f}s")
+    print(f"预编译匹配器: {compiled_time:.3f}s，加速 {naive_time / compiled_time:.1f}x")
+
+
+def build_synthetic_tree(root: str, dir_count: int, files_per_dir: int):
+    """
+    生成两层目录结构的模拟项目，每个目录包含若干源文件和非源文件
+    """
+    extensions = [".py", ".js", ".java", ".txt", ".md"]
+    for d in range(dir_count):
+        directory = os.path.join(root, f"pkg{d // 50}", f"mod{d}")
+        os.makedirs(directory)
+        for f in range(files_per_dir):
+            open(os.path.join(directory, f"file{f}{extensions[f % len(extensions)]}"), "w").close()
+
+
+def bench_walk(path: str, dir_count: int, files_per_dir: int, workers: int):
+    """
+    对比os.walk逐文件构造Path与基于os.scandir的并行遍历器识别目标文件的耗时
+    """
+    matcher = ExcludeMatcher([".svn", ".git", "__pycache__", "*.gitignore"])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not path:
+            path = temp_dir
+            build_synthetic_tree(path, dir_count, files_per_dir)
+
+        started = time.perf_counter()
+        walked = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not matcher.excluded(d, is_dir=True)]
+            for name in files:
+                if not matcher.excluded(name) and Path(os.path.join(root, name)).suffix.lower() in EXTENSION_LANGUAGES:
+                    walked.append(os.path.join(root, name))
+        walk_time = time.perf_counter() - started
+
+        walker = ParallelWalker(path, matcher, workers=workers)
+        scanned = [file_path for file_path, _ in walker]
+
+    # 遍历器额外识别特殊文件名和shebang，结果是按扩展名识别结果的超集
+    assert set(walked) <= set(scanned)
+    print(f"文件数: {len(scanned)}，目录数: {walker.dirs}")
+    print(f"os.walk:           {walk_time:.3f}s，{len(walked) / walk_time:.0f} 文件/秒")
+    print(f"并行scandir({workers}线程): {walker.elapsed:.3f}s，{walker.stats()['files_per_sec']:.0f} 文件/秒，"
+          f"加速 {walk_time / walker.elapsed:.2f}x")
+
+
+def _analyze_python_files(files: list) -> int:
+    return sum(len(analyze_python_file(file_path)) for file_path in files)
+
+
+def bench_python_analyzer(path: str, max_files: int, workers: int):
+    """
+    在同一批Python文件上对比内置ast分析器（串行及进程池）与pylint的耗时
+    """
+    path = path or os.path.dirname(os.__file__)
+    walker = ParallelWalker(path, ExcludeMatcher(["__pycache__", "site-packages"]))
+    files = sorted(file_path for file_path, lang in walker if lang == "python")[:max_files]
+
+    started = time.perf_counter()
+    issue_count = _analyze_python_files(files)
+    serial_time = time.perf_counter() - started
+
+    chunks = [files[i:i + 64] for i in range(0, len(files), 64)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pooled_count = sum(executor.map(_analyze_python_files, chunks))
+    pool_time = time.perf_counter() - started
+    assert pooled_count == issue_count
+
+    print(f"文件数: {len(files)}（{path}）")
+    print(f"内置分析器（串行）:         {serial_time:.3f}s，{len(files) / serial_time:.0f} 文件/秒，{issue_count} 个问题")
+    print(f"内置分析器（{workers}个工作进程）: {pool_time:.3f}s，{len(files) / pool_time:.0f} 文件/秒")
+
+    runner = PylintRunner(timeout=3600, batch_size=len(files) or 1)
+    if not runner.available():
+        print("pylint: 未安装，跳过对比")
+        return
+    started = time.perf_counter()
+    pylint_count = sum(len(issues) for issues in runner.analyze(files).values())
+    pylint_time = time.perf_counter() - started
+    print(f"pylint:                     {pylint_time:.3f}s，{len(files) / pylint_time:.0f} 文件/秒，{pylint_count} 个问题，"
+          f"内置分析器（串行）快 {pylint_time / serial_time:.1f}x")
+
+
+def bench_security_scan(path: str, max_files: int):
+    """
+    对比安全扫描器（锚点预过滤+候选行确认）与直接用合并后的单个正则扫描全文的吞吐量
+    """
+    path = path or os.path.dirname(os.__file__)
+    walker = ParallelWalker(path, ExcludeMatcher(["__pycache__"]))
+    files = sorted(walker)[:max_files]
+    total_bytes = sum(os.path.getsize(file_path) for file_path, _ in files)
+
+    started = time.perf_counter()
+    finding_count = sum(len(scan_file(file_path, lang, max_findings=10 ** 9)) for file_path, lang in files)
+    scan_time = time.perf_counter() - started
+
+    naive_patterns = {}
+    started = time.perf_counter()
+    naive_count = 0
+    for file_path, lang in files:
+        if lang not in naive_patterns:
+            naive_patterns[lang] = re.compile(b"|".join(
+                b"(?:%s)" % rule.pattern for rule in RULES if rule.languages is None or lang in rule.languages
+            ))
+        with open(file_path, "rb") as f:
+            naive_count += sum(1 for _ in naive_patterns[lang].finditer(f.read()))
+    naive_time = time.perf_counter() - started
+
+    megabytes = total_bytes / 1e6
+    print(f"文件数: {len(files)}，{megabytes:.1f}MB（{path}）")
+    print(f"合并正则全文扫描: {naive_time:.3f}s，{megabytes / naive_time:.1f} MB/s，{naive_count} 处匹配")
+    print(f"锚点预过滤扫描:   {scan_time:.3f}s，{megabytes / scan_time:.1f} MB/s"
+          f"（{megabytes * 60 / 1000 / scan_time:.2f} GB/分钟），{finding_count} 个问题，"
+          f"加速 {naive_time / scan_time:.1f}x")
+
+
+def bench_clones(path: str, max_files: int, workers: int):
+    """
+    测量重复代码检测的指纹计算（串行及进程池）与索引查找耗时，以及指纹数组占用的内存
+    """
+    path = path or os.path.dirname(os.__file__)
+    walker = ParallelWalker(path, ExcludeMatcher(["__pycache__"]))
+    files = sorted(walker)[:max_files]
+
+    started = time.perf_counter()
+    fingerprints = fingerprint_files(files)
+    serial_time = time.perf_counter() - started
+
+    chunks = [files[i:i + 64] for i in range(0, len(files), 64)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pooled = [item for chunk in executor.map(fingerprint_files, chunks) for item in chunk]
+    pool_time = time.perf_counter() - started
+    assert [item.hashes for item in pooled if item] == [item.hashes for item in fingerprints if item]
+
+    detector = CloneDetector()
+    for (file_path, lang), file_fingerprints in zip(files, fingerprints):
+        detector.add(file_path, lang, file_fingerprints)
+    del fingerprints, pooled
+    started = time.perf_counter()
+    result = detector.detect()
+    detect_time = time.perf_counter() - started
+
+    lines = sum(stats["lines"] for stats in result["languages"].values())
+    array_bytes = sum(len(a) * a.itemsize for a in (detector.hashes, detector.starts, detector.ends))
+    array_bytes += sum(len(token_lines) for token_lines in detector.token_lines)
+    print(f"文件数: {len(files)}，{lines} 行代码，{result['fingerprints']} 个指纹（{path}）")
+    print(f"指纹计算（串行）:         {serial_time:.3f}s，{lines / serial_time:.0f} 行/秒")
+    print(f"指纹计算（{workers}个工作进程）: {pool_time:.3f}s，{lines / pool_time:.0f} 行/秒")
+    print(f"索引与重复查找:           {detect_time:.3f}s，指纹数组 {array_bytes / 1e6:.1f}MB")
+    print(f"重复率 {result['duplication']}%，{len(result['issues'])} 处较大的重复片段")
+
+
+def bench_metrics(path: str, max_files: int):
+    """
+    测量本地代码度量引擎的吞吐量，以及COCOMO投入估算和维护建议的耗时（替代原先依次进行的两次大模型请求）
+    """
+    path = path or os.path.dirname(os.__file__)
+    walker = ParallelWalker(path, ExcludeMatcher(["__pycache__"]))
+    files = sorted(walker)[:max_files]
+    data_size = sum(os.path.getsize(file_path) for file_path, _ in files)
+
+    line_stats = [count_file_lines(file_path, lang) for file_path, lang in files]
+    lines = sum(stats["lines"] for stats in line_stats)
+
+    aggregator = MetricsAggregator()
+    started = time.perf_counter()
+    for (file_path, lang), stats in zip(files, line_stats):
+        metrics = compute_file_metrics(file_path, lang, stats)
+        if metrics:
+            aggregator.add(file_path, lang, metrics, stats["code"])
+    metrics_time = time.perf_counter() - started
+
+    language_stats = {}
+    for (_, lang), stats in zip(files, line_stats):
+        language_stats.setdefault(lang, {"code": 0})["code"] += stats["code"]
+    skill = CdanalyzerAgentSkill()
+    skill.use_llm_config = 1
+    started = time.perf_counter()
+    summary = aggregator.result()
+    analysis_results = {"metrics": summary, "language_stats": language_stats,
+                        "risk_counts": {"critical": 0, "high": 0, "medium": 0, "low": 0}}
+    cost_model = skill._estimate_development_cost(analysis_results)
+    recommendation = skill._get_maintenance_recommendation(analysis_results)
+    assess_time = time.perf_counter() - started
+
+    print(f"文件数: {len(files)}，{lines} 行，{data_size / 1e6:.1f}MB（{path}）")
+    print(f"代码度量计算:   {metrics_time:.3f}s，{lines / metrics_time:.0f} 行/秒，{data_size / 1e6 / metrics_time:.1f}MB/s")
+    print(f"成本与维护评估: {assess_time * 1000:.2f}ms（COCOMO {cost_model['mode']}：{cost_model['kloc']} KLOC，"
+          f"复杂度 {cost_model['complexity']}，{cost_model['person_days']} 人/日；是否值得维护：{recommendation['worth_maintaining']}）")
+    print(f"{summary['functions']} 个函数，平均圈复杂度 {summary['avg_complexity']}，"
+          f"可维护性指数 {summary['maintainability_index']}（等级 {summary['rating']}）")
+
+
+async def bench_server(path: str, jobs: int, workers: int):
+    """
+    对比每次请求新建分析实例（冷启动进程池和HTTP客户端）与常驻分析服务（预热的进程池）的单次任务延迟
+    """
+    path = path or os.path.join(os.path.dirname(os.__file__), "email")
+    report_dir = tempfile.TemporaryDirectory()
+    inputs = {"target_path": path, "report_format": [], "use_llm_config": 1, "parallel_workers": workers,
+              "parallel_chunk_size": 8, "use_analysis_cache": False, "use_external_analyzers": False, "report_path": report_dir.name}
+
+    cold = []
+    for _ in range(jobs):
+        started = time.perf_counter()
+        result = await CdanalyzerAgentSkill().execute(dict(inputs))
+        cold.append(time.perf_counter() - started)
+    assert result["success"], result.get("error")
+
+    started = time.perf_counter()
+    service = AnalysisService(workers=workers, max_jobs=1)
+    await service.start()
+    start_time = time.perf_counter() - started
+    server = await AnalysisServer(service).start("127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/analyze"
+    warm = []
+    try:
+        async with httpx.AsyncClient(timeout=None) as client:
+            for _ in range(jobs):
+                started = time.perf_counter()
+                response = await client.post(url, json=inputs)
+                warm.append(time.perf_counter() - started)
+                assert response.json()["success"]
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.close()
+        report_dir.cleanup()
+
+    files = result["summary"]["total_files"]
+    print(f"目标: {path}（{files} 个文件），{workers} 个工作进程，每种方式 {jobs} 个任务")
+    print(f"每次新建实例: 平均 {sum(cold) / jobs * 1000:.1f}ms，首个任务 {cold[0] * 1000:.1f}ms")
+    print(f"常驻服务:     平均 {sum(warm) / jobs * 1000:.1f}ms，首个任务 {warm[0] * 1000:.1f}ms"
+          f"（服务启动与预热 {start_time * 1000:.1f}ms，只在启动时发生一次）")
+    print(f"加速 {sum(cold) / sum(warm):.1f}x")
+
+
+async def bench_jobs(path: str, workers: int, cancel_after: int):
+    """
+    测量进度事件的开销（有无订阅者时的完整分析耗时），以及分析中途取消任务到任务停止的耗时
+    """
+    path = path or os.path.dirname(os.__file__)
+    report_dir = tempfile.TemporaryDirectory()
+    inputs = {"target_path": path, "report_format": [], "use_llm_config": 1, "parallel_workers": workers,
+              "use_analysis_cache": False, "use_external_analyzers": False, "detect_clones": False,
+              "report_path": report_dir.name}
+
+    started = time.perf_counter()
+    result = await CdanalyzerAgentSkill().execute(dict(inputs))
+    plain_time = time.perf_counter() - started
+    files = result["summary"]["total_files"]
+
+    manager = JobManager()
+    started = time.perf_counter()
+    job_id = manager.submit(dict(inputs))
+    events = 0
+    async for _ in manager.events(job_id):
+        events += 1
+    job_time = time.perf_counter() - started
+
+    job_id = manager.submit(dict(inputs))
+    async for event in manager.events(job_id, interval=0):
+        if event.get("files_analyzed", 0) >= cancel_after:
+            break
+    started = time.perf_counter()
+    await manager.cancel(job_id)
+    cancel_time = time.perf_counter() - started
+    status = manager.status(job_id)
+    report_dir.cleanup()
+
+    print(f"目标: {path}（{files} 个文件），{workers} 个工作进程")
+    print(f"直接执行:         {plain_time:.3f}s")
+    print(f"任务执行并订阅:   {job_time:.3f}s，收到 {events} 个进度事件")
+    print(f"取消任务:         已分析 {status['files_analyzed']} 个文件时取消，{cancel_time * 1000:.1f}ms 后停止"
+          f"（状态 {status['state']}）")
+
+
+async def bench_instrumentation(path: str, runs: int, workers: int):
+    """
+    对比启用与未启用埋点时的完整分析耗时，并输出启用时的阶段耗时分布；同时测量未启用时空埋点调用的单次开销
+    """
+    path = path or os.path.join(os.path.dirname(os.__file__), "asyncio")
+    report_dir = tempfile.TemporaryDirectory()
+    inputs = {"target_path": path, "report_format": ["html", "txt"], "use_llm_config": 1, "parallel_workers": workers,
+              "use_analysis_cache": False, "use_external_analyzers": False, "report_path": report_dir.name}
+
+    timings = {False: [], True: []}
+    metrics = None
+    for _ in range(runs):
+        for enabled in (False, True):
+            started = time.perf_counter()
+            result = await CdanalyzerAgentSkill().execute({**inputs, "collect_metrics": enabled})
+            timings[enabled].append(time.perf_counter() - started)
+            metrics = result.get("metrics", metrics)
+    report_dir.cleanup()
+
+    calls = 1000000
+    started = time.perf_counter()
+    for _ in range(calls):
+        with NULL_INSTRUMENTATION.span("analysis"):
+            pass
+    null_span = (time.perf_counter() - started) / calls
+
+    disabled, enabled = min(timings[False]), min(timings[True])
+    print(f"目标: {path}（{int(metrics['counters']['files'])} 个文件），{workers} 个工作进程，各执行 {runs} 次取最小值")
+    print(f"未启用埋点: {disabled:.3f}s")
+    print(f"启用埋点:   {enabled:.3f}s（{(enabled / disabled - 1) * 100:+.1f}%）")
+    print(f"未启用时空span单次调用: {null_span * 1e9:.0f}ns")
+    print("阶段耗时: " + "，".join(f"{name} {seconds:.3f}s" for name, seconds in metrics["stages"].items()))
+    print("工作进程各步骤累计: " + "，".join(f"{name[:-len('_seconds')]} {value:.3f}s"
+                                      for name, value in metrics["counters"].items() if name.endswith("_seconds")))
+    print(f"吞吐量: {metrics['gauges']['files_per_sec']:.0f} 文件/秒，{metrics['gauges']['bytes_per_sec'] / 1e6:.1f}MB/s，"
+          f"峰值内存 {metrics['peak_rss_mb']}MB（已结束的子进程 {metrics['children_peak_rss_mb']}MB）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="龙析性能基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    llm_parser = subparsers.add_parser("llm-client", help="对比大模型HTTP客户端连接复用的性能")
+    llm_parser.add_argument("--requests", type=int, default=500, help="请求总数")
+    llm_parser.add_argument("--concurrency", type=int, default=20, help="并发请求数")
+    llm_parser.add_argument("--latency", type=float, default=0.005, help="替身服务的响应延迟（秒）")
+
+    reports_parser = subparsers.add_parser("reports", help="对比报告依次生成与并行生成的性能")
+    reports_parser.add_argument("--issues", type=int, default=5000, help="模拟问题数")
+
+    exclude_parser = subparsers.add_parser("exclude", help="对比排除模式匹配的性能")
+    exclude_parser.add_argument("--names", type=int, default=200000, help="待匹配的名称数")
+    exclude_parser.add_argument("--patterns", type=int, default=60, help="排除模式数")
+
+    walk_parser = subparsers.add_parser("walk", help="对比目录遍历与目标文件识别的性能")
+    walk_parser.add_argument("--path", default="", help="遍历的目录，不指定时生成模拟项目")
+    walk_parser.add_argument("--dirs", type=int, default=2000, help="模拟项目的目录数")
+    walk_parser.add_argument("--files", type=int, default=25, help="模拟项目每个目录的文件数")
+    walk_parser.add_argument("--workers", type=int, default=8, help="并行遍历的线程数")
+
+    python_parser = subparsers.add_parser("python-analyzer", help="对比内置Python分析器与pylint的性能")
+    python_parser.add_argument("--path", default="", help="分析的目录，默认为Python标准库目录")
+    python_parser.add_argument("--files", type=int, default=500, help="最多分析的文件数")
+    python_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="工作进程数")
+
+    security_parser = subparsers.add_parser("security-scan", help="对比安全扫描器与合并正则全文扫描的吞吐量")
+    security_parser.add_argument("--path", default="", help="扫描的目录，默认为Python标准库目录")
+    security_parser.add_argument("--files", type=int, default=5000, help="最多扫描的文件数")
+
+    clones_parser = subparsers.add_parser("clones", help="测量重复代码检测的耗时与内存占用")
+    clones_parser.add_argument("--path", default="", help="检测的目录，默认为Python标准库目录")
+    clones_parser.add_argument("--files", type=int, default=100000, help="最多检测的文件数")
+    clones_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="工作进程数")
+
+    metrics_parser = subparsers.add_parser("metrics", help="测量本地代码度量与成本、维护评估的耗时")
+    metrics_parser.add_argument("--path", default="", help="度量的目录，默认为Python标准库目录")
+    metrics_parser.add_argument("--files", type=int, default=100000, help="最多度量的文件数")
+
+    server_parser = subparsers.add_parser("server", help="对比每次新建分析实例与常驻分析服务的任务延迟")
+    server_parser.add_argument("--path", default="", help="分析的目录，默认为Python标准库的email包")
+    server_parser.add_argument("--jobs", type=int, default=5, help="每种方式执行的任务数")
+    server_parser.add_argument("--workers", type=int, default=2, help="工作进程数")
+    server_parser.add_argument("--start-method", choices=["fork", "spawn", "forkserver"], default=None,
+                               help="工作进程的启动方式，默认使用平台默认值（Windows和macOS为spawn）")
+
+    jobs_parser = subparsers.add_parser("jobs", help="测量任务进度事件的开销与取消任务的耗时")
+    jobs_parser.add_argument("--path", default="", help="分析的目录，默认为Python标准库目录")
+    jobs_parser.add_argument("--workers", type=int, default=2, help="工作进程数")
+    jobs_parser.add_argument("--cancel-after", type=int, default=300, help="分析多少个文件后取消任务")
+
+    instrumentation_parser = subparsers.add_parser("instrumentation", help="测量埋点的开销并输出各阶段耗时分布")
+    instrumentation_parser.add_argument("--path", default="", help="分析的目录，默认为Python标准库的asyncio包")
+    instrumentation_parser.add_argument("--runs", type=int, default=3, help="每种方式的执行次数")
+    instrumentation_parser.add_argument("--workers", type=int, default=2, help="工作进程数")
+
+    args = parser.parse_args()
+    if args.command == "llm-client":
+        asyncio.run(bench_llm_client(args.requests, args.concurrency, args.latency))
+    elif args.command == "reports":
+        asyncio.run(bench_reports(args.issues))
+    elif args.command == "exclude":
+        bench_exclude(args.names, args.patterns)
+    elif args.command == "walk":
+        bench_walk(args.path, args.dirs, args.files, args.workers)
+    elif args.command == "python-analyzer":
+        bench_python_analyzer(args.path, args.files, args.workers)
+    elif args.command == "security-scan":
+        bench_security_scan(args.path, args.files)
+    elif args.command == "clones":
+        bench_clones(args.path, args.files, args.workers)
+    elif args.command == "metrics":
+        bench_metrics(args.path, args.files)
+    elif args.command == "server":
+        if args.start_method:
+            multiprocessing.set_start_method(args.start_method, force=True)
+        asyncio.run(bench_server(args.path, args.jobs, args.workers))
+    elif args.command == "jobs":
+        asyncio.run(bench_jobs(args.path, args.workers, args.cancel_after))
+    elif args.command == "instrumentation":
+        asyncio.run(bench_instrumentation(args.path, args.runs, args.workers))
+
+
+if __name__ == "__main__":
+    main()
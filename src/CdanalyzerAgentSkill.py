@@ -1,19 +1,147 @@
 import json
 import asyncio
 import os
-import fnmatch
+import shutil
 import subprocess
 import tempfile
-from pathlib import Path
-from typing import Dict, Any, List, Tuple
-from collections import defaultdict
-import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple, Optional, AsyncIterator, Callable, Iterable, Iterator, Set
+from collections import defaultdict, deque
+from itertools import islice
+import time
+import importlib.util
+from xml.sax.saxutils import escape as xml_escape
 import httpx
 import asyncio
 from dotenv import load_dotenv
 
+from .line_counter import empty_line_stats, read_source
+from .analysis_cache import AnalysisCache, SuggestionCache, hash_file, new_content_hasher, normalize_prompt
+from .issue_sink import IssueSink, IssueSpool, SEVERITIES
+from .html_virtual import build_issue_columns, encode_issue_data, write_virtual_issue_section
+from .pdf_layout import LazyFlowables, iter_issue_chunks, top_issues
+from .report_resources import get_pdf_font, get_logo_path
+from .path_matcher import ExcludeMatcher, MatcherCache
+from .file_walker import ParallelWalker
+from .analyzers import AnalyzerError, engine_key, get_runner
+from .python_analyzer import DEFAULT_MAX_COMPLEXITY, analyze_python_source
+from .function_analyzer import DEFAULT_MAX_NESTING, analyze_functions
+from .security_scanner import RULESET_VERSION, scan_file, scan_source
+from .clone_detector import DEFAULT_MIN_LINES, CloneDetector, fingerprint_content, fingerprint_files, tokenize_lines
+from .code_metrics import METRICS_VERSION, MetricsAggregator, compute_metrics
+from .cost_model import DEFAULT_MODE, assess_maintenance, estimate_cost, merge_refinement
+from .instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from .languages import EXTENSION_LANGUAGES, SUPPORTED_LANGUAGES, detect_language
+from .llm_scheduler import LLMScheduler, estimate_tokens, COMPLETION_TOKEN_RESERVE
+
 load_dotenv()
 
+# HTTP/2 依赖可选的h2包（pip install httpx[http2]），未安装时回退到HTTP/1.1
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 批量提示词中每个问题的JSON结构及编号等额外令牌开销
+BATCH_ITEM_TOKEN_OVERHEAD = 40
+
+# 流式获取AI建议时每批从spool读取的问题数，限制同时驻留内存的问题数量
+SUGGESTION_SPOOL_BATCH_SIZE = 5000
+
+# 支持的报告格式（同时作为报告文件扩展名）
+REPORT_FORMATS = ("html", "pdf", "txt")
+
+# 影响报告内容的实例配置，并行生成报告时传递给工作进程
+REPORT_SETTINGS = ("use_llm_config", "html_report_config", "pdf_report_config")
+
+# PDF问题表格的表头
+PDF_ISSUE_HEADERS = ("文件", "行号", "严重程度", "类型", "问题描述", "解决方案", "AI建议")
+
+# 按字体缓存的PDF段落样式与表格样式（同一进程内的多次报告生成共用）；只缓存样式对象，
+# Paragraph等flowable在排版时会记录自身状态，并行生成多份PDF时不能共用，每份文档单独创建
+_pdf_styles = {}
+
+# 工作进程内复用的分析实例（进程池模式下每个工作进程只初始化一次）
+_worker_skill = None
+
+
+def _get_worker_skill() -> "CdanalyzerAgentSkill":
+    """
+    获取当前工作进程内复用的分析实例
+    """
+    global _worker_skill
+    if _worker_skill is None:
+        _worker_skill = CdanalyzerAgentSkill()
+    return _worker_skill
+
+
+def warm_up_worker():
+    """
+    进程池初始化函数：在工作进程启动时创建复用的分析实例（常驻服务用于预热工作进程）
+    """
+    _get_worker_skill()
+
+
+def create_http_client(config: Dict[str, Any]) -> httpx.AsyncClient:
+    """
+    按连接池配置创建大模型HTTP客户端
+
+    Args:
+        config: 连接池配置（见CdanalyzerAgentSkill.llm_http_config）
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive_connections"],
+            keepalive_expiry=config["keepalive_expiry"]
+        ),
+        # 排队等待连接的请求不计入超时
+        timeout=httpx.Timeout(config["timeout"], pool=None),
+        # HTTP/2 通过TLS协商启用，提供商不支持时自动使用HTTP/1.1
+        http2=bool(config["http2"]) and _HTTP2_AVAILABLE
+    )
+
+
+def _generate_report_file(fmt: str, analysis_results: Dict[str, Any], output_path: str, target_path: str,
+                          cost_estimate: float, maintenance_recommendation: dict, settings: Dict[str, Any]) -> float:
+    """
+    进程池工作函数：生成单个格式的报告，返回耗时（秒）
+
+    Args:
+        settings: 主进程中影响报告内容的实例配置（见REPORT_SETTINGS）
+    """
+    skill = _get_worker_skill()
+    for name, value in settings.items():
+        setattr(skill, name, value)
+    return skill._generate_report_timed(fmt, analysis_results, output_path, target_path,
+                                        cost_estimate, maintenance_recommendation)
+
+
+def _analyze_file_chunk(chunk: List[Tuple[int, str, str]], standards: Dict[str, str],
+                        compute_hash: bool = False, analyzer_config: Dict[str, Any] = None,
+                        timed: bool = False, clone_config: Dict[str, Any] = None,
+                        expected_hashes: Dict[int, str] = None) -> Any:
+    """
+    进程池工作函数：对一批 (序号, 文件路径, 语言类型) 完成行数统计与问题分析
+
+    Args:
+        analyzer_config: 主进程中的外部分析工具配置
+        timed: 是否同时统计各步骤的耗时（启用埋点时）
+        clone_config: 主进程中的重复代码检测配置（启用时同时计算指纹）
+        expected_hashes: 需要先校验内容哈希的文件（序号 -> 缓存中的内容哈希），见_analyze_file_batch
+
+    Returns:
+        分析结果列表；timed为True时为 (分析结果列表, 各步骤耗时及读取的字节数)
+    """
+    skill = _get_worker_skill()
+    if analyzer_config is not None:
+        skill.analyzer_config = analyzer_config
+    if clone_config is not None:
+        skill.clone_config = clone_config
+    if not timed:
+        return skill._analyze_file_batch(chunk, standards, compute_hash, expected_hashes=expected_hashes)
+    timings = {}
+    return skill._analyze_file_batch(chunk, standards, compute_hash, timings, expected_hashes), timings
+
+
 class CdanalyzerAgentSkill:
     def __init__(self):
         """
@@ -28,7 +156,12 @@ class CdanalyzerAgentSkill:
             "cpp": "cppcheck",
             "csharp": "roslyn-analyzers",
             "go": "golangci-lint",
-            "typescript": "typescript-eslint"
+            "typescript": "typescript-eslint",
+            "kotlin": "ktlint",
+            "rust": "clippy",
+            "swift": "swiftlint",
+            "shell": "shellcheck",
+            "dockerfile": "hadolint"
         }
         self.risk_levels = {
             "critical": {"weight": 4, "color": "#ff0000", "label": "致命"},      # 红色
@@ -40,6 +173,86 @@ class CdanalyzerAgentSkill:
         self.llm_configs = {}
         # 控制是否使用大模型的配置项，默认为0（即访问大模型）
         self.use_llm_config = 0
+        # 大模型HTTP连接池配置，客户端在首次调用时创建并在execute()结束时关闭
+        self.llm_http_config = {
+            "max_connections": 100,
+            "max_keepalive_connections": 20,
+            "keepalive_expiry": 30.0,
+            "http2": True,
+            "timeout": 30.0
+        }
+        self._http_client = None
+        # 常驻服务共享的进程池和大模型HTTP客户端（见src/server.py），为None时每次执行自行创建并在结束时关闭；
+        # 使用共享资源时本实例不会关闭它们，连接池配置以服务启动时为准
+        self.shared_executor: Optional[Executor] = None
+        self.shared_http_client: Optional[httpx.AsyncClient] = None
+        # 批量请求AI建议时每个批次的令牌预算，0表示不批量（每个问题单独请求）
+        self.llm_batch_tokens = 0
+        # AI建议缓存配置：缓存目录（为None时不缓存）、过期时间（秒）和最大条目数
+        self.suggestion_cache_config = {
+            "enabled": True,
+            "cache_dir": None,
+            "ttl": 7 * 24 * 3600,
+            "max_entries": 100000
+        }
+        # 大模型请求调度配置：最大并发请求数、每分钟请求数/令牌数限制（None为不限制）、429/5xx重试次数
+        self.llm_scheduler_config = {
+            "max_in_flight": 8,
+            "requests_per_minute": None,
+            "tokens_per_minute": None,
+            "max_retries": 3,
+            "backoff_base": 1.0
+        }
+        # 按排除模式列表缓存的预编译匹配器（容量有限，淘汰最久未使用的模式列表）
+        self._exclude_matchers = MatcherCache()
+        # HTML报告配置：mode为full（完整表格）、virtual（虚拟化分页表格）或auto（问题数超过阈值时使用虚拟化表格），
+        # sidecar为true时压缩后的问题数据写入同目录的旁路文件（需通过HTTP服务打开报告）
+        self.html_report_config = {
+            "mode": "auto",
+            "virtual_threshold": 20000,
+            "sidecar": False,
+            "page_size": 100
+        }
+        # PDF报告配置：mode为full（列出全部问题）、summary（摘要及风险最高的top_k个问题）或auto
+        # （问题数超过max_issues时使用summary）；问题明细每chunk_rows行生成一个表格，group_by_file时按文件分表；
+        # font_path为显式指定的字体文件（为None时依次使用环境变量CDANALYZER_PDF_FONT和平台默认字体）
+        self.pdf_report_config = {
+            "mode": "auto",
+            "max_issues": 10000,
+            "top_k": 1000,
+            "chunk_rows": 200,
+            "group_by_file": False,
+            "font_path": None
+        }
+        # 外部分析工具配置：enabled为false时只使用内置分析器；timeout为每次调用的超时（秒），
+        # timeouts可按工具名覆盖；batch_size为每次调用分析的文件数；max_complexity为内置Python分析器的函数圈复杂度上限；
+        # security_scan为是否对所有文件执行敏感信息与危险模式扫描
+        self.analyzer_config = {
+            "enabled": True,
+            "timeout": 120,
+            "timeouts": {},
+            "batch_size": 200,
+            "max_complexity": DEFAULT_MAX_COMPLEXITY,
+            "security_scan": True
+        }
+        # 重复代码检测配置：enabled为是否检测，min_lines为报告为问题的最小重复行数
+        self.clone_config = {
+            "enabled": True,
+            "min_lines": DEFAULT_MIN_LINES
+        }
+        # 研发投入估算配置：mode为COCOMO模式（organic、semidetached、embedded），
+        # llm_refine为是否在启用大模型时由大模型复核本地的估算和维护建议
+        self.cost_config = {
+            "mode": DEFAULT_MODE,
+            "llm_refine": False
+        }
+        # 结构化进度（见_reset_progress），设置progress_listener后每次更新都会以进度字典调用它（见src/jobs.py），
+        # 未设置时只在控制台显示已分析的文件数
+        self.progress_listener: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._reset_progress()
+        # 运行埋点，execute()在启用collect_metrics或trace_path时替换为Instrumentation
+        self.instrumentation = NULL_INSTRUMENTATION
+        self._reset_llm_http_metrics()
 
     def show_llm_configs(self):
         """
@@ -112,9 +325,146 @@ class CdanalyzerAgentSkill:
         print(f"API Key: {'*' * 20}{api_key[-4:] if api_key and len(api_key) >= 4 else ''}")  # 隐藏大部分API密钥
         print(f"=====================")
 
-    async def _call_llm_api(self, provider: str, prompt: str) -> str:
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        获取复用的大模型HTTP客户端（首次调用时创建；常驻服务中使用共享客户端）
+        """
+        if self.shared_http_client is not None:
+            return self.shared_http_client
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = create_http_client(self.llm_http_config)
+        return self._http_client
+
+    @contextmanager
+    def _process_pool(self, workers: int) -> Iterator[Executor]:
+        """
+        获取进程池：常驻服务中使用共享进程池（使用后不关闭），否则创建新进程池并在使用后关闭
+        """
+        if self.shared_executor is not None:
+            yield self.shared_executor
+            return
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            yield executor
+        except BaseException:
+            # 任务被取消或出错时取消未开始的任务，不等待正在执行的任务
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+    async def close_http_client(self):
+        """
+        关闭本实例创建的大模型HTTP客户端及其连接池（共享客户端由常驻服务关闭）
+        """
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _reset_progress(self):
+        """
+        重置分析进度：当前阶段、已发现/待分析总数（遍历结束前为None）/已分析的文件数、已发现的问题数和进行中的大模型请求数
+        """
+        self.progress = {
+            "stage": "analyzing",
+            "files_discovered": 0,
+            "files_total": None,
+            "files_analyzed": 0,
+            "issues_found": 0,
+            "llm_pending": 0
+        }
+
+    def _report_progress(self, stage: Optional[str] = None, **counters):
+        """
+        更新分析进度并通知progress_listener；未设置progress_listener时在控制台显示已分析的文件数
+
+        Args:
+            stage: 新的阶段（analyzing、clones、suggestions、assessment、reports、done），为None时不变
+            counters: 需要更新的进度字段
+        """
+        progress = self.progress
+        if stage is not None:
+            progress["stage"] = stage
+        progress.update(counters)
+        if self.progress_listener is not None:
+            self.progress_listener(progress)
+        elif "files_analyzed" in counters:
+            total = progress["files_total"]
+            if total:
+                print(f"\r【已分析 {progress['files_analyzed']} 个文件】 - 进度: {progress['files_analyzed'] / total * 100:.1f}%",
+                      end="", flush=True)
+            else:
+                print(f"\r【已分析 {progress['files_analyzed']} 个文件】", end="", flush=True)
+
+    def _reset_llm_http_metrics(self):
+        """
+        重置大模型HTTP请求统计、AI建议去重统计和各提供商的请求调度器
+        """
+        self._llm_http_metrics = {"requests": 0, "new_connections": 0, "latencies": []}
+        self._llm_schedulers = {}
+        self._suggestion_stats = {"issues": 0, "unique_prompts": 0, "cache_hits": 0, "batches": 0, "batch_fallbacks": 0}
+        # 本次运行已获取的AI建议（规范化提示词 -> 建议），分批获取建议时跨批次去重
+        self._suggestion_memo = {}
+
+    def _get_llm_scheduler(self, provider: str) -> LLMScheduler:
+        """
+        获取指定提供商的请求调度器（每个提供商独立限流）
+        """
+        if provider not in self._llm_schedulers:
+            config = self.llm_scheduler_config
+            self._llm_schedulers[provider] = LLMScheduler(
+                max_in_flight=config["max_in_flight"],
+                requests_per_minute=config["requests_per_minute"],
+                tokens_per_minute=config["tokens_per_minute"],
+                max_retries=config["max_retries"],
+                backoff_base=config["backoff_base"]
+            )
+        return self._llm_schedulers[provider]
+
+    async def _trace_llm_connection(self, event_name: str, info: dict):
+        """
+        httpcore跟踪回调，统计新建立的TCP连接数
+        """
+        if event_name == "connection.connect_tcp.complete":
+            self._llm_http_metrics["new_connections"] += 1
+
+    def get_llm_http_metrics(self) -> Dict[str, Any]:
+        """
+        获取大模型HTTP请求统计：请求数、AI建议去重及缓存统计、调度统计、新建连接数、连接复用率和请求延迟（毫秒）
+        """
+        metrics = self._llm_http_metrics
+        requests = metrics["requests"]
+        latencies = sorted(metrics["latencies"])
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        scheduler_stats = defaultdict(int)
+        for scheduler in self._llm_schedulers.values():
+            for key, value in scheduler.get_stats().items():
+                scheduler_stats[key] += value
+
+        return {
+            "requests": requests,
+            "suggestions": dict(self._suggestion_stats),
+            "scheduler": dict(scheduler_stats),
+            "new_connections": metrics["new_connections"],
+            "connection_reuse_rate": round(1 - metrics["new_connections"] / requests, 4) if requests else 0.0,
+            "latency_ms": {
+                "avg": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0.0
+            }
+        }
+
+    async def _call_llm_api(self, provider: str, prompt: str, output_tokens: int = COMPLETION_TOKEN_RESERVE) -> str:
         """
         调用大模型API获取建议
+
+        Args:
+            output_tokens: 预计输出的令牌数，用于令牌限流
         """
         # 使用小写provider作为键名
         provider_lower = provider.lower()
@@ -164,170 +514,290 @@ class CdanalyzerAgentSkill:
             }
             api_endpoint = f"{config['base_url']}/chat/completions"
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+        async def send_request():
+            client = self._get_http_client()
+            started = time.perf_counter()
+            self._llm_http_metrics["requests"] += 1
+            try:
                 response = await client.post(
                     api_endpoint,
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    extensions={"trace": self._trace_llm_connection}
                 )
-                response.raise_for_status()
-                result = response.json()
-                
-                # 根据不同提供商解析响应
-                if provider.lower() in ['ollama']:
-                    # Ollama响应格式不同
-                    return result.get("response", "无法解析Ollama响应")
-                else:
-                    # 其他提供商使用标准格式
-                    return result["choices"][0]["message"]["content"].strip()
+            finally:
+                self._llm_http_metrics["latencies"].append(time.perf_counter() - started)
+            response.raise_for_status()
+            return response.json()
+
+        self._report_progress(llm_pending=self.progress["llm_pending"] + 1)
+        try:
+            # 经调度器限制并发、限流并在429/5xx时重试
+            scheduler = self._get_llm_scheduler(provider_lower)
+            result = await scheduler.submit(send_request, estimate_tokens(prompt) + output_tokens)
+
+            # 根据不同提供商解析响应
+            if provider.lower() in ['ollama']:
+                # Ollama响应格式不同
+                return result.get("response", "无法解析Ollama响应")
+            else:
+                # 其他提供商使用标准格式
+                return result["choices"][0]["message"]["content"].strip()
         except Exception as e:
             print(f"调用大模型API失败: {str(e)}")
             return f"获取AI建议失败: {str(e)}"
+        finally:
+            self._report_progress(llm_pending=self.progress["llm_pending"] - 1)
+
+    def _build_suggestion_prompt(self, issue: Dict[str, Any]) -> str:
+        """
+        构建获取AI建议的提示词（只依赖问题的类型、严重程度、描述和解决方案）
+        """
+        return (
+            f"分析以下代码问题并提供修正建议：\n"
+            f"问题类型：{issue['type']}\n"
+            f"严重程度：{issue['severity']}\n"
+            f"问题描述：{issue['message']}\n"
+            f"解决方案：{issue['solution']}\n"
+            f"请提供一个简洁的热门原因解释和修正方案。"
+        )
 
     async def _get_ai_suggestions(self, issues: List[Dict[str, Any]]) -> List[str]:
         """
         为每个问题获取AI建议
+
+        相同提示词的问题在一次运行中只请求一次（包括分批调用之间），结果分发给所有对应的问题；
+        启用建议缓存时，已缓存且未过期的提示词不再请求大模型。
         """
         # 如果use_llm_config为1，则直接返回"无"
         if self.use_llm_config == 1:
             return ["无" for _ in issues]
 
-        suggestions = []
-
         # 根据配置选择合适的LLM提供商（使用第一个配置的提供商）
-        if self.llm_configs:
-            provider = next(iter(self.llm_configs.keys()))
-            print(f"使用大模型提供商: {provider}")
-            
-            tasks = []
-            for issue in issues:
-                prompt = (
-                    f"分析以下代码问题并提供修正建议：\n"
-                    f"问题类型：{issue['type']}\n"
-                    f"严重程度：{issue['severity']}\n"
-                    f"问题描述：{issue['message']}\n"
-                    f"解决方案：{issue['solution']}\n"
-                    f"请提供一个简洁的热门原因解释和修正方案。"
-                )
-                task = self._call_llm_api(provider, prompt)
-                tasks.append(task)
-
-            suggestions = await asyncio.gather(*tasks)
-            return suggestions
-        else:
+        if not self.llm_configs:
             return ["未配置大模型API" for _ in issues]
 
-    async def _estimate_development_cost(self, total_files: int, total_lines: int) -> float:
+        provider = next(iter(self.llm_configs.keys()))
+        model = self.llm_configs[provider].get("model")
+        print(f"使用大模型提供商: {provider}")
+
+        # 按规范化提示词去重
+        memo = self._suggestion_memo
+        issue_keys = []
+        unique_prompts = {}
+        unique_issues = {}
+        for issue in issues:
+            prompt = self._build_suggestion_prompt(issue)
+            key = normalize_prompt(prompt)
+            if key not in unique_prompts and key not in memo:
+                unique_prompts[key] = prompt
+                unique_issues[key] = issue
+            issue_keys.append(key)
+        batch_tokens = self.llm_batch_tokens
+
+        stats = self._suggestion_stats
+        stats["issues"] += len(issues)
+        stats["unique_prompts"] += len(unique_prompts)
+
+        config = self.suggestion_cache_config
+        cache = None
+        if config["enabled"] and config["cache_dir"]:
+            cache = await asyncio.to_thread(SuggestionCache, config["cache_dir"], config["ttl"], config["max_entries"])
+
+        def lookup() -> Dict[str, Optional[str]]:
+            return {key: cache.get(SuggestionCache.make_key(key, provider, model)) for key in unique_prompts}
+
+        try:
+            # 结果写入本次运行的建议表，后续批次中的相同提示词直接复用
+            results = memo
+            pending = []
+            cached_suggestions = await asyncio.to_thread(lookup) if cache else {}
+            for key in unique_prompts:
+                cached = cached_suggestions.get(key)
+                if cached is not None:
+                    results[key] = cached
+                else:
+                    pending.append(key)
+            stats["cache_hits"] += len(unique_prompts) - len(pending)
+
+            if pending:
+                print(f"【{len(issues)} 个问题共 {len(unique_prompts)} 条不同的提示词，需请求大模型 {len(pending)} 条】")
+                if batch_tokens and len(pending) > 1:
+                    fetched = await self._get_batched_suggestions(provider, pending, unique_issues, batch_tokens)
+                else:
+                    suggestions = await asyncio.gather(*(self._call_llm_api(provider, unique_prompts[key]) for key in pending))
+                    fetched = dict(zip(pending, suggestions))
+                for key, suggestion in fetched.items():
+                    results[key] = suggestion
+                    if cache and self._is_valid_ai_suggestion(suggestion):
+                        cache.put(SuggestionCache.make_key(key, provider, model), suggestion)
+        finally:
+            if cache:
+                await asyncio.to_thread(cache.close)
+
+        return [results[key] for key in issue_keys]
+
+    def _build_batch_prompt(self, items: List[Tuple[int, Dict[str, Any]]]) -> str:
         """
-        估算开发成本（人/日）
+        构建多问题批量提示词，要求大模型按编号返回JSON数组
         """
-        if self.use_llm_config == 1:
-            return 0.00  # 如果不使用大模型，则返回0
-        
-        if not self.llm_configs:
-            print("未配置大模型，无法估算开发成本")
-            return 0.00
-        
-        # 构建估算提示
-        prompt = (
-            f"根据以下项目信息估算其在2020年之前传统手工开发模式下的开发成本：\n"
-            f"文件数量：{total_files}\n"
-            f"代码行数：{total_lines}\n"
-            f"请基于2020年之前没有AI辅助工具的开发效率，考虑编码、调试、测试等因素，"
-            f"估算该项目所需的人力开发时间（单位：人/日），结果精确到小数点后两位，"
-            f"如果估算结果大于10，则很有可能估算错误，请重新估算。"
+        issue_list = [
+            {"id": item_id, "type": issue["type"], "severity": issue["severity"],
+             "message": issue["message"], "solution": issue["solution"]}
+            for item_id, issue in items
+        ]
+        return (
+            f"分析以下{len(items)}个代码问题，分别为每个问题提供一个简洁的热门原因解释和修正方案。\n"
+            f"只返回JSON数组，不要输出其他内容，数组元素格式为："
+            f'{{"id": 问题编号, "suggestion": "修正建议"}}，每个问题编号对应一个元素。\n'
+            f"问题列表（JSON）：\n"
+            f"{json.dumps(issue_list, ensure_ascii=False)}"
         )
-        
-        # 获取估算结果
+
+    def _parse_batch_suggestions(self, response: str, expected_ids: List[int]) -> Dict[int, str]:
+        """
+        解析批量提示词的响应，返回 {问题编号: 建议}；格式错误的元素会被忽略
+        """
+        start = response.find("[")
+        end = response.rfind("]")
+        if start == -1 or end <= start:
+            return {}
         try:
-            provider = next(iter(self.llm_configs.keys()))
-            result = await self._call_llm_api(provider, prompt)
-            
-            # 从结果中提取数字
-            import re
-            numbers = re.findall(r'\d+\.?\d*', result)
-            if numbers:
-                return round(float(numbers[0]), 2)
-            else:
-                # 如果AI没有返回数字，返回一个默认值
-                return round((total_lines / 100) + (total_files * 0.5), 2)  # 估算公式：每100行代码需要1人日，每个文件需要0.5人日
-        except Exception as e:
-            print(f"估算开发成本时出错: {e}")
-            # 出错时使用默认估算公式
-            return round((total_lines / 100) + (total_files * 0.5), 2)
+            parsed = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(parsed, list):
+            return {}
+
+        wanted = set(expected_ids)
+        suggestions = {}
+        for entry in parsed:
+            if not isinstance(entry, dict):
+                continue
+            item_id = entry.get("id")
+            suggestion = entry.get("suggestion")
+            if isinstance(item_id, str) and item_id.isdigit():
+                item_id = int(item_id)
+            if item_id in wanted and isinstance(suggestion, str) and suggestion.strip():
+                suggestions[item_id] = suggestion.strip()
+        return suggestions
+
+    async def _get_batched_suggestions(
+        self,
+        provider: str,
+        keys: List[str],
+        unique_issues: Dict[str, Dict[str, Any]],
+        token_budget: int
+    ) -> Dict[str, str]:
+        """
+        将多个问题按令牌预算打包为批量提示词请求AI建议
+
+        批量响应缺失或格式错误的问题回退为逐个请求。
 
-    async def _get_maintenance_recommendation(self, total_files: int, total_lines: int, 
-                                       language_breakdown: dict, cost_estimate: float) -> dict:
+        Returns:
+            {规范化提示词: 建议}
         """
-        获取维护建议
+        # 按令牌预算分批，每个问题预留输出所需的令牌
+        batches = []
+        current, current_tokens = [], 0
+        for item_id, key in enumerate(keys):
+            issue = unique_issues[key]
+            item_tokens = estimate_tokens(
+                f"{issue['type']}{issue['severity']}{issue['message']}{issue['solution']}"
+            ) + BATCH_ITEM_TOKEN_OVERHEAD + COMPLETION_TOKEN_RESERVE
+            if current and current_tokens + item_tokens > token_budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((item_id, key))
+            current_tokens += item_tokens
+        if current:
+            batches.append(current)
+
+        async def run_batch(batch: List[Tuple[int, str]]) -> Dict[str, str]:
+            prompt = self._build_batch_prompt([(item_id, unique_issues[key]) for item_id, key in batch])
+            response = await self._call_llm_api(provider, prompt, output_tokens=COMPLETION_TOKEN_RESERVE * len(batch))
+            parsed = self._parse_batch_suggestions(response, [item_id for item_id, _ in batch])
+            results = {key: parsed[item_id] for item_id, key in batch if item_id in parsed}
+
+            missing = [key for _, key in batch if key not in results]
+            if missing:
+                self._suggestion_stats["batch_fallbacks"] += len(missing)
+                fallback = await asyncio.gather(
+                    *(self._call_llm_api(provider, self._build_suggestion_prompt(unique_issues[key])) for key in missing)
+                )
+                results.update(zip(missing, fallback))
+            return results
+
+        self._suggestion_stats["batches"] += len(batches)
+        print(f"【批量请求模式：{len(keys)} 条提示词打包为 {len(batches)} 个批次】")
+        fetched = {}
+        for results in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+            fetched.update(results)
+        return fetched
+
+    def _estimate_development_cost(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """
-        if self.use_llm_config == 1:
-            return {
-                "worth_maintaining": "否",
-                "reasoning": "由于未启用大模型，无法进行智能分析，保守起见建议不继续维护。"
-            }
-        
+        使用本地COCOMO模型估算研发投入（按语言和代码度量调整），不调用大模型
+
+        Returns:
+            cost_model.estimate_cost()的结果，person_days为报告中的成本（人/日）
+        """
+        return estimate_cost(analysis_results["language_stats"], analysis_results.get("metrics"), self.cost_config["mode"])
+
+    def _get_maintenance_recommendation(self, analysis_results: Dict[str, Any]) -> dict:
+        """
+        根据代码度量、代码重复率和风险统计在本地给出维护建议，不调用大模型
+        """
+        return assess_maintenance(analysis_results.get("metrics"), self._get_risk_counts(analysis_results),
+                                  analysis_results.get("clone_stats", {}).get("duplication"))
+
+    async def _refine_assessment(self, analysis_results: Dict[str, Any], cost_model: Dict[str, Any],
+                                 maintenance_recommendation: dict) -> Tuple[float, dict]:
+        """
+        由大模型复核本地的投入估算和维护建议：两项内容合并为一次请求，要求返回结构化JSON；
+        请求失败或返回内容无法解析时保留本地结果
+
+        Returns:
+            (成本（人/日）, 维护建议)
+        """
+        cost_estimate = cost_model["person_days"]
         if not self.llm_configs:
-            print("未配置大模型，无法提供维护建议")
-            return {
-                "worth_maintaining": "否",
-                "reasoning": "由于未配置大模型，无法进行智能分析，保守起见建议不继续维护。"
-            }
-        
-        # 构建维护建议提示
-        tech_stack = ", ".join(language_breakdown.keys())
+            print("未配置大模型，使用本地估算结果")
+            return cost_estimate, maintenance_recommendation
+
+        metrics = analysis_results.get("metrics") or {}
+        code_lines = {lang: stats.get("code", 0) for lang, stats in analysis_results["language_stats"].items()}
         prompt = (
-            f"根据以下项目信息，分析该项目是否值得继续维护：\n"
-            f"文件数量：{total_files}\n"
-            f"代码行数：{total_lines}\n"
-            f"技术栈：{tech_stack}\n"
-            f"估算开发成本（人/日）：{cost_estimate}\n"
-            f"请分析此项目是否值得继续维护，只回答'是'或'否'，并提供不超过500字的理由说明。"
-            f"返回格式：\n"
-            f"{{\n"
-            f'  "worth_maintaining": "是" 或 "否",\n'
-            f'  "reasoning": "理由说明"\n'
-            f"}}"
+            f"请复核以下项目在2020年之前传统手工开发模式（没有AI辅助工具）下的研发投入估算，并判断是否值得继续维护。\n"
+            f"文件数量：{len(analysis_results['files_analyzed'])}\n"
+            f"各语言代码行数：{json.dumps(code_lines, ensure_ascii=False)}\n"
+            f"代码度量：可维护性指数 {metrics.get('maintainability_index')}（等级 {metrics.get('rating')}），"
+            f"函数 {metrics.get('functions')} 个，平均圈复杂度 {metrics.get('avg_complexity')}，"
+            f"复杂函数占比 {metrics.get('complex_function_ratio')}，平均函数长度 {metrics.get('avg_function_lines')} 行\n"
+            f"风险统计：{json.dumps(self._get_risk_counts(analysis_results), ensure_ascii=False)}\n"
+            f"本地COCOMO估算：{cost_estimate} 人/日（{cost_model['person_months']} 人月，"
+            f"{cost_model['mode']}模式，产品复杂度等级 {cost_model['complexity']}）\n"
+            f"本地维护建议：{maintenance_recommendation['worth_maintaining']}，{maintenance_recommendation['reasoning']}\n"
+            f"只返回一个JSON对象，不要包含其他内容，格式：\n"
+            f'{{"cost_estimate": 人/日（数字，精确到小数点后两位）, "worth_maintaining": "是" 或 "否", '
+            f'"reasoning": "不超过500字的理由说明"}}'
         )
-        
         try:
             provider = next(iter(self.llm_configs.keys()))
-            result = await self._call_llm_api(provider, prompt)
-            
-            # 尝试解析返回的JSON
-            import json
+            response = await self._call_llm_api(provider, prompt)
+        except Exception as e:
+            print(f"大模型复核投入估算和维护建议时出错: {e}，使用本地估算结果")
+            return cost_estimate, maintenance_recommendation
+
+        start = response.find("{")
+        end = response.rfind("}")
+        parsed = None
+        if start != -1 and end > start:
             try:
-                parsed_result = json.loads(result)
-                return {
-                    "worth_maintaining": parsed_result.get("worth_maintaining", "否"),
-                    "reasoning": parsed_result.get("reasoning", "无法解析AI返回的建议")
-                }
+                parsed = json.loads(response[start:end + 1])
             except json.JSONDecodeError:
-                # 如果不是JSON格式，尝试从文本中提取信息
-                lines = result.split('\n')
-                worth_maintaining = "否"  # 默认值
-                reasoning = "未能从AI响应中提取到明确的维护建议"
-                
-                for line in lines:
-                    if "【此项目是否值得继续维护】" in line or "worth_maintaining" in line:
-                        if "是" in line:
-                            worth_maintaining = "是"
-                        elif "否" in line:
-                            worth_maintaining = "否"
-                    elif "【原因说明】" in line or "reasoning" in line:
-                        reasoning = line.replace("【原因生明】:", "").replace("reasoning:", "").strip()
-                
-                return {
-                    "worth_maintaining": worth_maintaining,
-                    "reasoning": reasoning
-                }
-        except Exception as e:
-            print(f"获取维护建议时出错: {e}")
-            return {
-                "worth_maintaining": "否",
-                "reasoning": f"获取AI建议时发生错误: {str(e)}"
-            }
+                parsed = None
+        return merge_refinement(parsed, cost_estimate, maintenance_recommendation)
 
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -347,6 +817,47 @@ class CdanalyzerAgentSkill:
             report_format = inputs.get("report_format", ["html", "pdf", "txt"])
             report_path = inputs.get("report_path", "./reports")
             ui_mode = inputs.get("ui_mode", False)
+            parallel_workers = int(inputs.get("parallel_workers", 1))
+            parallel_chunk_size = int(inputs.get("parallel_chunk_size", 64))
+            use_analysis_cache = inputs.get("use_analysis_cache", True)
+            changed_since = inputs.get("changed_since")
+            use_gitignore = bool(inputs.get("use_gitignore", False))
+            walk_workers = int(inputs.get("walk_workers", 8))
+            parallel_reports = bool(inputs.get("parallel_reports", True))
+            # 指定trace_path时同时启用埋点
+            trace_path = inputs.get("trace_path")
+            collect_metrics = bool(inputs.get("collect_metrics", False)) or bool(trace_path)
+            instrumentation = Instrumentation() if collect_metrics else NULL_INSTRUMENTATION
+            self.instrumentation = instrumentation
+            for key, input_key in (("mode", "pdf_report_mode"),
+                                   ("max_issues", "pdf_max_issues"),
+                                   ("top_k", "pdf_top_k"),
+                                   ("chunk_rows", "pdf_chunk_rows"),
+                                   ("group_by_file", "pdf_group_by_file"),
+                                   ("font_path", "pdf_font_path")):
+                if inputs.get(input_key) is not None:
+                    self.pdf_report_config[key] = inputs[input_key]
+            for key, input_key in (("enabled", "use_external_analyzers"),
+                                   ("timeout", "analyzer_timeout"),
+                                   ("timeouts", "analyzer_tool_timeouts"),
+                                   ("batch_size", "analyzer_batch_size"),
+                                   ("max_complexity", "max_complexity"),
+                                   ("security_scan", "security_scan")):
+                if inputs.get(input_key) is not None:
+                    self.analyzer_config[key] = inputs[input_key]
+            for key, input_key in (("enabled", "detect_clones"),
+                                   ("min_lines", "clone_min_lines")):
+                if inputs.get(input_key) is not None:
+                    self.clone_config[key] = inputs[input_key]
+            for key, input_key in (("mode", "cost_model_mode"),
+                                   ("llm_refine", "llm_cost_refinement")):
+                if inputs.get(input_key) is not None:
+                    self.cost_config[key] = inputs[input_key]
+            for key, input_key in (("mode", "html_report_mode"),
+                                   ("virtual_threshold", "html_virtual_threshold"),
+                                   ("sidecar", "html_data_sidecar")):
+                if inputs.get(input_key) is not None:
+                    self.html_report_config[key] = inputs[input_key]
 
             # 获取大模型配置参数
             llm_provider = inputs.get("llm_provider")
@@ -355,6 +866,32 @@ class CdanalyzerAgentSkill:
             llm_model = inputs.get("llm_model")
             llm_top_p = inputs.get("llm_top_p", 0.7)  # 默认top_p值
             
+            # 大模型HTTP连接池配置
+            for key, input_key in (("max_connections", "llm_max_connections"),
+                                   ("max_keepalive_connections", "llm_max_keepalive_connections"),
+                                   ("keepalive_expiry", "llm_keepalive_expiry"),
+                                   ("http2", "llm_http2")):
+                if inputs.get(input_key) is not None:
+                    self.llm_http_config[key] = inputs[input_key]
+            if inputs.get("llm_batch_tokens") is not None:
+                self.llm_batch_tokens = int(inputs["llm_batch_tokens"])
+
+            # AI建议缓存配置，缓存保存在报告目录下
+            self.suggestion_cache_config["enabled"] = bool(inputs.get("use_suggestion_cache", True))
+            self.suggestion_cache_config["cache_dir"] = report_path
+            for key, input_key in (("ttl", "suggestion_cache_ttl"), ("max_entries", "suggestion_cache_max_entries")):
+                if inputs.get(input_key) is not None:
+                    self.suggestion_cache_config[key] = inputs[input_key]
+
+            # 大模型请求调度配置
+            for key, input_key in (("max_in_flight", "llm_max_concurrency"),
+                                   ("requests_per_minute", "llm_requests_per_minute"),
+                                   ("tokens_per_minute", "llm_tokens_per_minute"),
+                                   ("max_retries", "llm_max_retries")):
+                if inputs.get(input_key) is not None:
+                    self.llm_scheduler_config[key] = inputs[input_key]
+            self._reset_llm_http_metrics()
+
             # 获取是否使用大模型的配置项
             use_llm = inputs.get("use_llm_config")
             if use_llm is not None:
@@ -403,12 +940,27 @@ class CdanalyzerAgentSkill:
             # 验证输入参数
             if not target_path or not os.path.exists(target_path):
                 raise ValueError(f"目标路径不存在: {target_path}")
+            self._reset_progress()
+            self._report_progress("analyzing")
 
             # 显示当前大模型配置信息
             self.show_llm_configs()
 
             # 确认被测件
-            file_list, detected_languages = self._identify_target_files(target_path, exclude_patterns)
+            baseline_files = None
+            if changed_since:
+                # 只分析自指定git版本以来变更的文件，其余文件的统计从缓存基线中获取
+                with instrumentation.span("discovery"):
+                    file_list, detected_languages, baseline_files = await asyncio.to_thread(
+                        self._identify_changed_files, target_path, exclude_patterns, changed_since
+                    )
+                file_walker = None
+            else:
+                # 并行遍历目录，发现的文件直接进入分析；语言类型在遍历完成前无法得知，
+                # 因此对所有支持的语言确认分析标准（只有实际出现的语言会产生分析结果）
+                file_walker = self._create_file_walker(target_path, exclude_patterns, use_gitignore, walk_workers)
+                file_list = iter(file_walker)
+                detected_languages = list(SUPPORTED_LANGUAGES)
             
             # 如果没有明确指定语言类型，使用检测到的语言类型
             if not language_types:
@@ -417,113 +969,227 @@ class CdanalyzerAgentSkill:
             # 确认分析标准
             standards_to_use = self._confirm_analysis_standards(language_types, analysis_standard)
 
-            print(f"\nDEBUG: 执行完成，返回结果: unknown")
-            print(f"配置的大模型数量: {len(self.llm_configs)}")
-            if self.llm_configs:
-                print(f"已配置的大模型: {list(self.llm_configs.keys())}")
-            else:
-                print("警告: 没有配置任何大模型")
-
             # 创建临时目录存储中间结果
             with tempfile.TemporaryDirectory() as temp_dir:
-                # 执行代码质量分析
+                # 执行代码质量分析（目录遍历在分析开始时同时开始）
+                analysis_started = time.perf_counter()
                 analysis_results = await self._perform_analysis(
                     file_list, 
                     standards_to_use, 
-                    temp_dir
+                    temp_dir,
+                    workers=parallel_workers,
+                    chunk_size=parallel_chunk_size,
+                    cache_dir=report_path if use_analysis_cache else None,
+                    baseline_files=baseline_files,
+                    # 固定使用虚拟化表格时无需在分析过程中生成HTML表格行
+                    stream_formats=[fmt for fmt in report_format
+                                    if not (fmt == "html" and self.html_report_config["mode"] == "virtual")]
                 )
-
-                # 计算新增功能的数据
-                total_files = len(analysis_results['files_analyzed'])
-                total_lines = sum(stat['lines'] for stat in analysis_results['language_stats'].values())
-                
-                # 计算研发历史投入估算和维护建议
-                cost_estimate = 0.00
-                maintenance_recommendation = None
-                if self.use_llm_config == 0:  # 只有在启用大模型时才进行计算
-                    cost_estimate = await self._estimate_development_cost(total_files, total_lines)
-                    maintenance_recommendation = await self._get_maintenance_recommendation(
-                        total_files, total_lines, analysis_results["language_stats"], cost_estimate
-                    )
+                if file_walker is not None:
+                    analysis_results["walk_stats"] = file_walker.stats()
+                    instrumentation.add_span("discovery", analysis_started, file_walker.elapsed, track="walk")
+                    print(f"【目录遍历：{file_walker.files} 个文件，{file_walker.dirs} 个目录，"
+                          f"{analysis_results['walk_stats']['files_per_sec']:.0f} 文件/秒】")
+
+                # 根据代码度量在本地计算研发历史投入估算和维护建议，需要时由大模型在一次请求中复核
+                self._report_progress("assessment")
+                with instrumentation.span("assessment"):
+                    cost_model = self._estimate_development_cost(analysis_results)
+                    cost_estimate = cost_model["person_days"]
+                    maintenance_recommendation = self._get_maintenance_recommendation(analysis_results)
+                    if self.cost_config["llm_refine"] and self.use_llm_config == 0:
+                        cost_estimate, maintenance_recommendation = await self._refine_assessment(
+                            analysis_results, cost_model, maintenance_recommendation
+                        )
 
                 # 生成报告
-                report_paths = self._generate_reports(
-                    analysis_results, 
-                    report_path, 
-                    report_format, 
-                    target_path,
-                    cost_estimate,
-                    maintenance_recommendation
-                )
+                self._report_progress("reports")
+                with instrumentation.span("reports"):
+                    report_paths, report_timings = await self._generate_reports(
+                        analysis_results,
+                        report_path,
+                        report_format,
+                        target_path,
+                        cost_estimate,
+                        maintenance_recommendation,
+                        parallel=parallel_reports
+                    )
 
             # 返回结果
-            summary = self._create_summary(analysis_results, file_list, target_path)
+            summary = self._create_summary(analysis_results, analysis_results["files_analyzed"], target_path)
+            if changed_since:
+                summary["changed_since"] = changed_since
+            summary["cost_estimate"] = cost_estimate
+            summary["cost_model"] = cost_model
+            summary["maintenance_recommendation"] = maintenance_recommendation
              
-            return {
+            result = {
                 "success": True,
                 "report_paths": report_paths,
                 "summary": summary,
+                "report_timings": report_timings,
                 "message": "代码质量分析完成"
             }
+            if self._llm_http_metrics["requests"] or self._suggestion_stats["issues"]:
+                result["llm_metrics"] = self.get_llm_http_metrics()
+            if instrumentation.enabled:
+                result["metrics"] = self._collect_run_metrics(analysis_results)
+                if trace_path:
+                    instrumentation.write_chrome_trace(trace_path)
+                    result["trace_path"] = trace_path
+            self._report_progress("done")
+            return result
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e),
                 "message": "代码质量分析失败"
             }
+        finally:
+            # 关闭本次执行使用的HTTP连接池
+            await self.close_http_client()
+
+    def _collect_run_metrics(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        汇总本次执行的埋点：在阶段耗时之外补充文件数、问题数、缓存命中、大模型请求数、大模型延迟直方图（毫秒）
+        以及分析阶段的吞吐量（files_per_sec为全部文件，bytes_per_sec为重新分析的文件）
 
-    def _identify_target_files(self, target_path: str, exclude_patterns: List[str]) -> Tuple[List[str], List[str]]:
+        Returns:
+            Instrumentation.result()
+        """
+        instrumentation = self.instrumentation
+        files = len(analysis_results["files_analyzed"])
+        instrumentation.count("files", files)
+        instrumentation.count("issues", sum(analysis_results["risk_counts"].values()))
+        cache_stats = analysis_results.get("cache_stats")
+        if cache_stats:
+            instrumentation.count("cache_hits", cache_stats["hits"])
+            instrumentation.count("cache_misses", cache_stats["misses"])
+        instrumentation.count("suggestion_cache_hits", self._suggestion_stats["cache_hits"])
+        instrumentation.count("llm_requests", self._llm_http_metrics["requests"])
+        for latency in self._llm_http_metrics["latencies"]:
+            instrumentation.observe("llm_latency_ms", latency * 1000)
+
+        analysis_seconds = instrumentation.stage_seconds("analysis")
+        if analysis_seconds:
+            instrumentation.gauge("files_per_sec", files / analysis_seconds)
+            instrumentation.gauge("bytes_per_sec", instrumentation.counters.get("bytes", 0) / analysis_seconds)
+        return instrumentation.result()
+
+    def _identify_target_files(self, target_path: str, exclude_patterns: List[str],
+                               use_gitignore: bool = False, workers: int = 8) -> Tuple[List[str], List[str]]:
         """
         识别目标文件并检测编程语言类型
+
+        Args:
+            use_gitignore: 是否同时应用目标目录（及其子目录）中.gitignore文件的排除规则
+            workers: 并行遍历目录的线程数
+
+        Returns:
+            (按路径排序的文件列表, 检测到的语言类型)
         """
         file_list = []
-        language_extensions = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'cpp',
-            '.cs': 'csharp',
-            '.go': 'go',
-            '.rb': 'ruby',
-            '.php': 'php'
-        }
         detected_languages = set()
+        for file_path, lang in self._create_file_walker(target_path, exclude_patterns, use_gitignore, workers):
+            file_list.append(file_path)
+            detected_languages.add(lang)
+        file_list.sort()
+        return file_list, list(detected_languages)
 
-        target_path_obj = Path(target_path)
-        
-        if target_path_obj.is_file():
-            # 单个文件
-            ext = target_path_obj.suffix.lower()
-            if ext in language_extensions:
-                detected_languages.add(language_extensions[ext])
-                file_list.append(str(target_path_obj))
-        else:
-            # 项目目录
-            for root, dirs, files in os.walk(target_path):
-                # 过滤排除的目录
-                dirs[:] = [d for d in dirs if not self._should_exclude(d, exclude_patterns)]
-                
-                for file in files:
-                    if not self._should_exclude(file, exclude_patterns):
-                        file_path = os.path.join(root, file)
-                        ext = Path(file_path).suffix.lower()
-                        
-                        if ext in language_extensions:
-                            detected_languages.add(language_extensions[ext])
-                            file_list.append(file_path)
+    def _create_file_walker(self, target_path: str, exclude_patterns: List[str],
+                            use_gitignore: bool = False, workers: int = 8) -> ParallelWalker:
+        """
+        创建并行目录遍历器，迭代产出 (文件路径, 语言类型)，遍历结束后可通过stats()获取遍历速度
+        """
+        return ParallelWalker(target_path, self._get_exclude_matcher(exclude_patterns),
+                              detect_language, use_gitignore=use_gitignore, workers=workers)
+
+    def _identify_changed_files(
+        self,
+        target_path: str,
+        exclude_patterns: List[str],
+        changed_since: str
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """
+        使用本地git命令识别自指定版本以来变更的文件（无需访问网络）
 
-        return file_list, list(detected_languages)
+        变更文件包括相对于changed_since有修改或新增的已跟踪文件（含未提交的修改）以及未跟踪的新文件。
+
+        Returns:
+            (变更文件列表, 变更文件的语言类型, 未变更文件列表)，未变更文件用于从缓存基线汇总全仓统计
+        """
+        target_real = os.path.realpath(target_path)
+        work_dir = target_real if os.path.isdir(target_real) else os.path.dirname(target_real)
+        repo_root = self._run_git(work_dir, "rev-parse", "--show-toplevel").strip()
+
+        changed = set()
+        deleted = set()
+        entries = self._run_git(repo_root, "diff", "--name-status", "--no-renames", "-z", changed_since, "--").split("\0")
+        for status, rel_path in zip(entries[0::2], entries[1::2]):
+            if status.startswith("D"):
+                deleted.add(rel_path)
+            else:
+                changed.add(rel_path)
+        changed.update(p for p in self._run_git(repo_root, "ls-files", "--others", "--exclude-standard", "-z").split("\0") if p)
+        tracked = [p for p in self._run_git(repo_root, "ls-files", "-z").split("\0") if p]
+
+        matcher = self._get_exclude_matcher(exclude_patterns)
+        file_list = []
+        baseline_files = []
+        detected_languages = set()
+        for rel_path in sorted(changed.union(tracked) - deleted):
+            abs_path = os.path.normpath(os.path.join(repo_root, rel_path))
+            if abs_path == target_real:
+                file_path = target_path
+            elif abs_path.startswith(target_real.rstrip(os.sep) + os.sep):
+                rel_to_target = os.path.relpath(abs_path, target_real)
+                parts = rel_to_target.split(os.sep)
+                if any(matcher.excluded(part, "/".join(parts[:i + 1]), is_dir=i < len(parts) - 1)
+                       for i, part in enumerate(parts)):
+                    continue
+                # 与全量遍历生成的路径保持一致，以便命中缓存基线
+                file_path = os.path.join(target_path, rel_to_target)
+            else:
+                continue
+
+            lang = detect_language(os.path.basename(file_path), file_path)
+            if not lang:
+                continue
+            if rel_path in changed:
+                if os.path.isfile(file_path):
+                    file_list.append(file_path)
+                    detected_languages.add(lang)
+            else:
+                baseline_files.append(file_path)
+
+        print(f"【自 {changed_since} 以来共有 {len(file_list)} 个变更文件】")
+        return file_list, list(detected_languages), baseline_files
+
+    def _run_git(self, cwd: str, *args: str) -> str:
+        """
+        执行本地git命令并返回标准输出
+        """
+        try:
+            completed = subprocess.run(
+                ["git", *args], cwd=cwd, capture_output=True, check=True
+            )
+        except FileNotFoundError:
+            raise ValueError("未找到git命令，无法使用changed_since模式")
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git命令执行失败: {e.stderr.decode('utf-8', errors='ignore').strip()}")
+        return os.fsdecode(completed.stdout)
 
     def _should_exclude(self, name: str, exclude_patterns: List[str]) -> bool:
         """
         检查是否应该排除某个文件或目录
         """
-        for pattern in exclude_patterns:
-            if fnmatch.fnmatch(name, pattern):
-                return True
-        return False
+        return self._get_exclude_matcher(exclude_patterns).excluded(name)
+
+    def _get_exclude_matcher(self, exclude_patterns: List[str]) -> ExcludeMatcher:
+        """
+        获取排除模式对应的预编译匹配器，相同的模式列表只编译一次
+        """
+        return self._exclude_matchers.get(exclude_patterns)
 
     def _confirm_analysis_standards(self, language_types: List[str], custom_standards: Dict[str, str]) -> Dict[str, str]:
         """
@@ -544,174 +1210,796 @@ class CdanalyzerAgentSkill:
 
     async def _perform_analysis(
         self, 
-        file_list: List[str], 
+        file_list: Iterable[Any], 
         standards: Dict[str, str], 
-        temp_dir: str
+        temp_dir: str,
+        workers: int = 1,
+        chunk_size: int = 64,
+        cache_dir: str = None,
+        baseline_files: List[str] = None,
+        stream_formats: List[str] = None
     ) -> Dict[str, Any]:
         """
         执行代码质量分析
+
+        问题不在内存中累积：逐条写入临时目录下的spool文件，风险统计和行数统计在写入时同步汇总。
+
+        Args:
+            file_list: 待分析文件列表，或边遍历目录边产出 (文件路径, 语言类型) 的迭代器
+            workers: 并行分析的工作进程数，1为串行执行，0表示使用全部CPU核心
+            chunk_size: 进程池模式下每个任务分配的文件数
+            cache_dir: 增量分析缓存所在目录，为None时不使用缓存
+            baseline_files: 不需要分析、只从缓存基线汇总行数统计的文件（changed_since模式）
+            stream_formats: 需要在分析过程中实时生成问题明细的报告格式（html、txt）
+
+        Returns:
+            分析结果，其中issues_found为可重复遍历的IssueSink
         """
+        sink = IssueSink(temp_dir)
+        row_formatters = {"html": self._format_html_issue_row, "txt": self._format_text_issue_row}
+        for fmt in stream_formats or []:
+            if fmt in row_formatters:
+                sink.add_row_writer(fmt, row_formatters[fmt])
+
+        files_analyzed = []
         analysis_results = {
-            "files_analyzed": file_list,
-            "issues_found": [],
-            "language_stats": defaultdict(lambda: {"lines": 0, "files": 0})
+            "files_analyzed": files_analyzed,
+            "issues_found": sink,
+            "language_stats": defaultdict(lambda: {"files": 0, **empty_line_stats()}),
+            "risk_counts": sink.risk_counts
         }
 
-        # 输出待分析文件总数
-        total_files = len(file_list)
-        print(f"【共发现 {total_files} 个待分析的文件】")
-        
-        # 统计各语言代码行数
-        for file_path in file_list:
-            ext = Path(file_path).suffix.lower()
-            lang = self._get_language_from_extension(ext)
-            
-            if lang:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = len(f.readlines())
-                    analysis_results["language_stats"][lang]["lines"] += lines
-                    analysis_results["language_stats"][lang]["files"] += 1
-
-        # 模拟分析过程（实际应用中这里会调用具体的分析工具）
-        for i, file_path in enumerate(file_list):
-            ext = Path(file_path).suffix.lower()
-            lang = self._get_language_from_extension(ext)
-            
-            if lang in standards:
-                # 这里模拟分析结果，实际应用中需要替换为真实的分析工具调用
-                fake_issues = self._generate_fake_issues(file_path, lang, i)
-                analysis_results["issues_found"].extend(fake_issues)
+        # 输出待分析文件总数（边遍历边分析时总数在遍历结束后才能确定）
+        if isinstance(file_list, list):
+            print(f"【共发现 {len(file_list)} 个待分析的文件】")
 
-            # 显示进度
-            percent_complete = (i + 1) / total_files * 100
-            print(f"\r【已分析 {i + 1} 个文件】 - 进度: {percent_complete:.1f}%", end="", flush=True)
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        chunk_size = max(1, chunk_size)
 
-        # 在分析完成后换行，以便后续输出更整洁
-        print("") 
+        # 文件到达时检查增量缓存，只有未命中的文件需要重新分析（缓存读写都在线程中执行，不阻塞事件循环）
+        cache = await asyncio.to_thread(AnalysisCache, cache_dir, self.version) if cache_dir else None
 
-        # 为每个问题获取AI建议
-        if analysis_results["issues_found"]:
-            ai_suggestions = await self._get_ai_suggestions(analysis_results["issues_found"])
-            
-            # 将AI建议添加到问题中
-            for idx, issue in enumerate(analysis_results["issues_found"]):
-                issue["ai_suggestion"] = ai_suggestions[idx] if idx < len(ai_suggestions) else "获取AI建议失败"
+        # 需要大模型建议时，问题先写入原始spool，分析完成后分批获取建议再进入报告
+        raw_spool = IssueSpool(temp_dir, "raw_issues_") if self.use_llm_config == 0 else None
 
+        def add_issue(issue: Dict[str, Any]):
+            if raw_spool is None:
+                issue["ai_suggestion"] = "无"
+                sink.add(issue)
+            else:
+                raw_spool.add(issue)
+
+        # 重复代码检测需要全部文件：重新分析的文件在读取时已计算指纹，缓存命中的文件使用缓存的指纹，
+        # 缓存中没有指纹的文件在分析完成后补算
+        clone_files = [] if self.clone_config["enabled"] else None
+        clone_pending = []
+        metrics = MetricsAggregator()
+        instrumentation = self.instrumentation
+        analysis_started = time.perf_counter()
+        skipped = 0
+        try:
+            # 单次遍历完成行数统计和问题分析，结果按文件顺序合并以保证确定性
+            async for i, file_result, from_cache in self._iter_analyzed_files(
+                file_list, cache, standards, workers, chunk_size
+            ):
+                # 发现后被删除或无法读取的文件不计入结果
+                if file_result.get("skipped"):
+                    skipped += 1
+                    continue
+                files_analyzed.append(file_result["file"])
+                lang = file_result["language"]
+                if lang:
+                    lang_stats = analysis_results["language_stats"][lang]
+                    lang_stats["files"] += 1
+                    for key, value in file_result["line_stats"].items():
+                        lang_stats[key] += value
+                    if clone_files is not None:
+                        if "fingerprints" in file_result:
+                            clone_files.append((file_result["file"], lang, file_result["fingerprints"]))
+                        else:
+                            clone_pending.append((file_result["file"], lang))
+                    if file_result.get("metrics"):
+                        metrics.add(file_result["file"], lang, file_result["metrics"], file_result["line_stats"]["code"])
+
+                if cache and not from_cache:
+                    cache.store(file_result, self._standard_for_file(file_result["file"], standards, lang,
+                                                                     file_result.get("analyzer_fallback", False)))
+                    # 每个分块提交一次，写事务很短，同一报告目录的其他任务不会长时间等待写锁
+                    if cache.pending >= chunk_size:
+                        await asyncio.to_thread(cache.commit)
+
+                # 问题数随下一次进度通知一并发出
+                self.progress["issues_found"] += len(file_result["issues"])
+                for issue in file_result["issues"]:
+                    add_issue(issue)
+            instrumentation.add_span("analysis", analysis_started, time.perf_counter() - analysis_started)
+
+            # 在分析完成后换行，以便后续输出更整洁
+            print("") 
+            if not isinstance(file_list, list):
+                print(f"【共分析 {len(files_analyzed)} 个文件】")
+            if skipped:
+                print(f"⚠ 警告：{skipped} 个文件在分析前被删除或无法读取，已跳过")
+
+            if cache:
+                await asyncio.to_thread(cache.commit)
+                print(f"【增量缓存命中 {cache.hits} 个文件，重新分析 {cache.misses} 个文件】")
+
+            if baseline_files is not None:
+                await asyncio.to_thread(self._merge_baseline_stats, analysis_results, cache, baseline_files, metrics,
+                                        clone_files, clone_pending)
+
+            if clone_files or clone_pending:
+                self._report_progress("clones")
+                # changed_since模式下未变更的文件也参与检测，重复率覆盖全仓，只报告位于变更文件中的重复片段
+                report_files = set(files_analyzed) if baseline_files is not None else None
+                with instrumentation.span("clones"):
+                    clone_stats = await self._detect_clones(clone_files, clone_pending, workers, chunk_size, report_files)
+                clone_issues = clone_stats.pop("issues")
+                for issue in clone_issues:
+                    add_issue(issue)
+                self._report_progress(issues_found=self.progress["issues_found"] + len(clone_issues))
+                clone_languages = clone_stats.pop("languages")
+                for lang, lang_stats in analysis_results["language_stats"].items():
+                    duplication = clone_languages.get(lang, {})
+                    lang_stats["duplicated_lines"] = duplication.get("duplicated_lines", 0)
+                    lang_stats["duplication"] = duplication.get("duplication", 0.0)
+                analysis_results["clone_stats"] = clone_stats
+            analysis_results["metrics"] = metrics.result()
+
+            # 分批为问题获取AI建议，每批处理完即写入报告明细
+            if raw_spool:
+                self._report_progress("suggestions")
+                raw_spool.close()
+                with instrumentation.span("suggestions"):
+                    for batch in raw_spool.iter_batches(SUGGESTION_SPOOL_BATCH_SIZE):
+                        ai_suggestions = await self._get_ai_suggestions(batch)
+                        for idx, issue in enumerate(batch):
+                            issue["ai_suggestion"] = ai_suggestions[idx] if idx < len(ai_suggestions) else "获取AI建议失败"
+                            sink.add(issue)
+        finally:
+            sink.close()
+            if raw_spool is not None:
+                raw_spool.close()
+            if cache:
+                analysis_results["cache_stats"] = cache.stats()
+                await asyncio.to_thread(cache.close)
+
+        analysis_results["total_lines"] = sum(
+            lang_stat["lines"] for lang_stat in analysis_results["language_stats"].values()
+        )
         return analysis_results
 
-    def _get_language_from_extension(self, ext: str) -> str:
+    async def _detect_clones(self, fingerprinted: List[Tuple[str, str, Any]], pending: List[Tuple[str, str]],
+                             workers: int, chunk_size: int, report_files: Set[str] = None) -> Dict[str, Any]:
         """
-        根据文件扩展名获取语言类型
+        检测重复代码：已有指纹（分析阶段计算或来自缓存）的文件直接使用，其余文件按块补算指纹（多个工作进程时在进程池中计算，
+        任务被取消时未开始的分块随之取消，否则在线程中计算），再按文件路径排序后统一建立索引查找重复（在线程中执行），
+        全程不阻塞事件循环
+
+        Args:
+            fingerprinted: (文件路径, 语言类型, 指纹)
+            pending: 需要补算指纹的 (文件路径, 语言类型)
+            report_files: 不为None时只报告复制方位于这些文件中的重复片段（重复率仍按全部文件统计）
+
+        Returns:
+            CloneDetector.detect()的结果，附加耗时seconds
         """
-        ext_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'cpp',
-            '.cs': 'csharp',
-            '.go': 'go',
-            '.rb': 'ruby',
-            '.php': 'php'
-        }
-        return ext_map.get(ext)
+        started = time.perf_counter()
+        entries = list(fingerprinted)
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        if (workers > 1 or self.shared_executor is not None) and len(chunks) > 1:
+            loop = asyncio.get_running_loop()
+            with self._process_pool(workers) as executor:
+                fingerprints = await asyncio.gather(
+                    *(loop.run_in_executor(executor, fingerprint_files, chunk) for chunk in chunks)
+                )
+                for chunk, chunk_fingerprints in zip(chunks, fingerprints):
+                    entries.extend((file_path, lang, file_fingerprints)
+                                   for (file_path, lang), file_fingerprints in zip(chunk, chunk_fingerprints))
+        else:
+            fingerprints = await asyncio.to_thread(fingerprint_files, pending)
+            entries.extend((file_path, lang, file_fingerprints)
+                           for (file_path, lang), file_fingerprints in zip(pending, fingerprints))
+
+        clone_stats = await asyncio.to_thread(self._find_clones, entries)
+        if report_files is not None:
+            clone_stats["issues"] = [issue for issue in clone_stats["issues"] if issue["file"] in report_files]
+        clone_stats["seconds"] = round(time.perf_counter() - started, 4)
+        print(f"【重复代码检测：{clone_stats['files']} 个文件，重复率 {clone_stats['duplication']}%，"
+              f"发现 {len(clone_stats['issues'])} 处较大的重复片段，耗时 {clone_stats['seconds']} 秒】")
+        return clone_stats
+
+    def _find_clones(self, entries: List[Tuple[str, str, Any]]) -> Dict[str, Any]:
+        """
+        按文件路径排序后建立指纹索引并查找重复（CloneDetector.detect()的结果）
+        """
+        detector = CloneDetector(self.clone_config["min_lines"])
+        for file_path, lang, file_fingerprints in sorted(entries, key=lambda entry: entry[0]):
+            detector.add(file_path, lang, file_fingerprints)
+        return detector.detect()
+
+    def _merge_baseline_stats(self, analysis_results: Dict[str, Any], cache: AnalysisCache, baseline_files: List[str],
+                              metrics: MetricsAggregator = None, clone_files: List[Tuple[str, str, Any]] = None,
+                              clone_pending: List[Tuple[str, str]] = None):
+        """
+        将未变更文件在缓存基线中的行数统计合并到language_stats（代码度量合并到metrics），得到全仓统计
 
-    def _generate_fake_issues(self, file_path: str, language: str, index: int) -> List[Dict[str, Any]]:
+        Args:
+            clone_files: 不为None时（启用重复代码检测）将缓存中的指纹加入其中，
+                没有缓存指纹的未变更文件加入clone_pending，检测时重新计算
         """
-        生成模拟的问题数据（实际应用中应替换为真实分析结果）
+        baseline = cache.baseline_stats(baseline_files, fingerprints=clone_files is not None) if cache else {}
+        missing = len(baseline_files) - len(baseline)
+        for file_path, entry in baseline.items():
+            lang = entry["language"]
+            if not lang:
+                continue
+            line_stats = entry["line_stats"]
+            lang_stats = analysis_results["language_stats"][lang]
+            lang_stats["files"] += 1
+            for key, value in line_stats.items():
+                lang_stats[key] += value
+            if metrics is not None and entry["metrics"]:
+                metrics.add(file_path, lang, entry["metrics"], line_stats["code"])
+            if clone_files is not None:
+                if "fingerprints" in entry:
+                    clone_files.append((file_path, lang, entry["fingerprints"]))
+                else:
+                    clone_pending.append((file_path, lang))
+        if clone_files is not None and missing:
+            for file_path in baseline_files:
+                if file_path not in baseline:
+                    lang = detect_language(os.path.basename(file_path), file_path)
+                    if lang:
+                        clone_pending.append((file_path, lang))
+
+        analysis_results["baseline_stats"] = {"files": len(baseline), "missing": missing}
+        if missing:
+            print(f"⚠ 警告：{missing} 个未变更文件没有缓存基线，全仓统计可能不完整，请先执行一次全量分析")
+
+    def _standard_for_file(self, file_path: str, standards: Dict[str, str], language: Optional[str] = None,
+                           fallback: bool = False) -> str:
         """
-        issues = []
-        
-        # 根据索引和语言类型生成一些模拟问题
-        base_issues = [
-            {
-                "file": file_path,
-                "line": 10 + index,
-                "severity": "medium",
-                "type": "potential_bug",
-                "message": f"可能存在的潜在错误 ({language})",
-                "solution": "仔细检查变量使用和边界条件"
-            },
-            {
-                "file": file_path,
-                "line": 25 + index,
-                "severity": "low",
-                "type": "style_issue",
-                "message": "代码风格不符合规范",
-                "solution": "遵循PEP8或其他语言特定的代码规范"
-            }
-        ]
-        
-        # 随机添加更多问题
-        import random
-        if random.random() > 0.5:
-            base_issues.append({
-                "file": file_path,
-                "line": 5 + index * 2,
-                "severity": "high",
-                "type": "security_vulnerability",
-                "message": "安全漏洞：未经验证的输入",
-                "solution": "对所有用户输入进行验证和清理"
-            })
-        
-        if index % 3 == 0:
-            base_issues.append({
-                "file": file_path,
-                "line": 40 + index,
-                "severity": "critical",
-                "type": "critical_error",
-                "message": "严重错误：可能导致程序崩溃",
-                "solution": "检查空指针引用和资源释放"
-            })
-        
-        return base_issues
+        获取文件所使用的分析标准（含分析引擎标识，见analyzers.engine_key；追加代码度量版本，启用安全扫描时追加扫描规则版本），
+        未参与分析的文件返回None
+
+        Args:
+            language: 已识别的语言类型，为None时根据文件识别
+            fallback: 结果是否来自外部工具运行失败后的内置分析器（按内置分析器的引擎标识写入缓存）
+        """
+        lang = language or detect_language(os.path.basename(file_path), file_path)
+        if not lang:
+            return None
+        standard = engine_key(standards.get(lang), self.analyzer_config, self._builtin_engine(lang), fallback)
+        standard = f"{standard or ''}+metrics-v{METRICS_VERSION}"
+        if self.analyzer_config["security_scan"]:
+            standard += f"+secscan-v{RULESET_VERSION}"
+        return standard
+
+    def _tag_language(self, item: Any) -> Tuple[str, Optional[str]]:
+        """
+        将待分析项统一为 (文件路径, 语言类型)：遍历器产出的项已带语言类型，单独的文件路径在此识别一次
+        """
+        if isinstance(item, tuple):
+            return item
+        return item, detect_language(os.path.basename(item), item)
+
+    def _is_valid_ai_suggestion(self, suggestion: str) -> bool:
+        """
+        判断AI建议是否为大模型成功返回的内容（而非失败提示或占位文本）
+        """
+        if not suggestion:
+            return False
+        if suggestion in ("无", "未配置大模型API", "未获取到AI建议"):
+            return False
+        return not suggestion.startswith("获取AI建议失败")
+
+    async def _iter_analyzed_files(
+        self,
+        files: Iterable[Any],
+        cache: Optional[AnalysisCache],
+        standards: Dict[str, str],
+        workers: int,
+        chunk_size: int
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any], bool]]:
+        """
+        按文件顺序逐个产出分析结果：缓存命中的文件读取缓存，其余文件重新分析
+
+        files可以是边遍历目录边产出的迭代器：文件按块取出后即检查缓存（只比较大小和修改时间，不读取内容），
+        未命中的文件凑满一块后立即分析，无需等待目录遍历结束。目录遍历、缓存检查和缓存读取按批在单独的线程中执行，
+        不阻塞事件循环（常驻服务中其他请求的响应和进度推送不受影响）。只有修改时间变化的文件（如CI中全新检出的仓库）随分块一起提交，
+        由工作进程校验内容哈希，内容未变时读取缓存结果。外部分析工具以块为单位批量调用；串行模式下分块在当前进程中分析，
+        并行模式下进程池在第一块凑满时才创建（文件数不足一块时直接在当前进程分析；常驻服务中始终使用共享进程池，
+        不阻塞服务的事件循环），
+        同时提交的分块数不超过工作进程数的2倍，已完成但尚未被消费的结果数量有上限。
+        迭代被提前结束（任务取消或出错）时，尚未开始的分块逐个取消（共享进程池中其他任务的分块不受影响），
+        自建的进程池不等待正在执行的分块即关闭，目录遍历随之停止。
+
+        Args:
+            files: 文件路径或 (文件路径, 语言类型)，语言类型随文件传递到工作进程，不再重复识别
+
+        Returns:
+            (文件序号, 分析结果, 是否来自缓存) 的异步迭代器
+        """
+        compute_hash = cache is not None
+        processed = 0
+        if isinstance(files, list):
+            self._report_progress(files_total=len(files))
+
+        loop = asyncio.get_running_loop()
+        executor = self.shared_executor
+        instrumentation = self.instrumentation
+        timed = instrumentation.enabled
+        # 目录遍历（等待扫描线程）、缓存检查（stat和查询SQLite）和缓存读取都会阻塞，按批在单独的线程中依次执行，
+        # 不阻塞事件循环；同一时刻只有一批在执行
+        blocking = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdanalyzer-discovery")
+
+        def run_blocking(func: Callable, *args: Any) -> asyncio.Future:
+            return asyncio.wrap_future(blocking.submit(func, *args))
+
+        iterator = iter(files)
+
+        def discover(start: int) -> List[Tuple[int, str, Optional[str], bool, Optional[str]]]:
+            # 取出下一批文件并检查缓存：(序号, 文件路径, 语言类型, 缓存是否有效, 待校验的内容哈希)
+            batch = []
+            for i, item in enumerate(islice(iterator, chunk_size), start):
+                file_path, lang = self._tag_language(item)
+                valid, expected_hash = (cache.probe(file_path, self._standard_for_file(file_path, standards, lang))
+                                        if cache else (False, None))
+                batch.append((i, file_path, lang, valid, expected_hash))
+            return batch
+
+        def load_cached(entries: List[Tuple[int, str, Optional[str]]]) -> List[Tuple[int, Dict[str, Any], bool]]:
+            loaded = []
+            for i, file_path, lang in entries:
+                cached = cache.load(file_path)
+                # 缓存记录在检查后被并发删除时退回重新分析
+                if cached is not None:
+                    loaded.append((i, cached, True))
+                else:
+                    loaded.append((i, self._analyze_single_file(file_path, i, standards, compute_hash, lang), False))
+            return loaded
+
+        async def chunk_results(future: asyncio.Future) -> List[Dict[str, Any]]:
+            # 启用埋点时分块结果附带各步骤的耗时，累加到计数器中
+            results = await future
+            if timed:
+                results, timings = results
+                for step, value in timings.items():
+                    instrumentation.count(step if step == "bytes" else f"{step}_seconds", value)
+            return results
+
+        # 待工作进程校验内容哈希的文件：序号 -> 缓存中的内容哈希
+        expected_hashes = {}
+
+        def submit(chunk: List[Tuple[int, str, Optional[str]]], last: bool = False) -> asyncio.Future:
+            nonlocal executor
+            if workers > 1 and executor is None and not last:
+                print(f"【并行分析模式：{workers} 个工作进程，每块 {chunk_size} 个文件】")
+                executor = ProcessPoolExecutor(max_workers=workers)
+            chunk_hashes = {index: expected_hashes[index] for index, _, _ in chunk if index in expected_hashes}
+            if executor is not None:
+                return loop.run_in_executor(
+                    executor, _analyze_file_chunk, chunk, standards, compute_hash, self.analyzer_config, timed,
+                    self.clone_config, chunk_hashes
+                )
+
+            def analyze() -> Any:
+                if timed:
+                    timings = {}
+                    return self._analyze_file_batch(chunk, standards, compute_hash, timings, chunk_hashes), timings
+                return self._analyze_file_batch(chunk, standards, compute_hash, expected_hashes=chunk_hashes)
+            return run_blocking(analyze)
+
+        def resolve_chunk(chunk: List[Tuple[int, str, Optional[str]]],
+                          results: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, Any], bool]]:
+            # 工作进程校验内容未变的文件读取缓存结果
+            resolved = []
+            for (index, file_path, lang), file_result in zip(chunk, results):
+                if expected_hashes.pop(index, None) is not None:
+                    unchanged = file_result.get("unchanged", False)
+                    cache.confirm(file_path, file_result.get("mtime_ns"), unchanged)
+                    if unchanged:
+                        resolved += load_cached([(index, file_path, lang)])
+                        continue
+                resolved.append((index, file_result, False))
+            return resolved
+
+        # 按文件顺序排列的待产出项：("cached", 序号, (路径, 语言)) 或 ("chunk", future, 分块)
+        queue = deque()
+        in_flight = 0
+
+        async def next_ready(wait: bool) -> Optional[List[Tuple[int, Dict[str, Any], bool]]]:
+            # 取出队首的一组结果（一个分块，或最多一块的连续缓存命中项）；
+            # wait为False时，队首分块未完成且进行中的分块未达到上限则返回None
+            nonlocal in_flight
+            kind, first, second = queue[0]
+            if kind == "chunk":
+                if not wait and not first.done() and in_flight < workers * 2:
+                    return None
+                results = await chunk_results(first)
+                queue.popleft()
+                in_flight -= 1
+                return await run_blocking(resolve_chunk, second, results)
+            entries = []
+            while queue and queue[0][0] == "cached" and len(entries) < chunk_size:
+                _, index, (file_path, lang) = queue.popleft()
+                entries.append((index, file_path, lang))
+            return await run_blocking(load_cached, entries)
+
+        chunk = []
+        progress = self.progress
+        discovered = 0
+        completed = False
+        try:
+            exhausted = False
+            while not exhausted:
+                batch = await run_blocking(discover, discovered)
+                exhausted = len(batch) < chunk_size
+                discovered += len(batch)
+                progress["files_discovered"] = discovered
+                for i, file_path, lang, valid, expected_hash in batch:
+                    if valid:
+                        queue.append(("cached", i, (file_path, lang)))
+                        continue
+                    if expected_hash is not None:
+                        expected_hashes[i] = expected_hash
+                    chunk.append((i, file_path, lang))
+                    if len(chunk) >= chunk_size:
+                        queue.append(("chunk", submit(chunk), chunk))
+                        in_flight += 1
+                        chunk = []
+                        self._report_progress()
+
+                # 产出队首已就绪的结果；进行中的分块达到上限时等待最早的分块
+                while queue:
+                    ready = await next_ready(wait=False)
+                    if ready is None:
+                        break
+                    for item in ready:
+                        processed += 1
+                        yield item
+                    self._report_progress(files_analyzed=processed)
+
+            # 目录遍历结束，待分析的文件总数确定
+            self._report_progress(files_total=discovered)
+            # 不足一块的剩余文件作为最后一块分析
+            if chunk:
+                queue.append(("chunk", submit(chunk, last=True), chunk))
+                in_flight += 1
+            while queue:
+                for item in await next_ready(wait=True):
+                    processed += 1
+                    yield item
+                self._report_progress(files_analyzed=processed)
+            completed = True
+        finally:
+            for kind, first, _ in queue:
+                if kind == "chunk":
+                    first.cancel()
+            close = getattr(files, "close", None)
+            if close is not None:
+                if completed:
+                    close()
+                else:
+                    # 提前结束时遍历批次可能仍在线程中执行（正在执行的生成器不能关闭），关闭排在其后执行
+                    blocking.submit(close)
+            blocking.shutdown(wait=False)
+            if executor is not None and executor is not self.shared_executor:
+                executor.shutdown(wait=completed, cancel_futures=True)
+
+    def _analyze_single_file(self, file_path: str, index: int, standards: Dict[str, str],
+                             compute_hash: bool = False, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        分析单个文件：统计行数并生成问题列表
+
+        Args:
+            compute_hash: 是否在统计行数的同时计算内容哈希并记录文件元数据（供增量缓存使用）
+            language: 遍历时已识别的语言类型，为None时根据文件识别
+
+        Returns:
+            包含language、line_stats、issues的字典，无法识别语言的文件language为None
+        """
+        return self._analyze_file_batch([(index, file_path, language)], standards, compute_hash)[0]
+
+    def _analyze_file_batch(self, chunk: List[Tuple[int, str, Optional[str]]], standards: Dict[str, str],
+                            compute_hash: bool = False, timings: Dict[str, float] = None,
+                            expected_hashes: Dict[int, str] = None) -> List[Dict[str, Any]]:
+        """
+        分析一批文件：逐个统计行数（同时读入不超过MAX_CONTENT_SIZE的文件内容，后续步骤共用，每个文件只读取一次），
+        再计算代码度量，按分析标准分组，每组调用一次外部分析工具（工具不可用时使用内置分析器），
+        然后对所有识别出语言的文件执行安全扫描，启用重复代码检测时计算指纹（fingerprints）
+
+        每个文件只做一次词法切分：代码度量与指纹共用tokenize_lines()的结果，内置Python分析器直接使用度量得到的函数圈复杂度。
+
+        超过MAX_CONTENT_SIZE的文件（通常是生成代码）只统计行数、执行外部分析工具和流式安全扫描，
+        不计算代码度量、内置语法分析和指纹。
+
+        Args:
+            timings: 不为None时累加各步骤的耗时（counting、metrics、analyzers、security、fingerprints，秒）和读取的字节数（bytes）
+            expected_hashes: 只有修改时间变化的缓存文件（序号 -> 缓存中的内容哈希，见AnalysisCache.probe），
+                先计算内容哈希，内容未变的文件不再分析，结果中unchanged为True并附带mtime_ns
+
+        Returns:
+            与chunk顺序一致的分析结果列表；发现后被删除或无法读取的文件结果中skipped为True，不做分析
+        """
+        mark = time.perf_counter() if timings is not None else 0.0
+
+        def lap(step: str):
+            nonlocal mark
+            if timings is not None:
+                now = time.perf_counter()
+                timings[step] = timings.get(step, 0.0) + now - mark
+                mark = now
+
+        results = []
+        # 需要分析的 [分析结果, 文件内容, 词法切分结果, 全部函数]
+        analyzed = []
+        groups = defaultdict(list)
+        for index, file_path, language in chunk:
+            expected_hash = expected_hashes.get(index) if expected_hashes else None
+            if expected_hash is not None:
+                # 先记录修改时间再读取内容，与_count_file一致；无法读取时按未命中处理
+                try:
+                    mtime_ns = os.stat(file_path).st_mtime_ns
+                    unchanged = hash_file(file_path) == expected_hash
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    results.append({"file": file_path, "language": language, "unchanged": True, "mtime_ns": mtime_ns})
+                    continue
+            result, content = self._count_file(file_path, compute_hash, language)
+            results.append(result)
+            if result.get("skipped"):
+                continue
+            entry = [result, content, None, None]
+            analyzed.append(entry)
+            lang = result["language"]
+            if lang in standards:
+                groups[standards[lang]].append(entry)
+        if timings is not None:
+            size = 0
+            for result, content, _, _ in analyzed:
+                if result["language"]:
+                    try:
+                        size += result.get("size") or (len(content) if content is not None
+                                                       else os.path.getsize(result["file"]))
+                    except OSError:
+                        pass
+            timings["bytes"] = size
+        lap("counting")
+
+        for entry in analyzed:
+            result, content = entry[0], entry[1]
+            if result["language"]:
+                if content is not None:
+                    entry[2] = tokenize_lines(content, result["language"])
+                    entry[3] = []
+                    result["metrics"] = compute_metrics(content, result["language"], result["line_stats"],
+                                                        entry[2], entry[3])
+                else:
+                    result["metrics"] = None
+        lap("metrics")
+
+        for standard, members in groups.items():
+            issues_by_file = None
+            runner = get_runner(standard, self.analyzer_config)
+            if runner is not None:
+                try:
+                    issues_by_file = runner.analyze([entry[0]["file"] for entry in members])
+                except AnalyzerError as e:
+                    print(f"\n⚠ 警告：{e}，改用内置分析器")
+            for result, content, _, functions in members:
+                if issues_by_file is not None:
+                    result["issues"] = issues_by_file[result["file"]]
+                else:
+                    result["issues"] = self._builtin_issues(result["file"], result["language"], content, functions)
+                    if runner is not None:
+                        # 外部工具运行失败时的结果按内置分析器的引擎标识写入缓存，下次运行重新调用外部工具
+                        result["analyzer_fallback"] = True
+        lap("analyzers")
+
+        if self.analyzer_config["security_scan"]:
+            for result, content, _, _ in analyzed:
+                if result["language"]:
+                    if content is not None:
+                        result["issues"].extend(scan_source(content, result["file"], result["language"]))
+                    else:
+                        result["issues"].extend(scan_file(result["file"], result["language"]))
+            lap("security")
+
+        if self.clone_config["enabled"]:
+            for result, content, tokenized, _ in analyzed:
+                if result["language"]:
+                    result["fingerprints"] = (fingerprint_content(content, result["language"], tokenized)
+                                              if content is not None else None)
+            lap("fingerprints")
+        return results
+
+    def _count_file(self, file_path: str, compute_hash: bool = False,
+                    language: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        识别语言并统计单个文件的行数（不含问题分析）
+
+        Returns:
+            (统计结果, 文件内容)，未识别语言或超过MAX_CONTENT_SIZE的文件内容为None；
+            文件在发现后被删除或无法读取时统计结果中skipped为True
+        """
+        lang = language or detect_language(os.path.basename(file_path), file_path)
+        result = {"file": file_path, "language": lang, "line_stats": empty_line_stats(), "issues": []}
+
+        if not lang:
+            return result, None
+
+        # 流式统计总行数、空行、注释行和代码行，同时保留有大小上限的文件内容
+        hasher = None
+        try:
+            if compute_hash:
+                # 先记录元数据再读取内容，读取期间文件被修改时下次运行会重新分析
+                stat = os.stat(file_path)
+                result["size"] = stat.st_size
+                result["mtime_ns"] = stat.st_mtime_ns
+                hasher = new_content_hasher()
+            result["line_stats"], content = read_source(file_path, lang, hasher=hasher)
+        except OSError:
+            result["skipped"] = True
+            return result, None
+        if hasher is not None:
+            result["content_hash"] = hasher.hexdigest()
+        return result, content
+
+    def _builtin_issues(self, file_path: str, language: str, content: Optional[bytes] = None,
+                        functions: Optional[List[List[Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        内置分析器：外部分析工具未安装或运行失败时使用；Python使用基于ast的内置分析器，其他语言根据代码度量识别的函数
+        检查圈复杂度、嵌套深度和函数长度（分析已读入的文件内容，超过MAX_CONTENT_SIZE的文件不做分析；
+        functions为代码度量得到的全部函数）
+        """
+        if language == "python":
+            if content is None:
+                return []
+            return analyze_python_source(content, file_path, self.analyzer_config["max_complexity"], functions)
+        if functions is None:
+            return []
+        return analyze_functions(file_path, functions, self.analyzer_config["max_complexity"])
+
+    def _builtin_engine(self, language: str) -> str:
+        """
+        内置分析器标识（写入增量缓存），包含影响分析结果的配置
+        """
+        if language == "python":
+            return f"builtin-ast-c{self.analyzer_config['max_complexity']}"
+        return f"builtin-functions-c{self.analyzer_config['max_complexity']}-n{DEFAULT_MAX_NESTING}"
+
+    def _get_language_from_extension(self, ext: str) -> str:
+        """
+        根据文件扩展名获取语言类型
+        """
+        return EXTENSION_LANGUAGES.get(ext)
 
     def _create_summary(self, analysis_results: Dict[str, Any], file_list: List[str], target_path: str) -> Dict[str, Any]:
         """
         创建分析摘要，包含目标路径信息
         """
-        risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-        
-        for issue in analysis_results["issues_found"]:
-            severity = issue["severity"]
-            if severity in risk_counts:
-                risk_counts[severity] += 1
+        risk_counts = self._get_risk_counts(analysis_results)
+        total_lines = self._get_total_lines(analysis_results)
 
-        total_lines = sum(lang_stat["lines"] for lang_stat in analysis_results["language_stats"].values())
-
-        return {
+        summary = {
             "target_path": target_path,  # 添加目标路径到摘要
             "total_files": len(file_list),
             "total_lines": total_lines,
             "language_breakdown": dict(analysis_results["language_stats"]),
             "risk_counts": risk_counts
         }
+        if "cache_stats" in analysis_results:
+            summary["cache"] = analysis_results["cache_stats"]
+        if "baseline_stats" in analysis_results:
+            summary["baseline"] = analysis_results["baseline_stats"]
+        if "walk_stats" in analysis_results:
+            summary["walk"] = analysis_results["walk_stats"]
+        if "clone_stats" in analysis_results:
+            summary["clones"] = analysis_results["clone_stats"]
+        if "metrics" in analysis_results:
+            summary["metrics"] = analysis_results["metrics"]
+
+        return summary
+
+    def _format_duplication(self, lang_stats: Dict[str, Any]) -> str:
+        """
+        格式化语言的代码重复率，未执行重复代码检测时返回"-"
+        """
+        if "duplication" not in lang_stats:
+            return "-"
+        return f"{lang_stats['duplication']:.2f}%"
 
-    def _generate_reports(self, analysis_results: Dict[str, Any], report_path: str, formats: List[str], target_path: str, cost_estimate: float = 0.00, maintenance_recommendation: dict = None) -> List[str]:
+    def _get_risk_counts(self, analysis_results: Dict[str, Any]) -> Dict[str, int]:
+        """
+        获取各风险等级的问题数：优先使用分析时汇总的结果，否则遍历问题统计
+        """
+        if "risk_counts" in analysis_results:
+            return dict(analysis_results["risk_counts"])
+        risk_counts = {severity: 0 for severity in SEVERITIES}
+        for issue in analysis_results["issues_found"]:
+            if issue["severity"] in risk_counts:
+                risk_counts[issue["severity"]] += 1
+        return risk_counts
+
+    def _get_total_lines(self, analysis_results: Dict[str, Any]) -> int:
+        """
+        获取总代码行数：优先使用分析时汇总的结果
+        """
+        if "total_lines" in analysis_results:
+            return analysis_results["total_lines"]
+        return sum(lang_stat["lines"] for lang_stat in analysis_results["language_stats"].values())
+
+    async def _generate_reports(self, analysis_results: Dict[str, Any], report_path: str, formats: List[str], target_path: str, cost_estimate: float = 0.00, maintenance_recommendation: dict = None, parallel: bool = True) -> Tuple[List[str], Dict[str, float]]:
         """
         生成报告，传递目标路径信息和新增功能数据
+
+        请求多种格式时各格式在独立进程中同时生成（PDF生成为CPU密集型，线程无法并行），
+        事件循环只等待结果而不被阻塞；单一格式在线程中生成。
+
+        Args:
+            parallel: 是否并行生成多种格式
+
+        Returns:
+            (报告文件路径列表, 各格式生成耗时及总耗时（秒）)
         """
         os.makedirs(report_path, exist_ok=True)
         
-        report_paths = []
-        timestamp = str(int(asyncio.get_event_loop().time()))
-        
-        for fmt in formats:
-            if fmt == "html":
-                path = os.path.join(report_path, f"analysis_report_{timestamp}.html")
-                self._generate_html_report(analysis_results, path, target_path, cost_estimate, maintenance_recommendation)
-                report_paths.append(path)
-            elif fmt == "pdf":
-                path = os.path.join(report_path, f"analysis_report_{timestamp}.pdf")
-                self._generate_pdf_report(analysis_results, path, target_path, cost_estimate, maintenance_recommendation)
-                report_paths.append(path)
-            elif fmt == "txt":
-                path = os.path.join(report_path, f"analysis_report_{timestamp}.txt")
-                self._generate_text_report(analysis_results, path, target_path, cost_estimate, maintenance_recommendation)
-                report_paths.append(path)
-        
-        return report_paths
+        loop = asyncio.get_running_loop()
+        report_time = loop.time()
+        timestamp = str(int(report_time))
+        jobs = [(fmt, os.path.join(report_path, f"analysis_report_{timestamp}.{fmt}"))
+                for fmt in formats if fmt in REPORT_FORMATS]
+        # defaultdict的默认工厂无法序列化，传给子进程前转换为普通字典
+        shared_results = {**analysis_results,
+                          "language_stats": dict(analysis_results["language_stats"]),
+                          "report_time": report_time}
+        args = (target_path, cost_estimate, maintenance_recommendation)
+
+        started = time.perf_counter()
+        concurrent = parallel and len(jobs) > 1
+        if concurrent:
+            with self._process_pool(len(jobs)) as executor:
+                durations = await asyncio.gather(*(
+                    loop.run_in_executor(executor, _generate_report_file, fmt, shared_results, path, *args,
+                                         {name: getattr(self, name) for name in REPORT_SETTINGS})
+                    for fmt, path in jobs
+                ))
+        else:
+            durations = []
+            for fmt, path in jobs:
+                durations.append(await asyncio.to_thread(self._generate_report_timed, fmt, shared_results, path, *args))
+
+        timings = {fmt: round(duration, 4) for (fmt, _), duration in zip(jobs, durations)}
+        timings["total"] = round(time.perf_counter() - started, 4)
+        # 并行生成时各格式在独立进程中同时开始，记录在各自的轨道上；依次生成时首尾相接
+        offset = 0.0
+        for (fmt, _), duration in zip(jobs, durations):
+            self.instrumentation.add_span(f"report:{fmt}", started + offset, duration,
+                                          track=f"report:{fmt}" if concurrent else "main")
+            if not concurrent:
+                offset += duration
+        if jobs:
+            print(f"【报告生成耗时：{', '.join(f'{fmt} {seconds:.2f}s' for fmt, seconds in timings.items())}】")
+        return [path for _, path in jobs], timings
+
+    def _generate_report_timed(self, fmt: str, analysis_results: Dict[str, Any], output_path: str, target_path: str,
+                               cost_estimate: float = 0.00, maintenance_recommendation: dict = None) -> float:
+        """
+        生成单个格式的报告，返回耗时（秒）
+        """
+        generators = {
+            "html": self._generate_html_report,
+            "pdf": self._generate_pdf_report,
+            "txt": self._generate_text_report
+        }
+        started = time.perf_counter()
+        generators[fmt](analysis_results, output_path, target_path, cost_estimate, maintenance_recommendation)
+        return time.perf_counter() - started
 
     def _generate_html_report(self, analysis_results: Dict[str, Any], output_path: str, target_path: str, cost_estimate: float = 0.00, maintenance_recommendation: dict = None):
         """
@@ -756,12 +2044,10 @@ class CdanalyzerAgentSkill:
             f.write('<div class="summary-box">\n')
             f.write('<div class="summary-item">📁 <strong>分析目标:</strong> {}</div>\n'.format(target_path))
             f.write('<div class="summary-item">📄 <strong>分析文件数:</strong> {}</div>\n'.format(len(analysis_results["files_analyzed"])))
-            f.write('<div class="summary-item">📝 <strong>总代码行数:</strong> {}</div>\n'.format(sum(stat["lines"] for stat in analysis_results["language_stats"].values())))
+            f.write('<div class="summary-item">📝 <strong>总代码行数:</strong> {}</div>\n'.format(self._get_total_lines(analysis_results)))
             
             # 风险统计
-            risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-            for issue in analysis_results["issues_found"]:
-                risk_counts[issue["severity"]] += 1
+            risk_counts = self._get_risk_counts(analysis_results)
             
             f.write('<div class="summary-item">🐉 <strong>致命风险:</strong> <span class="highlight">{}</span></div>\n'.format(risk_counts["critical"]))
             f.write('<div class="summary-item">⚠️ <strong>高级风险:</strong> <span class="highlight">{}</span></div>\n'.format(risk_counts["high"]))
@@ -769,62 +2055,59 @@ class CdanalyzerAgentSkill:
             f.write('<div class="summary-item">ℹ️ <strong>普通风险:</strong> <span class="highlight">{}</span></div>\n'.format(risk_counts["low"]))
             f.write('</div></div>\n')
 
-            # 添加研发历史投入估算（如果启用大模型）
-            if self.use_llm_config == 0 and cost_estimate > 0:
+            # 添加研发历史投入估算（根据代码度量在本地计算）
+            if cost_estimate > 0:
                 f.write('<div class="section"><h2>💰 研发历史投入估算</h2>\n')
                 f.write('<div class="summary-box">\n')
                 f.write('<div class="summary-item">【研发历史投入估算（不使用任何ai工具、采用较为传统的纯手工开发）：成本（人/日）】：{}</div>\n'.format(cost_estimate))
                 f.write('</div></div>\n')
             
-            # 添加继续维护建议（如果启用大模型）
-            if self.use_llm_config == 0 and maintenance_recommendation:
+            # 添加继续维护建议（根据代码度量在本地计算）
+            if maintenance_recommendation:
                 f.write('<div class="section"><h2>💡 继续维护建议</h2>\n')
                 f.write('<div class="summary-box">\n')
                 f.write('<div class="summary-item">【此项目是否值得继续维护】：<strong>{}</strong></div>\n'.format(maintenance_recommendation["worth_maintaining"]))
-                f.write('<div class="summary-item">【原生说明】：{}</div>\n'.format(maintenance_recommendation["reasoning"]))
+                f.write('<div class="summary-item">【原生说明】：{}</div>\n'.format(xml_escape(maintenance_recommendation["reasoning"])))
                 f.write('</div></div>\n')
 
             # 语言分布
             f.write('<div class="section"><h2>🌐 语言分布</h2>\n')
             f.write('<table>\n')
-            f.write('<tr><th>语言</th><th>文件数</th><th>代码行数</th><th>占比</th></tr>\n')
+            f.write('<tr><th>语言</th><th>文件数</th><th>代码行数</th><th>有效代码</th><th>注释行</th><th>空行</th><th>占比</th><th>重复率</th></tr>\n')
             
-            total_lines = sum(stat["lines"] for stat in analysis_results["language_stats"].values())
+            total_lines = self._get_total_lines(analysis_results)
             for lang, stats in analysis_results["language_stats"].items():
                 percentage = (stats["lines"] / total_lines * 100) if total_lines > 0 else 0
-                f.write('<tr><td>{}</td><td>{}</td><td>{}</td><td>{:.2f}%</td></tr>\n'.format(lang, stats["files"], stats["lines"], percentage))
+                f.write('<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{:.2f}%</td><td>{}</td></tr>\n'.format(
+                    lang, stats["files"], stats["lines"], stats["code"], stats["comment"], stats["blank"], percentage,
+                    self._format_duplication(stats)))
             
             f.write('</table></div>\n')
 
-            # 问题详情表格
-            f.write('<div class="section"><h2>🔍 问题详情</h2>\n')
-            f.write('<div class="filter-container">\n')
-            f.write('<input type="text" id="searchInput" placeholder="🔍 输入关键字过滤问题..." class="filter-input">\n')
-            f.write('</div>\n')
-            f.write('<table id="issuesTable">\n')
-            f.write('<thead>\n')
-            f.write('<tr>\n')
-            f.write('<th onclick="sortTable(0)">文件 📄</th>\n<th onclick="sortTable(1)">行号 #️⃣</th>\n<th onclick="sortTable(2)">严重程度 ⚠️</th>\n<th onclick="sortTable(3)">类型 🏷️</th>\n<th onclick="sortTable(4)">问题描述 📝</th>\n<th onclick="sortTable(5)">解决方案 💡</th>\n<th onclick="sortTable(6)">AI建议 🤖</th>\n')
-            f.write('</tr>\n')
-            f.write('</thead>\n')
-            f.write('<tbody>\n')
-            
-            for issue in analysis_results["issues_found"]:
-                severity_class = issue["severity"]
-                severity_label = self.risk_levels[issue["severity"]]["label"]
-                ai_suggestion = issue.get("ai_suggestion", "未获取到AI建议")
-                f.write('<tr class="{}">\n'.format(severity_class))
-                f.write('<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n'.format(
-                    issue["file"], issue["line"], severity_label, issue["type"], 
-                    issue["message"], issue["solution"], ai_suggestion))
+            # 问题详情表格：问题数量超过阈值时使用虚拟化分页表格
+            if self._use_virtual_html(analysis_results):
+                self._write_virtual_issue_section(f, analysis_results, output_path)
+            else:
+                f.write('<div class="section"><h2>🔍 问题详情</h2>\n')
+                f.write('<div class="filter-container">\n')
+                f.write('<input type="text" id="searchInput" placeholder="🔍 输入关键字过滤问题..." class="filter-input">\n')
+                f.write('</div>\n')
+                f.write('<table id="issuesTable">\n')
+                f.write('<thead>\n')
+                f.write('<tr>\n')
+                f.write('<th onclick="sortTable(0)">文件 📄</th>\n<th onclick="sortTable(1)">行号 #️⃣</th>\n<th onclick="sortTable(2)">严重程度 ⚠️</th>\n<th onclick="sortTable(3)">类型 🏷️</th>\n<th onclick="sortTable(4)">问题描述 📝</th>\n<th onclick="sortTable(5)">解决方案 💡</th>\n<th onclick="sortTable(6)">AI建议 🤖</th>\n')
                 f.write('</tr>\n')
-            
-            f.write('</tbody>\n')
-            f.write('</table></div>\n')
+                f.write('</thead>\n')
+                f.write('<tbody>\n')
+                
+                self._write_issue_rows(f, analysis_results["issues_found"], "html", self._format_html_issue_row)
+                
+                f.write('</tbody>\n')
+                f.write('</table></div>\n')
 
-            # 添加JavaScript功能
-            f.write('<script>\n')
-            f.write('''
+                # 添加JavaScript功能
+                f.write('<script>\n')
+                f.write('''
 function sortTable(columnIndex) {
     const table = document.getElementById("issuesTable");
     const tbody = table.querySelector('tbody');
@@ -862,138 +2145,53 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
 ''')
             f.write('</div>\n</body>\n</html>')
 
+    def _use_virtual_html(self, analysis_results: Dict[str, Any]) -> bool:
+        """
+        判断HTML报告是否使用虚拟化分页表格：mode为virtual时总是使用，auto时问题数超过阈值才使用
+        """
+        mode = self.html_report_config["mode"]
+        if mode == "auto":
+            return len(analysis_results["issues_found"]) > self.html_report_config["virtual_threshold"]
+        return mode == "virtual"
+
+    def _write_virtual_issue_section(self, f, analysis_results: Dict[str, Any], output_path: str):
+        """
+        写入虚拟化问题表格：问题编码为压缩的列式JSON，内嵌到报告或写入同目录的旁路文件
+        """
+        data = build_issue_columns(analysis_results["issues_found"], list(SEVERITIES))
+        payload = encode_issue_data(data, [self.risk_levels[severity]["label"] for severity in SEVERITIES])
+
+        sidecar_name = None
+        if self.html_report_config["sidecar"]:
+            sidecar_path = os.path.splitext(output_path)[0] + ".issues.json.gz"
+            with open(sidecar_path, 'wb') as sidecar:
+                sidecar.write(payload)
+            sidecar_name = os.path.basename(sidecar_path)
+
+        write_virtual_issue_section(f, payload, sidecar_name, self.html_report_config["page_size"])
+
     def _generate_pdf_report(self, analysis_results: Dict[str, Any], output_path: str, target_path: str, cost_estimate: float = 0.00, maintenance_recommendation: dict = None):
         """
         生成PDF格式的报告，包含目标路径信息和新增功能
         """
         from reportlab.lib.pagesizes import letter, A4
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import inch
         from reportlab.lib import colors
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        import platform
-
-        # 首先尝试注册中文字体
-        system = platform.system()
-        font_path = ""
-        font_name = "CustomChineseFont"
-        
-        # 增加更多字体选项以提高兼容性
-        if system == "Windows":
-            # 尝试多个常见的中文字体路径
-            possible_paths = [
-                "C:/Windows/Fonts/simsun.ttc",      # 宋体
-                "C:/Windows/Fonts/simhei.ttf",      # 黑体
-                "C:/Windows/Fonts/msyh.ttc",        # 微软雅黑
-                "C:/Windows/Fonts/msyhbd.ttc",      # 微软雅黑粗体
-                "C:/Windows/Fonts/simsunb.ttf",     # 宋体粗体
-                "C:/Windows/Fonts/Arial Unicode.ttf",  # Arial Unicode
-                "C:/Windows/Fonts/mingliu.ttc",     # 细明体
-                "C:/Windows/Fonts/msjh.ttc"         # 微软正黑体
-            ]
-        elif system == "Darwin":  # macOS
-            possible_paths = [
-                "/System/Library/Fonts/STHeiti Light.ttc",  # 黑体-简
-                "/System/Library/Fonts/STHeiti Medium.ttc", # 黑体-简
-                "/System/Library/Fonts/STSong.ttc",         # 宋体-简
-                "/System/Library/Fonts/PingFang.ttc",       # 苹果
-                "/System/Library/Fonts/Helvetica.ttc",      # Helvetica
-                "/System/Library/Fonts/Menlo.ttc",          # Menlo
-                "/Library/Fonts/Songti.ttc",                # 宋体
-                "/Library/Fonts/Heiti.ttc"                  # 黑体
-            ]
-        else:  # Linux
-            possible_paths = [
-                "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",   # 文泉驿微米黑
-                "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",     # 文泉驿正黑
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc", # Noto Sans CJK
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # DejaVu Sans
-                "/usr/share/fonts/TTF/SourceHanSansCN-Regular.otf", # 思源黑体
-                "/usr/share/fonts/google-noto-cjk/SourceHanSansCN-Regular.ttc", # Google Noto CJK
-                "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf", # Liberation Sans
-                "/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc" # Noto Sans CJK
-            ]
-        
-        # 尝试找到可用的字体文件
-        for path in possible_paths:
-            if os.path.exists(path):
-                font_path = path
-                break
-
-        # 注册中文字体
-        if font_path and os.path.exists(font_path):
-            try:
-                # 先尝试注册字体
-                pdfmetrics.registerFont(TTFont(font_name, font_path))
-                
-                # 验证字体是否注册成功
-                registered_fonts = pdfmetrics.getRegisteredFontNames()
-                if font_name in registered_fonts:
-                    print(f"成功注册字体: {font_path}")
-                else:
-                    print(f"字体注册失败: {font_path}")
-                    font_name = "Helvetica"  # 回退到默认字体
-            except Exception as e:
-                print(f"字体注册异常: {e}")
-                font_name = "Helvetica"  # 回退到默认字体
-        else:
-            print(f"未找到合适的中文字体，使用默认字体")
-            # 如果找不到合适的字体，使用默认字体
-            font_name = "Helvetica"
+
+        # 中文字体和Logo在进程内只查找、注册一次
+        font_name = get_pdf_font(self.pdf_report_config.get("font_path"))
 
         doc = SimpleDocTemplate(output_path, pagesize=A4)
-        styles = getSampleStyleSheet()
-        
-        # 自定义样式使用中文字体
-        chinese_style = ParagraphStyle(
-            'ChineseStyle',
-            parent=styles['Normal'],
-            fontName=font_name,
-            fontSize=10,
-            leading=14
-        )
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=font_name,
-            fontSize=20,
-            spaceAfter=30,
-            alignment=1,  # 居中对齐
-            textColor=colors.HexColor('#667eea')
-        )
-        
-        heading2_style = ParagraphStyle(
-            'CustomHeading2',
-            parent=styles['Heading2'],
-            fontName=font_name,
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.HexColor('#764ba2'),
-            borderWidth=2,
-            borderColor=colors.HexColor('#667eea'),
-            borderPadding=5,
-            backColor=colors.lightgrey
-        )
+        pdf_styles = self._get_pdf_styles(font_name)
+        chinese_style = pdf_styles["chinese"]
+        title_style = pdf_styles["title"]
+        heading2_style = pdf_styles["heading2"]
         
         story = []
 
         # 标题和Logo
-        # 尝试多个可能的图片路径
-        logo_paths = [
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cdico_64_64.jpg"),  # 项目根目录
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "cdico_64_64.jpg"),      # 当前目录
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cdico_64_64.jpg"),  # 项目根目录
-            "cdico_64_64.jpg"  # 当前工作目录
-        ]
-        
-        logo_path = None
-        for path in logo_paths:
-            if os.path.exists(path):
-                logo_path = path
-                break
+        logo_path = get_logo_path()
         
         if logo_path:
             # 创建一个包含居中图片的表格
@@ -1025,13 +2223,11 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
         summary_data = [
             ["<b>分析目标:</b>", Paragraph(target_path, chinese_style)],
             ["<b>分析文件数:</b>", str(len(analysis_results["files_analyzed"]))],
-            ["<b>总代码行数:</b>", str(sum(stat["lines"] for stat in analysis_results["language_stats"].values()))]
+            ["<b>总代码行数:</b>", str(self._get_total_lines(analysis_results))]
         ]
 
         # 风险统计
-        risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-        for issue in analysis_results["issues_found"]:
-            risk_counts[issue["severity"]] += 1
+        risk_counts = self._get_risk_counts(analysis_results)
 
         summary_data.extend([
             ["致命风险:", str(risk_counts["critical"])],
@@ -1059,36 +2255,38 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
         story.append(summary_table)
         story.append(Spacer(1, 12))
 
-        # 添加研发历史投入估算（如果启用大模型）
-        if self.use_llm_config == 0 and cost_estimate > 0:
+        # 添加研发历史投入估算（根据代码度量在本地计算）
+        if cost_estimate > 0:
             story.append(Paragraph(f"【研发历史投入估算（不使用任何ai工具、采用较为传统的纯手工开发）：成本（人/日）】：{cost_estimate}", heading2_style))
             story.append(Paragraph("（不使用任何ai工具、采用较为传统的纯手工开发，估算可能存在偏差，请谨慎参考）", chinese_style))
             story.append(Spacer(1, 12))
 
-        # 添加继续维护建议（如果启用大模型）
-        if self.use_llm_config == 0 and maintenance_recommendation:
+        # 添加继续维护建议（根据代码度量在本地计算）
+        if maintenance_recommendation:
             story.append(Paragraph("【继续维护建议】", heading2_style))
             story.append(Paragraph(f"【此项目是否值得继续维护】：{maintenance_recommendation['worth_maintaining']}", chinese_style))
-            story.append(Paragraph(f"【原因说明】：{maintenance_recommendation['reasoning']}", chinese_style))
+            story.append(Paragraph(f"【原因说明】：{xml_escape(maintenance_recommendation['reasoning'])}", chinese_style))
             story.append(Spacer(1, 12))
 
         # 语言分布标题
         lang_title = Paragraph("语言分布", heading2_style)
         story.append(lang_title)
 
-        total_lines = sum(stat["lines"] for stat in analysis_results["language_stats"].values())
+        total_lines = self._get_total_lines(analysis_results)
         lang_data = [[Paragraph("<b>语言</b>", chinese_style), Paragraph("<b>文件数</b>", chinese_style), 
-                     Paragraph("<b>代码行数</b>", chinese_style), Paragraph("<b>占比</b>", chinese_style)]]
+                     Paragraph("<b>代码行数</b>", chinese_style), Paragraph("<b>占比</b>", chinese_style),
+                     Paragraph("<b>重复率</b>", chinese_style)]]
         for lang, stats in analysis_results["language_stats"].items():
             percentage = (stats["lines"] / total_lines * 100) if total_lines > 0 else 0
             lang_data.append([
                 Paragraph(lang, chinese_style), 
                 str(stats["files"]), 
                 str(stats["lines"]), 
-                f"{percentage:.2f}%"
+                f"{percentage:.2f}%",
+                self._format_duplication(stats)
             ])
 
-        lang_table = Table(lang_data, colWidths=[1.5*inch, 1*inch, 1.5*inch, 1*inch])
+        lang_table = Table(lang_data, colWidths=[1.5*inch, 1*inch, 1.5*inch, 1*inch, 1*inch])
         lang_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -1110,40 +2308,79 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
         issues_title = Paragraph("问题详情", heading2_style)
         story.append(issues_title)
 
-        # 问题详情表格 - 现在包含AI建议列
-        headers = [
-            Paragraph("<b>文件</b>", chinese_style), 
-            Paragraph("<b>行号</b>", chinese_style), 
-            Paragraph("<b>严重程度</b>", chinese_style), 
-            Paragraph("<b>类型</b>", chinese_style), 
-            Paragraph("<b>问题描述</b>", chinese_style), 
-            Paragraph("<b>解决方案</b>", chinese_style),
-            Paragraph("<b>AI建议</b>", chinese_style)
-        ]
-        issues_data = [headers]
+        # 问题数超过上限时（或summary模式）只列出风险最高的top_k个问题
+        issues = analysis_results["issues_found"]
+        config = self.pdf_report_config
+        total_issues = len(issues)
+        summary_only = config["mode"] == "summary" or (
+            config["mode"] == "auto" and config["max_issues"] and total_issues > config["max_issues"]
+        )
+        if summary_only:
+            issues = top_issues(issues, config["top_k"], lambda issue: self.risk_levels[issue["severity"]]["weight"])
+            story.append(Paragraph(
+                f"共 {total_issues} 个问题，以下仅列出风险最高的 {len(issues)} 个，完整列表请查看HTML或TXT报告", chinese_style
+            ))
+            story.append(Spacer(1, 6))
+
+        # 问题明细按分块生成带表头的小表格，文档构建时按需产出
+        def iter_flowables():
+            yield from story
+            for file_path, chunk in iter_issue_chunks(issues, config["chunk_rows"], config["group_by_file"]):
+                if file_path is not None:
+                    yield Paragraph(xml_escape(file_path), chinese_style)
+                yield self._build_pdf_issue_table(chunk, pdf_styles, font_name)
+                yield Spacer(1, 6)
+
+        # 构建PDF
+        doc.build(LazyFlowables(iter_flowables()))
+
+    def _get_pdf_styles(self, font_name: str) -> Dict[str, Any]:
+        """
+        获取PDF报告使用的段落样式及问题表格的公共样式，按字体缓存，同一进程内只创建一次
+
+        结果只包含ParagraphStyle、表格样式命令和颜色等只读对象，不包含flowable（表头由_build_pdf_issue_table逐表创建）
+        """
+        if font_name in _pdf_styles:
+            return _pdf_styles[font_name]
+
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+
+        styles = getSampleStyleSheet()
         
-        for issue in analysis_results["issues_found"]:
-            severity_label = self.risk_levels[issue["severity"]]["label"]
-            # 截断过长的文本以适应PDF表格
-            file_path = issue["file"][-30:] if len(issue["file"]) > 30 else issue["file"]
-            message = issue["message"][:40] + "..." if len(issue["message"]) > 40 else issue["message"]
-            solution = issue["solution"][:40] + "..." if len(issue["solution"]) > 40 else issue["solution"]
-            ai_suggestion = issue.get("ai_suggestion", "未获取到AI建议")
-            ai_suggestion_short = ai_suggestion[:40] + "..." if len(ai_suggestion) > 40 else ai_suggestion
-            
-            issues_data.append([
-                Paragraph(file_path, chinese_style),
-                str(issue["line"]),
-                Paragraph(severity_label, chinese_style),
-                Paragraph(issue["type"], chinese_style),
-                Paragraph(message, chinese_style),
-                Paragraph(solution, chinese_style),
-                Paragraph(ai_suggestion_short, chinese_style)
-            ])
+        # 自定义样式使用中文字体
+        chinese_style = ParagraphStyle(
+            'ChineseStyle',
+            parent=styles['Normal'],
+            fontName=font_name,
+            fontSize=10,
+            leading=14
+        )
+        
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontName=font_name,
+            fontSize=20,
+            spaceAfter=30,
+            alignment=1,  # 居中对齐
+            textColor=colors.HexColor('#667eea')
+        )
+        
+        heading2_style = ParagraphStyle(
+            'CustomHeading2',
+            parent=styles['Heading2'],
+            fontName=font_name,
+            fontSize=14,
+            spaceAfter=12,
+            textColor=colors.HexColor('#764ba2'),
+            borderWidth=2,
+            borderColor=colors.HexColor('#667eea'),
+            borderPadding=5,
+            backColor=colors.lightgrey
+        )
 
-        # 创建表格并设置样式（增加一列，调整列宽）
-        issues_table = Table(issues_data, colWidths=[1.2*inch, 0.5*inch, 0.7*inch, 0.7*inch, 1.2*inch, 1.2*inch, 1.2*inch])
-        issues_table.setStyle(TableStyle([
+        issue_table_commands = (
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -1154,20 +2391,64 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
             ('FONTSIZE', (0, 1), (-1, -1), 6),
             ('TOPPADDING', (0, 0), (-1, -1), 4),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            # 根据严重程度设置背景色
-            *[('BACKGROUND', (0, i+1), (-1, i+1), 
-               colors.HexColor('#ffece8') if analysis_results["issues_found"][i]["severity"] == "critical" else
-               colors.HexColor('#fef5e7') if analysis_results["issues_found"][i]["severity"] == "high" else
-               colors.HexColor('#fff8e1') if analysis_results["issues_found"][i]["severity"] == "medium" else
-               colors.HexColor('#f5f5f5'))
-              for i in range(min(len(analysis_results["issues_found"]), 100))]  # 限制颜色设置数量以提高性能
-        ]))
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        )
+        # 根据严重程度设置的行背景色
+        severity_colors = {
+            "critical": colors.HexColor('#ffece8'),
+            "high": colors.HexColor('#fef5e7'),
+            "medium": colors.HexColor('#fff8e1'),
+            "low": colors.HexColor('#f5f5f5')
+        }
 
-        story.append(issues_table)
+        _pdf_styles[font_name] = {
+            "chinese": chinese_style,
+            "title": title_style,
+            "heading2": heading2_style,
+            "issue_table_commands": issue_table_commands,
+            "severity_colors": severity_colors
+        }
+        return _pdf_styles[font_name]
 
-        # 构建PDF
-        doc.build(story)
+    def _build_pdf_issue_table(self, chunk: List[Dict[str, Any]], pdf_styles: Dict[str, Any], font_name: str):
+        """
+        将一个分块的问题生成带表头的表格，表头在跨页时重复，每一行按严重程度设置背景色
+        """
+        from reportlab.platypus import Paragraph, Table, TableStyle
+        from reportlab.lib.units import inch
+
+        chinese_style = pdf_styles["chinese"]
+        severity_colors = pdf_styles["severity_colors"]
+        # 问题详情表格 - 包含AI建议列
+        issues_data = [[Paragraph(f"<b>{header}</b>", chinese_style) for header in PDF_ISSUE_HEADERS]]
+        row_commands = []
+        
+        for row, issue in enumerate(chunk, 1):
+            severity_label = self.risk_levels[issue["severity"]]["label"]
+            # 截断过长的文本以适应PDF表格
+            file_path = issue["file"][-30:] if len(issue["file"]) > 30 else issue["file"]
+            message = issue["message"][:40] + "..." if len(issue["message"]) > 40 else issue["message"]
+            solution = issue["solution"][:40] + "..." if len(issue["solution"]) > 40 else issue["solution"]
+            ai_suggestion = issue.get("ai_suggestion", "未获取到AI建议")
+            ai_suggestion_short = ai_suggestion[:40] + "..." if len(ai_suggestion) > 40 else ai_suggestion
+            
+            issues_data.append([
+                Paragraph(xml_escape(file_path), chinese_style),
+                str(issue["line"]),
+                Paragraph(severity_label, chinese_style),
+                Paragraph(xml_escape(issue["type"]), chinese_style),
+                Paragraph(xml_escape(message), chinese_style),
+                Paragraph(xml_escape(solution), chinese_style),
+                Paragraph(xml_escape(ai_suggestion_short), chinese_style)
+            ])
+            row_commands.append(('BACKGROUND', (0, row), (-1, row),
+                                 severity_colors.get(issue["severity"], severity_colors["low"])))
+
+        # 创建表格并设置样式
+        issues_table = Table(issues_data, colWidths=[1.2*inch, 0.5*inch, 0.7*inch, 0.7*inch, 1.2*inch, 1.2*inch, 1.2*inch],
+                             repeatRows=1)
+        issues_table.setStyle(TableStyle(list(pdf_styles["issue_table_commands"]) + row_commands))
+        return issues_table
 
     def _generate_text_report(self, analysis_results: Dict[str, Any], output_path: str, target_path: str, cost_estimate: float = 0.00, maintenance_recommendation: dict = None):
         """
@@ -1178,14 +2459,12 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
             f.write("         龙析——代码质量分析报告\n")
             f.write("==========================================\n")
             f.write(f"分析目标: {target_path}\n")
-            f.write(f"分析时间: {asyncio.get_event_loop().time()}\n")
+            f.write(f"分析时间: {analysis_results.get('report_time', time.monotonic())}\n")
             f.write(f"分析文件数: {len(analysis_results['files_analyzed'])}\n")
-            f.write(f"总代码行数: {sum(stat['lines'] for stat in analysis_results['language_stats'].values())}\n\n")
+            f.write(f"总代码行数: {self._get_total_lines(analysis_results)}\n\n")
             
             # 风险统计
-            risk_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-            for issue in analysis_results["issues_found"]:
-                risk_counts[issue["severity"]] += 1
+            risk_counts = self._get_risk_counts(analysis_results)
             
             f.write("风险统计:\n")
             f.write(f"- 致命风险: {risk_counts['critical']}\n")
@@ -1194,36 +2473,67 @@ document.getElementById('searchInput').addEventListener('keyup', function() {
             f.write(f"- 普通风险: {risk_counts['low']}\n\n")
             
             f.write("语言分布:\n")
-            total_lines = sum(stat["lines"] for stat in analysis_results["language_stats"].values())
+            total_lines = self._get_total_lines(analysis_results)
             for lang, stats in analysis_results["language_stats"].items():
                 percentage = (stats["lines"] / total_lines * 100) if total_lines > 0 else 0
-                f.write(f"- {lang}: {stats['files']} 文件, {stats['lines']} 行 ({percentage:.2f}%)\n")
+                f.write(f"- {lang}: {stats['files']} 文件, {stats['lines']} 行 ({percentage:.2f}%)"
+                        f" [代码 {stats['code']} / 注释 {stats['comment']} / 空行 {stats['blank']}]"
+                        f" 重复率 {self._format_duplication(stats)}\n")
             
-            # 添加研发历史投入估算（如果启用大模型）
-            if self.use_llm_config == 0 and cost_estimate > 0:
+            # 添加研发历史投入估算（根据代码度量在本地计算）
+            if cost_estimate > 0:
                 f.write(f"\n【研发历史投入估算（不使用任何ai工具、采用较为传统的纯手工开发）：成本（人/日）】：{cost_estimate}\n")
             
-            # 添加继续维护建议（如果启用大模型）
-            if self.use_llm_config == 0 and maintenance_recommendation:
+            # 添加继续维护建议（根据代码度量在本地计算）
+            if maintenance_recommendation:
                 f.write(f"\n【继续维护建议】\n")
                 f.write(f"【此项目是否值得继续维护】：{maintenance_recommendation['worth_maintaining']}\n")
                 f.write(f"【原生说明】：{maintenance_recommendation['reasoning']}\n")
             
             f.write("\n问题详情:\n")
             f.write("=" * 80 + "\n")
-            for i, issue in enumerate(analysis_results["issues_found"], 1):
-                severity_label = self.risk_levels[issue["severity"]]["label"]
-                ai_suggestion = issue.get("ai_suggestion", "未获取到AI建议")
-                f.write(f"{i}. 文件: {issue['file']} (第{issue['line']}行)\n")
-                f.write(f"   严重程度: {severity_label}\n")
-                f.write(f"   类型: {issue['type']}\n")
-                f.write(f"   问题: {issue['message']}\n")
-                f.write(f"   解决方案: {issue['solution']}\n")
-                f.write(f"   AI建议: {ai_suggestion}\n\n")
+            self._write_issue_rows(f, analysis_results["issues_found"], "txt", self._format_text_issue_row)
             
             f.write("=" * 80 + "\n")
             f.write("报告生成完毕\n")
 
+    def _write_issue_rows(self, f, issues, fmt: str, formatter):
+        """
+        写入问题明细：分析阶段已实时生成该格式的报告片段时直接复制，否则逐条格式化
+        """
+        row_part = issues.row_part(fmt) if isinstance(issues, IssueSink) else None
+        if row_part and os.path.exists(row_part):
+            with open(row_part, 'r', encoding='utf-8') as part:
+                shutil.copyfileobj(part, f)
+            return
+        for i, issue in enumerate(issues, 1):
+            f.write(formatter(issue, i))
+
+    def _format_html_issue_row(self, issue: Dict[str, Any], index: int) -> str:
+        """
+        将单个问题格式化为HTML报告中的表格行
+        """
+        severity_label = self.risk_levels[issue["severity"]]["label"]
+        ai_suggestion = issue.get("ai_suggestion", "未获取到AI建议")
+        return ('<tr class="{}">\n'
+                '<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n<td>{}</td>\n'
+                '</tr>\n').format(
+            issue["severity"], issue["file"], issue["line"], severity_label, issue["type"],
+            issue["message"], issue["solution"], ai_suggestion)
+
+    def _format_text_issue_row(self, issue: Dict[str, Any], index: int) -> str:
+        """
+        将单个问题格式化为文本报告中的条目，index为从1开始的序号
+        """
+        severity_label = self.risk_levels[issue["severity"]]["label"]
+        ai_suggestion = issue.get("ai_suggestion", "未获取到AI建议")
+        return (f"{index}. 文件: {issue['file']} (第{issue['line']}行)\n"
+                f"   严重程度: {severity_label}\n"
+                f"   类型: {issue['type']}\n"
+                f"   问题: {issue['message']}\n"
+                f"   解决方案: {issue['solution']}\n"
+                f"   AI建议: {ai_suggestion}\n\n")
+
     def validate_input(self, inputs: Dict[str, Any]) -> bool:
         """
         验证输入参数的有效性
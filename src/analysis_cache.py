@@ -0,0 +1,412 @@
+"""
+增量分析缓存
+
+以SQLite文件保存在报告目录下，按 (路径, 大小, 修改时间, 内容哈希, 分析标准, 工具版本)
+记录每个文件的行数统计、代码度量、问题列表和重复代码指纹（启用重复代码检测时）。再次分析时只有发生变化的文件需要重新分析，
+缓存命中的文件和changed_since模式下未变更的文件直接使用缓存的指纹参与重复代码检测。
+同一文件中还保存按提示词缓存的AI建议，跨多次运行复用。
+
+同一报告目录可能被多个分析任务同时使用（常驻服务中）：数据库使用WAL日志模式，读取不阻塞写入；
+分析结果先在内存中排队，commit()时在一个短事务中写入（调用方每个分块提交一次），不在整个分析期间持有写锁。
+连接可以在调用方的工作线程中使用（不阻塞事件循环），同一实例的访问由锁串行化。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .clone_detector import pack_fingerprints, unpack_fingerprints
+
+# 缓存结构版本，表结构或存储格式变化时递增，旧缓存会被自动丢弃
+CACHE_SCHEMA_VERSION = 5
+CACHE_FILENAME = ".cdanalyzer_cache.sqlite3"
+
+# 读取文件计算哈希时的缓冲区大小
+_HASH_CHUNK_SIZE = 1 << 20
+# 等待其他任务释放数据库写锁的超时时间（秒），写事务都很短，正常情况下不会等待这么久
+_BUSY_TIMEOUT = 30
+
+
+def new_content_hasher():
+    """
+    创建用于计算文件内容哈希的hashlib对象
+    """
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_file(file_path: str) -> str:
+    """
+    计算文件内容哈希
+    """
+    hasher = new_content_hasher()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def cache_key_path(file_path: str) -> str:
+    """
+    缓存中使用的文件路径键（规范化的绝对路径）
+    """
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    打开缓存数据库：允许在其他线程中使用（由调用方加锁），启用WAL日志模式使读取与其他任务的写入互不阻塞
+    """
+    conn = sqlite3.connect(path, timeout=_BUSY_TIMEOUT, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        # 不支持WAL的文件系统（如部分网络文件系统）使用默认的日志模式
+        pass
+    return conn
+
+
+class AnalysisCache:
+    """
+    文件级分析结果缓存
+    """
+
+    def __init__(self, cache_dir: str, tool_version: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.tool_version = tool_version
+        self.hits = 0
+        self.misses = 0
+        # 等待commit()写入的结果行和修改时间刷新
+        self._pending_rows = []
+        self._pending_mtimes = []
+        self._lock = threading.Lock()
+        self._conn = _connect(self.path)
+        self._init_schema()
+
+    def _init_schema(self):
+        """
+        初始化表结构，结构版本不一致时重建缓存
+        """
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != CACHE_SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS file_results")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                         (str(CACHE_SCHEMA_VERSION),))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_results ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " standard TEXT NOT NULL,"
+            " tool_version TEXT NOT NULL,"
+            " language TEXT,"
+            " line_stats TEXT NOT NULL,"
+            " metrics TEXT,"
+            " issues TEXT NOT NULL,"
+            " fingerprints BLOB)"
+        )
+        conn.commit()
+
+    def probe(self, file_path: str, standard: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        检查文件的缓存结果是否仍然有效（不读取文件内容）
+
+        Returns:
+            (是否有效, 待校验的内容哈希)：大小和修改时间都未变化时为 (True, None)，计入命中；
+            只有修改时间变化时为 (False, 缓存的内容哈希)，由调用方计算内容哈希后调用confirm()
+            （并行分析时在工作进程中计算，不在主进程中逐个读取文件）；其余情况为 (False, None)，计入未命中
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.misses += 1
+            return False, None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, content_hash, standard, tool_version FROM file_results WHERE path = ?",
+                (cache_key_path(file_path),)
+            ).fetchone()
+
+        if (row is None or row[0] != stat.st_size or row[3] != (standard or "")
+                or row[4] != self.tool_version):
+            self.misses += 1
+            return False, None
+
+        if row[1] != stat.st_mtime_ns:
+            return False, row[2]
+
+        self.hits += 1
+        return True, None
+
+    def confirm(self, file_path: str, mtime_ns: Optional[int], unchanged: bool):
+        """
+        probe()返回待校验的内容哈希时，在校验后调用：内容未变时计入命中，修改时间在commit()时刷新，否则计入未命中
+        """
+        if not unchanged:
+            self.misses += 1
+            return
+        with self._lock:
+            self._pending_mtimes.append((mtime_ns, cache_key_path(file_path)))
+        self.hits += 1
+
+    def check(self, file_path: str, standard: Optional[str]) -> bool:
+        """
+        检查文件的缓存结果是否仍然有效，并计入命中统计
+
+        大小和修改时间都未变化时直接命中；只有修改时间变化时在当前进程中重新计算内容哈希，
+        内容未变则仍然命中并刷新修改时间。
+        """
+        valid, expected_hash = self.probe(file_path, standard)
+        if expected_hash is None:
+            return valid
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            unchanged = hash_file(file_path) == expected_hash
+        except OSError:
+            mtime_ns, unchanged = None, False
+        self.confirm(file_path, mtime_ns, unchanged)
+        return unchanged
+
+    def load(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        读取文件的缓存结果（不做有效性检查，应先调用check）
+
+        Returns:
+            包含language、line_stats、metrics、issues及文件元数据的字典（保存了指纹时还包含fingerprints），
+            缓存中不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, content_hash, language, line_stats, metrics, issues, fingerprints"
+                " FROM file_results WHERE path = ?",
+                (cache_key_path(file_path),)
+            ).fetchone()
+        if row is None:
+            return None
+        issues = json.loads(row[6])
+        for issue in issues:
+            issue["file"] = file_path
+        result = {
+            "file": file_path,
+            "size": row[0],
+            "mtime_ns": row[1],
+            "content_hash": row[2],
+            "language": row[3],
+            "line_stats": json.loads(row[4]),
+            "metrics": json.loads(row[5]) if row[5] else None,
+            "issues": issues,
+        }
+        if row[7] is not None:
+            result["fingerprints"] = unpack_fingerprints(row[7])
+        return result
+
+    def lookup(self, file_path: str, standard: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        查找文件的有效缓存结果，未命中时返回None
+        """
+        return self.load(file_path) if self.check(file_path, standard) else None
+
+    def store(self, file_result: Dict[str, Any], standard: Optional[str]):
+        """
+        保存文件的分析结果（加入待写入队列，commit()时写入数据库）
+
+        file_result需要包含分析时记录的size、mtime_ns和content_hash，包含fingerprints时同时保存指纹
+        """
+        if not file_result.get("content_hash"):
+            return
+        # 立即序列化：结果中的问题随后会进入报告（可能被修改）
+        row = (
+            cache_key_path(file_result["file"]),
+            file_result["size"],
+            file_result["mtime_ns"],
+            file_result["content_hash"],
+            standard or "",
+            self.tool_version,
+            file_result["language"],
+            json.dumps(file_result["line_stats"]),
+            json.dumps(file_result["metrics"], ensure_ascii=False) if file_result.get("metrics") else None,
+            json.dumps(file_result["issues"], ensure_ascii=False),
+            pack_fingerprints(file_result["fingerprints"]) if "fingerprints" in file_result else None,
+        )
+        with self._lock:
+            self._pending_rows.append(row)
+
+    @property
+    def pending(self) -> int:
+        """
+        等待commit()写入的结果数
+        """
+        return len(self._pending_rows)
+
+    def baseline_stats(self, file_paths: List[str], fingerprints: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        读取一批文件在缓存中的语言、行数统计和代码度量（不校验文件是否变化）
+
+        Args:
+            fingerprints: 是否同时读取保存的指纹
+
+        Returns:
+            {文件路径: 包含language、line_stats、metrics的字典}，保存了指纹且fingerprints为True时还包含fingerprints，
+            缓存中不存在的文件不包含在结果中
+        """
+        wanted = {cache_key_path(file_path): file_path for file_path in file_paths}
+        result = {}
+        columns = "path, language, line_stats, metrics" + (", fingerprints" if fingerprints else "")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM file_results WHERE tool_version = ?", (self.tool_version,)
+            ).fetchall()
+        for row in rows:
+            if row[0] in wanted:
+                entry = {"language": row[1], "line_stats": json.loads(row[2]),
+                         "metrics": json.loads(row[3]) if row[3] else None}
+                if fingerprints and row[4] is not None:
+                    entry["fingerprints"] = unpack_fingerprints(row[4])
+                result[wanted[row[0]]] = entry
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        返回缓存命中统计
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def commit(self):
+        """
+        在一个短事务中写入排队的结果和修改时间刷新
+        """
+        with self._lock:
+            rows, self._pending_rows = self._pending_rows, []
+            pending_mtimes, self._pending_mtimes = self._pending_mtimes, []
+        if not rows and not pending_mtimes:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_results"
+                " (path, size, mtime_ns, content_hash, standard, tool_version, language, line_stats, metrics, issues,"
+                " fingerprints)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany("UPDATE file_results SET mtime_ns = ? WHERE path = ?", pending_mtimes)
+
+    def close(self):
+        """
+        写入排队的结果并关闭缓存
+        """
+        try:
+            self.commit()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    规范化提示词：合并连续空白，使仅有空白差异的提示词共用缓存
+    """
+    return " ".join(prompt.split())
+
+
+class SuggestionCache:
+    """
+    AI建议缓存，按 (规范化提示词, 提供商, 模型) 保存，支持过期时间和条目数上限（按最近使用淘汰）
+
+    读取时的最近使用时间刷新、过期删除和新写入的建议都在close()时一次写入，等待大模型期间不持有数据库写锁。
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 7 * 24 * 3600, max_entries: int = 100000):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # 等待close()写入的最近使用时间刷新、过期删除和新建议
+        self._used: Dict[str, float] = {}
+        self._expired: List[str] = []
+        self._new: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._conn = _connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions ("
+            " key TEXT PRIMARY KEY,"
+            " suggestion TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS suggestions_last_used ON suggestions (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(normalized_prompt: str, provider: str, model: str) -> str:
+        """
+        生成缓存键
+        """
+        raw = "\0".join((provider, model or "", normalized_prompt))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取未过期的缓存建议，并刷新其最近使用时间
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT suggestion, created_at FROM suggestions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl and now - row[1] > self.ttl:
+                self._expired.append(key)
+                self.misses += 1
+                return None
+            self._used[key] = now
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, suggestion: str):
+        """
+        保存建议（close()时写入数据库）
+        """
+        with self._lock:
+            self._new[key] = (suggestion, time.time())
+
+    def _evict(self):
+        """
+        删除过期条目，并在超过条目数上限时淘汰最久未使用的条目
+        """
+        if self.ttl:
+            self._conn.execute("DELETE FROM suggestions WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        if self.max_entries and count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM suggestions WHERE key IN"
+                " (SELECT key FROM suggestions ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def close(self):
+        """
+        在一个短事务中写入排队的变更并执行淘汰，然后关闭缓存
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM suggestions WHERE key = ?", [(key,) for key in self._expired])
+                    self._conn.executemany("UPDATE suggestions SET last_used = ? WHERE key = ?",
+                                           [(used, key) for key, used in self._used.items()])
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO suggestions (key, suggestion, created_at, last_used) VALUES (?, ?, ?, ?)",
+                        [(key, suggestion, now, now) for key, (suggestion, now) in self._new.items()]
+                    )
+                    self._evict()
+            finally:
+                self._conn.close()
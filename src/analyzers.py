@@ -0,0 +1,257 @@
+"""
+可插拔的外部分析工具运行器
+
+每个分析标准（pylint、eslint、cppcheck等）对应一个运行器：通过subprocess调用本地安装的工具并解析其机器可读输出，
+统一转换为报告使用的问题字典（file、line、severity、type、message、solution）。
+运行器每次调用处理一批文件以分摊工具启动开销，并受超时限制；工具未安装、超时或输出无法解析时抛出AnalyzerError，
+由调用方退回内置分析器。
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+# 默认的单次调用超时（秒）与每次调用的文件数
+DEFAULT_TIMEOUT = 120
+DEFAULT_BATCH_SIZE = 200
+
+# 可执行文件名 -> 查找结果（进程内缓存）
+_executables: Dict[str, Optional[str]] = {}
+
+
+class AnalyzerError(Exception):
+    """
+    外部分析工具运行失败（超时、异常退出或输出无法解析）
+    """
+
+
+def find_executable(name: str) -> Optional[str]:
+    """
+    查找可执行文件路径，结果在进程内缓存
+    """
+    if name not in _executables:
+        _executables[name] = shutil.which(name)
+    return _executables[name]
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class AnalyzerRunner:
+    """
+    外部分析工具运行器基类
+
+    子类定义executable、command()和parse()；parse()产出 (工具报告的文件路径, 问题字典)。
+    """
+
+    # 工具名（用于问题类型前缀和日志）
+    name = ""
+    # 可执行文件名
+    executable = ""
+    # 工具的严重级别 -> 风险等级
+    severity_map: Dict[str, str] = {}
+    # 工具输出的严重级别不在severity_map中时使用的风险等级
+    default_severity = "low"
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.timeout = timeout
+        self.batch_size = max(1, int(batch_size))
+
+    def available(self) -> bool:
+        """
+        工具是否已安装
+        """
+        return find_executable(self.executable) is not None
+
+    def command(self, files: List[str]) -> List[str]:
+        """
+        构造分析一批文件的命令行
+        """
+        raise NotImplementedError
+
+    def parse(self, stdout: str, stderr: str) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """
+        解析工具输出，产出 (文件路径, 问题字典)
+        """
+        raise NotImplementedError
+
+    def severity(self, level: Any) -> str:
+        return self.severity_map.get(str(level).lower(), self.default_severity)
+
+    def issue(self, file_path: str, line: Any, level: Any, rule: Any, message: str) -> Dict[str, Any]:
+        """
+        构造统一格式的问题字典
+        """
+        rule = str(rule or "unknown")
+        return {
+            "file": file_path,
+            "line": int(line or 0),
+            "severity": self.severity(level),
+            "type": f"{self.name}:{rule}",
+            "message": message.strip(),
+            "solution": f"参考{self.name}规则 {rule} 的说明进行修复"
+        }
+
+    def analyze(self, files: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        分批调用工具分析文件
+
+        Returns:
+            文件路径（与传入路径一致） -> 问题列表
+        """
+        results = {file_path: [] for file_path in files}
+        originals = {_path_key(file_path): file_path for file_path in files}
+        for start in range(0, len(files), self.batch_size):
+            batch = files[start:start + self.batch_size]
+            try:
+                completed = subprocess.run(
+                    self.command(batch), capture_output=True, text=True,
+                    encoding="utf-8", errors="replace", timeout=self.timeout
+                )
+            except subprocess.TimeoutExpired:
+                raise AnalyzerError(f"{self.name} 分析 {len(batch)} 个文件超时（{self.timeout}秒）")
+            except OSError as e:
+                raise AnalyzerError(f"{self.name} 无法启动: {e}")
+            try:
+                parsed = list(self.parse(completed.stdout, completed.stderr))
+            except (ValueError, KeyError, TypeError) as e:
+                detail = (completed.stderr or completed.stdout).strip().splitlines()[-1:] or [str(e)]
+                raise AnalyzerError(f"{self.name} 输出无法解析（退出码 {completed.returncode}）: {detail[0]}")
+            for reported_path, issue in parsed:
+                file_path = originals.get(_path_key(reported_path))
+                if file_path is not None:
+                    issue["file"] = file_path
+                    results[file_path].append(issue)
+        return results
+
+
+class PylintRunner(AnalyzerRunner):
+    name = "pylint"
+    executable = "pylint"
+    severity_map = {"fatal": "critical", "error": "high", "warning": "medium"}
+
+    def command(self, files: List[str]) -> List[str]:
+        return [find_executable(self.executable) or self.executable,
+                "--output-format=json", "--score=n", "--persistent=n", *files]
+
+    def parse(self, stdout: str, stderr: str):
+        for item in json.loads(stdout or "[]"):
+            yield item["path"], self.issue(item["path"], item["line"], item["type"],
+                                           item.get("symbol") or item.get("message-id"), item["message"])
+
+
+class EslintRunner(AnalyzerRunner):
+    name = "eslint"
+    executable = "eslint"
+    severity_map = {"2": "high", "1": "medium"}
+
+    def command(self, files: List[str]) -> List[str]:
+        return [find_executable(self.executable) or self.executable,
+                "--format", "json", "--no-error-on-unmatched-pattern", *files]
+
+    def parse(self, stdout: str, stderr: str):
+        for result in json.loads(stdout):
+            for message in result["messages"]:
+                issue = self.issue(result["filePath"], message.get("line"), message.get("severity"),
+                                   message.get("ruleId") or "parse-error", message["message"])
+                if message.get("fatal"):
+                    issue["severity"] = "critical"
+                yield result["filePath"], issue
+
+
+class CppcheckRunner(AnalyzerRunner):
+    name = "cppcheck"
+    executable = "cppcheck"
+    severity_map = {"error": "high", "warning": "medium"}
+    _separator = ":::"
+
+    def command(self, files: List[str]) -> List[str]:
+        template = self._separator.join(["{file}", "{line}", "{severity}", "{id}", "{message}"])
+        return [find_executable(self.executable) or self.executable, "--quiet",
+                "--enable=warning,style,performance,portability", f"--template={template}", *files]
+
+    def parse(self, stdout: str, stderr: str):
+        # cppcheck将问题输出到stderr
+        for line in stderr.splitlines():
+            parts = line.split(self._separator, 4)
+            if len(parts) == 5:
+                file_path, line_no, level, rule, message = parts
+                yield file_path, self.issue(file_path, line_no if line_no.isdigit() else 0, level, rule, message)
+
+
+class ShellcheckRunner(AnalyzerRunner):
+    name = "shellcheck"
+    executable = "shellcheck"
+    severity_map = {"error": "high", "warning": "medium"}
+
+    def command(self, files: List[str]) -> List[str]:
+        return [find_executable(self.executable) or self.executable, "--format=json", *files]
+
+    def parse(self, stdout: str, stderr: str):
+        for item in json.loads(stdout or "[]"):
+            yield item["file"], self.issue(item["file"], item["line"], item["level"], f"SC{item['code']}",
+                                           item["message"])
+
+
+class HadolintRunner(AnalyzerRunner):
+    name = "hadolint"
+    executable = "hadolint"
+    severity_map = {"error": "high", "warning": "medium"}
+
+    def command(self, files: List[str]) -> List[str]:
+        return [find_executable(self.executable) or self.executable, "--format", "json", "--no-fail", *files]
+
+    def parse(self, stdout: str, stderr: str):
+        for item in json.loads(stdout or "[]"):
+            yield item["file"], self.issue(item["file"], item["line"], item["level"], item["code"], item["message"])
+
+
+# 分析标准 -> 运行器类
+RUNNERS: Dict[str, Type[AnalyzerRunner]] = {
+    "pylint": PylintRunner,
+    "eslint": EslintRunner,
+    "typescript-eslint": EslintRunner,
+    "cppcheck": CppcheckRunner,
+    "shellcheck": ShellcheckRunner,
+    "hadolint": HadolintRunner,
+}
+
+
+def register_runner(standard: str, runner_class: Type[AnalyzerRunner]):
+    """
+    注册（或替换）分析标准对应的运行器
+    """
+    RUNNERS[standard] = runner_class
+
+
+def get_runner(standard: str, config: Dict[str, Any]) -> Optional[AnalyzerRunner]:
+    """
+    获取分析标准对应的可用运行器，未启用外部工具、没有运行器或工具未安装时返回None
+
+    Args:
+        config: 分析器配置（enabled、timeout、batch_size及按工具覆盖的timeouts）
+    """
+    if not config.get("enabled", True) or standard not in RUNNERS:
+        return None
+    runner_class = RUNNERS[standard]
+    timeout = config.get("timeouts", {}).get(runner_class.name, config.get("timeout", DEFAULT_TIMEOUT))
+    runner = runner_class(timeout=timeout, batch_size=config.get("batch_size", DEFAULT_BATCH_SIZE))
+    return runner if runner.available() else None
+
+
+def engine_key(standard: Optional[str], config: Dict[str, Any], builtin: str = "builtin",
+               fallback: bool = False) -> Optional[str]:
+    """
+    分析引擎标识（写入增量缓存）：外部工具可用与否会改变分析结果，退回内置分析器时追加内置分析器标识
+
+    Args:
+        builtin: 内置分析器标识，应包含影响其结果的配置
+        fallback: 外部工具可用但运行失败（AnalyzerError）时为True，结果来自内置分析器，
+            使用内置分析器的标识，避免下次运行把它当作外部工具的结果复用
+    """
+    if standard is None:
+        return None
+    return standard if not fallback and get_runner(standard, config) else f"{standard}:{builtin}"
@@ -0,0 +1,392 @@
+"""
+基于滚动哈希与winnowing指纹的重复代码检测
+
+每个文件先转换为规范化的词法单元流：去掉注释和空白，字符串与数字字面量统一替换为占位符，标识符和运算符保持原样。
+对连续KGRAM个词法单元计算滚动哈希，再用winnowing在每WINDOW个相邻哈希中选取最小值作为文件指纹，
+长度不少于KGRAM+WINDOW-1个词法单元的重复片段一定会被发现。
+
+指纹（哈希、起止行号）保存在紧凑的整数数组中，全部文件的指纹按"哈希高位|指纹序号"打包为64位整数后排序，
+相同哈希的指纹相邻，一次线性扫描即可找出所有重复，整体复杂度接近线性，百万行代码的指纹只占用数十MB内存。
+"""
+
+import os
+import re
+import struct
+import zlib
+from array import array
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .line_counter import COMMENT_SYNTAX, MAX_CONTENT_SIZE
+
+# 每个指纹覆盖的词法单元数
+KGRAM = 25
+# winnowing窗口大小
+WINDOW = 24
+# 报告为问题的最小重复行数
+DEFAULT_MIN_LINES = 30
+# 出现次数超过该值的指纹只计入重复率，不逐一配对报告（通常是样板代码）
+MAX_GROUP_SIZE = 64
+# 用于判断二进制文件的文件头长度
+BINARY_SNIFF_SIZE = 8192
+
+_BASE = 1000003
+_MASK = (1 << 64) - 1
+_POWER = pow(_BASE, KGRAM - 1, 1 << 64)
+
+# 单行字符串：反斜杠转义包括行尾的续行（反斜杠加换行），因此可以跨行
+_STRING = (rb'"[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*"|' + rb"'[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*'|"
+           rb"`[^`\\]*(?:\\[\s\S][^`\\]*)*`")
+# 各语言的三引号字符串（Python文档字符串在line_counter中按块注释统计，这里作为字符串字面量）
+_TRIPLE_QUOTED = rb'"""[\s\S]*?"""|' + rb"'''[\s\S]*?'''"
+
+# 词法单元：标识符、数字、多字符运算符、单个符号（字符串已替换为占位符"），代码度量与指纹共用
+_TOKEN = re.compile(
+    rb"[A-Za-z_$@][\w$]*|\d[\w.]*"
+    rb"|>>>=|<<=|>>=|\*\*=|\?\?=|\.\.\.|===|!==|<=>"
+    rb"|&&|\|\||==|!=|<=|>=|->|=>|::|\+\+|--|\?\.|\?\?|\?:|<<|>>|\*\*|:=|[-+*/%&|^]="
+    rb"|[^\s\w]"
+)
+
+# 删除注释、替换字符串后的各行，以及含词法单元的行 [(行号, 词法单元列表)]
+TokenLines = Tuple[List[bytes], List[Tuple[int, List[bytes]]]]
+
+# 语言 -> 注释与字符串字面量的正则（分组1为注释，分组2为字符串）
+_literal_patterns: Dict[Optional[str], re.Pattern] = {}
+
+
+class Fingerprints(NamedTuple):
+    # 指纹哈希
+    hashes: array
+    # 指纹覆盖的起止行号
+    starts: array
+    ends: array
+    # 第i个字节为1表示第i行包含词法单元（第0个字节不使用）
+    token_lines: bytearray
+
+
+def literal_pattern(language: Optional[str]) -> re.Pattern:
+    """
+    获取某种语言的注释与字符串字面量正则，结果在进程内缓存
+    """
+    pattern = _literal_patterns.get(language)
+    if pattern is None:
+        syntax = COMMENT_SYNTAX.get(language, {"line": (), "block": ()})
+        comments = [re.escape(prefix) + rb"[^\n]*" for prefix in syntax["line"]]
+        strings = [_STRING]
+        first_chars = {b'"', b"'", b"`"} | {prefix[:1] for prefix in syntax["line"]}
+        for start, end in syntax["block"]:
+            if start in (b'"""', b"'''"):
+                if strings[0] is not _TRIPLE_QUOTED:
+                    strings.insert(0, _TRIPLE_QUOTED)
+            else:
+                comments.insert(0, re.escape(start) + rb"[\s\S]*?" + re.escape(end))
+                first_chars.add(start[:1])
+        # 先用首字符前瞻快速跳过不可能匹配的位置
+        pattern = re.compile(
+            b"(?=[" + b"".join(re.escape(char) for char in sorted(first_chars)) + b"])(?:("
+            + (b"|".join(comments) or rb"(?!)") + b")|(" + b"|".join(strings) + b"))"
+        )
+        _literal_patterns[language] = pattern
+    return pattern
+
+
+def _strip_literal(match: re.Match) -> bytes:
+    # 注释删除、字符串替换为占位符，保留其中的换行以维持行号
+    newlines = b"\n" * match.group().count(b"\n")
+    return newlines if match.lastindex == 1 else b'"' + newlines
+
+
+def strip_literals(data: bytes, language: Optional[str]) -> bytes:
+    """
+    删除注释并将字符串字面量替换为占位符（"），行号保持不变
+    """
+    return literal_pattern(language).sub(_strip_literal, data)
+
+
+def tokenize_lines(data: bytes, language: Optional[str]) -> TokenLines:
+    """
+    删除注释、替换字符串字面量后逐行切分词法单元（代码度量与指纹共用同一次切分结果）
+
+    Returns:
+        (删除注释、替换字符串后的各行, 含词法单元的行 [(行号, 词法单元列表)])
+    """
+    raw_lines = strip_literals(data, language).split(b"\n")
+    findall = _TOKEN.findall
+    lines = []
+    for line_no, content in enumerate(raw_lines, 1):
+        if content and not content.isspace():
+            tokens = findall(content)
+            if tokens:
+                lines.append((line_no, tokens))
+    return raw_lines, lines
+
+
+def normalize_tokens(data: bytes, language: Optional[str],
+                     tokenized: Optional[TokenLines] = None) -> Tuple[List[bytes], List[int]]:
+    """
+    将源码转换为规范化的词法单元流（数字字面量替换为占位符0）
+
+    Args:
+        tokenized: 已有的tokenize_lines()结果，为None时重新切分
+
+    Returns:
+        (词法单元列表, 每个词法单元所在的行号)
+    """
+    if tokenized is None:
+        tokenized = tokenize_lines(data, language)
+    tokens = []
+    lines = []
+    for line, line_tokens in tokenized[1]:
+        tokens += [b"0" if token[:1].isdigit() else token for token in line_tokens]
+        lines += [line] * len(line_tokens)
+    return tokens, lines
+
+
+def fingerprint_source(data: bytes, language: Optional[str], tokenized: Optional[TokenLines] = None) -> Fingerprints:
+    """
+    计算源码的winnowing指纹：滚动哈希与窗口最小值选取在同一次循环中完成
+
+    Args:
+        tokenized: 已有的tokenize_lines()结果，为None时重新切分
+    """
+    tokens, lines = normalize_tokens(data, language, tokenized)
+    token_lines = bytearray(data.count(b"\n") + 2)
+    for line in lines:
+        token_lines[line] = 1
+
+    values = list(map(zlib.crc32, tokens))
+    hashes = array("Q")
+    starts = array("I")
+    ends = array("I")
+    # 窗口内按哈希递增排列的 (哈希, k-gram序号)，队首为窗口最小值
+    window = deque()
+    selected = -1
+    value = 0
+    for i, token in enumerate(values):
+        if i >= KGRAM:
+            value = (value - values[i - KGRAM] * _POWER) & _MASK
+        value = (value * _BASE + token) & _MASK
+        gram = i - KGRAM + 1
+        if gram < 0:
+            continue
+        # 相同哈希取最右侧，保证重复片段选出相同的指纹
+        while window and window[-1][0] >= value:
+            window.pop()
+        window.append((value, gram))
+        if window[0][1] <= gram - WINDOW:
+            window.popleft()
+        if gram >= WINDOW - 1 and window[0][1] != selected:
+            value_min, selected = window[0]
+            hashes.append(value_min)
+            starts.append(lines[selected])
+            ends.append(lines[selected + KGRAM - 1])
+    # 不足一个窗口的文件选取全部k-gram中的最小值
+    if selected < 0 and window:
+        value_min, selected = window[0]
+        hashes.append(value_min)
+        starts.append(lines[selected])
+        ends.append(lines[selected + KGRAM - 1])
+    return Fingerprints(hashes, starts, ends, token_lines)
+
+
+def fingerprint_content(data: bytes, language: Optional[str],
+                        tokenized: Optional[TokenLines] = None) -> Optional[Fingerprints]:
+    """
+    计算已读入内存的文件内容的指纹，二进制内容返回None
+
+    Args:
+        tokenized: 已有的tokenize_lines()结果（如计算代码度量时的切分结果），为None时重新切分
+    """
+    if b"\0" in data[:BINARY_SNIFF_SIZE]:
+        return None
+    return fingerprint_source(data, language, tokenized)
+
+
+def fingerprint_file(file_path: str, language: Optional[str]) -> Optional[Fingerprints]:
+    """
+    读取并计算单个文件的指纹，二进制文件、超过MAX_CONTENT_SIZE的文件或无法读取时返回None
+    """
+    try:
+        if os.path.getsize(file_path) > MAX_CONTENT_SIZE:
+            return None
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return fingerprint_content(data, language)
+
+
+def pack_fingerprints(fingerprints: Optional[Fingerprints]) -> bytes:
+    """
+    将指纹序列化为字节串（写入增量缓存），无法计算指纹的文件为空字节串
+    """
+    if fingerprints is None:
+        return b""
+    return b"".join((struct.pack("<II", len(fingerprints.hashes), len(fingerprints.token_lines)),
+                     fingerprints.hashes.tobytes(), fingerprints.starts.tobytes(), fingerprints.ends.tobytes(),
+                     bytes(fingerprints.token_lines)))
+
+
+def unpack_fingerprints(data: bytes) -> Optional[Fingerprints]:
+    """
+    从pack_fingerprints()的结果还原指纹
+    """
+    if not data:
+        return None
+    count, line_count = struct.unpack_from("<II", data)
+    offset = 8
+    arrays = []
+    for typecode in ("Q", "I", "I"):
+        values = array(typecode)
+        size = count * values.itemsize
+        values.frombytes(data[offset:offset + size])
+        offset += size
+        arrays.append(values)
+    return Fingerprints(*arrays, bytearray(data[offset:offset + line_count]))
+
+
+def fingerprint_files(files: Iterable[Tuple[str, Optional[str]]]) -> List[Optional[Fingerprints]]:
+    """
+    批量计算指纹（供进程池调用）
+    """
+    return [fingerprint_file(file_path, language) for file_path, language in files]
+
+
+class CloneDetector:
+    """
+    跨文件重复代码检测：依次add各文件的指纹，最后调用detect()
+    """
+
+    def __init__(self, min_lines: int = DEFAULT_MIN_LINES):
+        self.min_lines = max(1, int(min_lines))
+        self.paths: List[str] = []
+        self.languages: List[Optional[str]] = []
+        self.token_lines: List[bytearray] = []
+        # 全部文件的指纹依次拼接，offsets[i]为第i个文件的第一个指纹的序号
+        self.hashes = array("Q")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.offsets = array("Q", [0])
+
+    def add(self, file_path: str, language: Optional[str], fingerprints: Optional[Fingerprints]):
+        """
+        加入一个文件的指纹，无法计算指纹的文件传入None
+        """
+        if fingerprints is None:
+            return
+        self.paths.append(file_path)
+        self.languages.append(language)
+        self.token_lines.append(fingerprints.token_lines)
+        self.hashes.extend(fingerprints.hashes)
+        self.starts.extend(fingerprints.starts)
+        self.ends.extend(fingerprints.ends)
+        self.offsets.append(len(self.hashes))
+
+    def _file_of(self) -> array:
+        file_of = array("I", bytes(4 * len(self.hashes)))
+        for index in range(len(self.paths)):
+            file_of[self.offsets[index]:self.offsets[index + 1]] = array("I", [index]) * (
+                self.offsets[index + 1] - self.offsets[index]
+            )
+        return file_of
+
+    def detect(self) -> Dict[str, Any]:
+        """
+        找出重复的指纹，统计各语言的重复行数并将相邻的重复片段合并为问题
+
+        Returns:
+            languages（语言 -> lines、duplicated_lines、duplication）、issues、files、fingerprints、
+            duplicated_lines、duplication
+        """
+        total = len(self.hashes)
+        id_bits = max(1, total.bit_length())
+        id_mask = (1 << id_bits) - 1
+        # 打包后排序：哈希相同的指纹相邻，且按文件顺序排列
+        keys = sorted(((value >> id_bits) << id_bits) | index for index, value in enumerate(self.hashes))
+
+        file_of = self._file_of()
+        duplicated = bytearray(total)
+        # (复制方文件, 原始文件) -> [(复制方起止行, 原始起止行)]
+        pairs = defaultdict(list)
+        i = 0
+        while i < total:
+            prefix = keys[i] >> id_bits
+            j = i + 1
+            while j < total and keys[j] >> id_bits == prefix:
+                j += 1
+            if j - i > 1:
+                members = [key & id_mask for key in keys[i:j]]
+                for member in members:
+                    duplicated[member] = 1
+                if j - i <= MAX_GROUP_SIZE:
+                    original = members[0]
+                    for member in members[1:]:
+                        pairs[(file_of[member], file_of[original])].append(
+                            (self.starts[member], self.ends[member], self.starts[original], self.ends[original])
+                        )
+            i = j
+        del keys
+
+        languages = defaultdict(lambda: {"lines": 0, "duplicated_lines": 0})
+        for index, token_lines in enumerate(self.token_lines):
+            marks = bytearray(len(token_lines))
+            for fp in range(self.offsets[index], self.offsets[index + 1]):
+                if duplicated[fp]:
+                    start, end = self.starts[fp], self.ends[fp] + 1
+                    marks[start:end] = token_lines[start:end]
+            stats = languages[self.languages[index]]
+            stats["lines"] += token_lines.count(1)
+            stats["duplicated_lines"] += marks.count(1)
+        for stats in languages.values():
+            stats["duplication"] = _percent(stats["duplicated_lines"], stats["lines"])
+
+        issues = []
+        for (copy, original), spans in sorted(pairs.items()):
+            issues.extend(self._merge_spans(copy, original, spans))
+        total_lines = sum(stats["lines"] for stats in languages.values())
+        duplicated_lines = sum(stats["duplicated_lines"] for stats in languages.values())
+        return {
+            "languages": dict(languages),
+            "issues": issues,
+            "files": len(self.paths),
+            "fingerprints": total,
+            "duplicated_lines": duplicated_lines,
+            "duplication": _percent(duplicated_lines, total_lines)
+        }
+
+    def _merge_spans(self, copy: int, original: int,
+                     spans: List[Tuple[int, int, int, int]]) -> List[Dict[str, Any]]:
+        """
+        合并同一对文件间行号相连的重复片段，超过min_lines的片段报告为问题
+        """
+        issues = []
+        merged = []
+        for span in sorted(spans):
+            # 同一文件内与自身重叠的片段（如大量相似的连续语句）不是复制
+            if copy == original and span[0] <= span[3] and span[2] <= span[1]:
+                continue
+            last = merged[-1] if merged else None
+            # 复制方与原始文件中的片段都相连时才合并
+            if last and span[0] <= last[1] + 1 and span[2] <= last[3] + 1 and span[3] >= last[2] - 1:
+                merged[-1] = (last[0], max(last[1], span[1]), min(last[2], span[2]), max(last[3], span[3]))
+            else:
+                merged.append(span)
+        for start, end, original_start, original_end in merged:
+            lines = end - start + 1
+            if lines < self.min_lines:
+                continue
+            issues.append({
+                "file": self.paths[copy],
+                "line": start,
+                "severity": "high" if lines >= 3 * self.min_lines else "medium",
+                "type": "duplicate-code",
+                "message": f"第{start}-{end}行（{lines}行）与 {self.paths[original]} "
+                           f"第{original_start}-{original_end}行重复",
+                "solution": "将重复的代码提取为公共函数、类或模块，由各处调用"
+            })
+        return issues
+
+
+def _percent(part: int, whole: int) -> float:
+    return round(part / whole * 100, 2) if whole else 0.0
@@ -0,0 +1,423 @@
+"""
+本地代码度量引擎（无第三方依赖）
+
+每个文件只读取和词法切分一次：注释删除、字符串替换为占位符后逐行切分词法单元（clone_detector.tokenize_lines，
+与重复代码检测共用），在同一次循环中完成
+    - 函数识别与函数长度：花括号语言按"名称(...){"及function/func/fn/def等声明关键字识别，
+      Python、Ruby和Lua按定义行的缩进识别函数体范围
+    - 圈复杂度：1 + 函数内的分支关键字和短路运算符数量（各语言的分支词法单元见DECISION_TOKENS），
+      内置Python分析器的too-complex规则使用同一计算结果；字符串整体替换为占位符，f字符串替换字段中的条件表达式不计入
+    - 嵌套深度：函数体内花括号（或缩进层级）的最大深度
+    - Halstead体积：按文件统计运算符/操作数的种类数和出现次数，V = N * log2(n)
+    - 可维护性指数：MI = max(0, (171 - 5.2ln(V) - 0.23G - 16.2ln(L) + 50sin(sqrt(2.46 * 注释率弧度))) * 100 / 171)，
+      与radon的计算方式一致，20以上为A，10~19为B，10以下为C
+
+度量在并行分析的工作进程中计算，单个文件的结果只包含汇总数值和复杂度最高的少数函数，可直接写入增量缓存。
+"""
+
+import heapq
+import math
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .clone_detector import TokenLines, tokenize_lines
+
+# 度量规则版本（写入增量缓存），修改计算方式后递增
+METRICS_VERSION = 4
+# 圈复杂度超过该值的函数计为复杂函数
+COMPLEX_FUNCTION_THRESHOLD = 10
+# 超过该行数的函数计为过长函数
+LONG_FUNCTION_LINES = 60
+# 每个文件保留的复杂度最高的函数数
+FILE_HOTSPOTS = 3
+# 汇总结果中保留的复杂度最高的函数数
+DEFAULT_TOP_FUNCTIONS = 10
+
+_C_DECISIONS = frozenset((b"if", b"for", b"while", b"case", b"catch", b"&&", b"||", b"?"))
+# 语言 -> 增加圈复杂度的词法单元
+DECISION_TOKENS: Dict[Optional[str], frozenset] = {
+    None: _C_DECISIONS,
+    "python": frozenset((b"if", b"elif", b"for", b"while", b"except", b"assert", b"and", b"or")),
+    "ruby": frozenset((b"if", b"elsif", b"unless", b"while", b"until", b"for", b"when", b"rescue",
+                       b"and", b"or", b"&&", b"||")),
+    "lua": frozenset((b"if", b"elseif", b"for", b"while", b"until", b"and", b"or")),
+    "perl": frozenset((b"if", b"elsif", b"unless", b"for", b"foreach", b"while", b"until",
+                       b"and", b"or", b"&&", b"||", b"?")),
+    "shell": frozenset((b"if", b"elif", b"for", b"while", b"until", b"&&", b"||")),
+    "go": frozenset((b"if", b"for", b"case", b"&&", b"||")),
+    "rust": frozenset((b"if", b"for", b"while", b"=>", b"&&", b"||", b"?")),
+    "swift": frozenset((b"if", b"guard", b"for", b"while", b"case", b"catch", b"&&", b"||", b"??")),
+    "kotlin": frozenset((b"if", b"for", b"while", b"catch", b"&&", b"||", b"?:")),
+    "scala": frozenset((b"if", b"for", b"while", b"case", b"catch", b"&&", b"||")),
+    "groovy": _C_DECISIONS | {b"?:"},
+    "csharp": _C_DECISIONS | {b"foreach", b"??"},
+    "php": _C_DECISIONS | {b"foreach", b"elseif", b"??", b"and", b"or"},
+    "javascript": _C_DECISIONS | {b"??"},
+    "typescript": _C_DECISIONS | {b"??"},
+    "dart": _C_DECISIONS | {b"??"},
+    "r": frozenset((b"if", b"for", b"while", b"&&", b"||")),
+    "sql": frozenset((b"when",)),
+    "cmake": frozenset((b"if", b"elseif", b"foreach", b"while")),
+    "makefile": frozenset(),
+    "dockerfile": frozenset(),
+}
+# 语言 -> 软关键字分支：只在语句行首且行尾为":"时计入（Python的case也可以用作普通标识符）
+_STATEMENT_DECISIONS = {"python": frozenset((b"case",))}
+
+# 按缩进界定函数体的语言 -> 函数定义关键字
+_INDENT_FUNCTIONS = {"python": b"def", "ruby": b"def", "lua": b"function"}
+# 不识别函数的语言（只统计文件级度量）
+_NO_FUNCTIONS = frozenset(("sql", "makefile", "cmake", "dockerfile"))
+# 声明函数的关键字（其后的标识符为函数名，紧跟"("时为匿名函数）
+_FUNCTION_KEYWORDS = frozenset((b"function", b"func", b"fn", b"fun", b"sub", b"def"))
+# 其后的"(...){"不是函数体的关键字
+_CONTROL_KEYWORDS = frozenset((
+    b"if", b"else", b"elif", b"for", b"foreach", b"while", b"do", b"switch", b"case", b"catch", b"try",
+    b"finally", b"return", b"sizeof", b"typeof", b"using", b"lock", b"synchronized", b"with", b"match",
+    b"when", b"guard", b"defer", b"select", b"new", b"await", b"yield", b"throw", b"in", b"is", b"not",
+))
+# 出现时放弃等待中的函数名（类型定义等）
+_RESET_KEYWORDS = frozenset((
+    b"class", b"struct", b"interface", b"enum", b"namespace", b"impl", b"trait", b"object", b"module",
+    b"record", b"extension", b"protocol", b"union",
+))
+_BRACKET_OPEN = frozenset((b"(", b"[", b"{"))
+_BRACKET_CLOSE = frozenset((b")", b"]", b"}"))
+# Halstead统计中按运算符计数的关键字
+_KEYWORDS = _CONTROL_KEYWORDS | _RESET_KEYWORDS | _FUNCTION_KEYWORDS | frozenset((
+    b"elsif", b"elseif", b"unless", b"until", b"except", b"rescue", b"break", b"continue", b"goto",
+    b"and", b"or", b"end", b"then", b"fi", b"done", b"esac", b"pass", b"raise", b"import", b"from",
+    b"as", b"const", b"let", b"var", b"val", b"static", b"public", b"private", b"protected", b"final",
+    b"abstract", b"async", b"go", b"chan", b"local", b"loop", b"mut", b"pub", b"use", b"extends",
+    b"implements", b"instanceof", b"delete", b"void", b"lambda", b"global", b"nonlocal", b"assert",
+    b"del", b"where", b"override", b"virtual", b"package", b"export", b"default", b"type", b"repeat",
+))
+_ANONYMOUS = b"<anonymous>"
+
+
+def _is_identifier(token: bytes) -> bool:
+    return token[:1].isalpha() or token[:1] in (b"_", b"$")
+
+
+def _function_entry(name: bytes, start: int, end: int, complexity: int, nesting: int) -> List[Any]:
+    # [函数名, 起始行, 行数, 圈复杂度, 最大嵌套深度]
+    return [name.decode("utf-8", "replace"), start, end - start + 1, complexity, nesting]
+
+
+def _brace_functions(lines: List[Tuple[int, List[bytes]]], decisions: frozenset) -> Tuple[List[List[Any]], int]:
+    """
+    按花括号识别函数
+
+    Returns:
+        (函数列表, 函数外的分支数)
+    """
+    functions = []
+    # 打开的函数：[函数名, 起始行, 函数体外层深度, 圈复杂度, 最大嵌套深度]
+    stack = []
+    top_decisions = 0
+    depth = 0
+    paren = 0
+    # 等待"{"的函数名及其是否由声明关键字引出
+    candidate = None
+    declared = False
+    prev = b""
+    for line_no, tokens in lines:
+        for token in tokens:
+            if token in decisions:
+                if stack:
+                    stack[-1][3] += 1
+                else:
+                    top_decisions += 1
+            if token == b"(":
+                if prev in _FUNCTION_KEYWORDS:
+                    # 匿名函数也可能作为调用参数出现
+                    candidate, declared = _ANONYMOUS, True
+                elif paren == 0:
+                    if prev in _CONTROL_KEYWORDS:
+                        candidate = None
+                    elif _is_identifier(prev) and (candidate is None or candidate == _ANONYMOUS):
+                        candidate = prev
+                paren += 1
+            elif token == b")":
+                if paren:
+                    paren -= 1
+            elif token == b"{":
+                if prev == b"=>" or (candidate is not None and (paren == 0 or declared)):
+                    stack.append([candidate or _ANONYMOUS, line_no, depth, 1, 0])
+                    candidate = None
+                elif stack and depth - stack[-1][2] > stack[-1][4]:
+                    stack[-1][4] = depth - stack[-1][2]
+                depth += 1
+            elif token == b"}":
+                if depth:
+                    depth -= 1
+                candidate = None
+                if stack and depth == stack[-1][2]:
+                    name, start, _, complexity, nesting = stack.pop()
+                    functions.append(_function_entry(name, start, line_no, complexity, nesting))
+            elif token == b";" or token in _RESET_KEYWORDS or (token == b"=" and not declared):
+                candidate = None
+            elif prev in _FUNCTION_KEYWORDS and _is_identifier(token) and token not in _KEYWORDS:
+                # function foo / sub foo { / fn foo<T>(...)
+                candidate, declared = token, True
+            if candidate is None:
+                declared = False
+            prev = token
+
+    last_line = lines[-1][0] if lines else 0
+    while stack:
+        name, start, _, complexity, nesting = stack.pop()
+        functions.append(_function_entry(name, start, last_line, complexity, nesting))
+    return functions, top_decisions
+
+
+def _indent_functions(lines: List[Tuple[int, List[bytes]]], raw_lines: List[bytes], decisions: frozenset,
+                      keyword: bytes, statement_decisions: frozenset = frozenset()) -> Tuple[List[List[Any]], int]:
+    """
+    按定义行的缩进识别函数（Python、Ruby、Lua）：之后第一个缩进不大于定义行的代码行结束函数体
+
+    Returns:
+        (函数列表, 函数外的分支数)
+    """
+    functions = []
+    # 打开的函数：[函数名, 起始行, 定义行缩进, 圈复杂度, 最大嵌套深度, 函数体内的缩进层级]
+    stack = []
+    top_decisions = 0
+    brackets = 0
+    last_line = 0
+    for line_no, tokens in lines:
+        # 括号未闭合时为续行，不参与缩进判断
+        if brackets == 0:
+            content = raw_lines[line_no - 1]
+            indent = len(content) - len(content.lstrip())
+            while stack and indent <= stack[-1][2]:
+                name, start, _, complexity, nesting, _ = stack.pop()
+                functions.append(_function_entry(name, start, last_line, complexity, nesting))
+            if stack:
+                levels = stack[-1][5]
+                while levels and indent < levels[-1]:
+                    levels.pop()
+                if not levels or indent > levels[-1]:
+                    levels.append(indent)
+                if len(levels) - 1 > stack[-1][4]:
+                    stack[-1][4] = len(levels) - 1
+            position = 1 if tokens[0] in (b"async", b"local") and len(tokens) > 1 else 0
+            if tokens[position] == keyword:
+                name = tokens[position + 1] if len(tokens) > position + 1 else _ANONYMOUS
+                if name == b"self" and len(tokens) > position + 3 and tokens[position + 2] == b".":
+                    name = tokens[position + 3]
+                stack.append([name if _is_identifier(name) else _ANONYMOUS, line_no, indent, 1, 0, []])
+            elif tokens[0] in statement_decisions and tokens[-1] == b":":
+                if stack:
+                    stack[-1][3] += 1
+                else:
+                    top_decisions += 1
+        for token in tokens:
+            if token in decisions:
+                if stack:
+                    stack[-1][3] += 1
+                else:
+                    top_decisions += 1
+            elif token in _BRACKET_OPEN:
+                brackets += 1
+            elif token in _BRACKET_CLOSE and brackets:
+                brackets -= 1
+        last_line = line_no
+
+    while stack:
+        name, start, _, complexity, nesting, _ = stack.pop()
+        functions.append(_function_entry(name, start, last_line, complexity, nesting))
+    return functions, top_decisions
+
+
+def halstead_volume(counter: Counter) -> float:
+    """
+    根据词法单元出现次数计算Halstead体积：关键字和符号为运算符，标识符、数字和字符串占位符为操作数
+    """
+    operators = operands = 0
+    distinct = len(counter)
+    for token, count in counter.items():
+        if token in _KEYWORDS or not (_is_identifier(token) or token[:1].isdigit() or token == b'"'):
+            operators += count
+        else:
+            operands += count
+    total = operators + operands
+    return total * math.log2(distinct) if distinct > 1 else 0.0
+
+
+def maintainability_index(volume: float, complexity: int, code_lines: int, comment_lines: int) -> float:
+    """
+    计算可维护性指数（0~100）
+    """
+    if volume <= 0 or code_lines <= 0:
+        return 100.0
+    comment_percent = comment_lines * 100 / (code_lines + comment_lines)
+    value = (171 - 5.2 * math.log(volume) - 0.23 * complexity - 16.2 * math.log(code_lines)
+             + 50 * math.sin(math.sqrt(2.46 * math.radians(comment_percent))))
+    return min(max(0.0, value * 100 / 171), 100.0)
+
+
+def maintainability_rating(index: float) -> str:
+    """
+    可维护性等级：A（20以上）、B（10~19）、C（10以下）
+    """
+    if index >= 20:
+        return "A"
+    return "B" if index >= 10 else "C"
+
+
+def compute_metrics(data: bytes, language: Optional[str], line_stats: Optional[Dict[str, int]] = None,
+                    tokenized: Optional[TokenLines] = None, functions_out: Optional[List[List[Any]]] = None
+                    ) -> Dict[str, Any]:
+    """
+    计算单个文件的度量
+
+    Args:
+        data: 文件内容
+        language: 语言类型
+        line_stats: 已统计的行数（使用其中的code和comment计算可维护性指数），为None时按词法单元估算
+        tokenized: 已有的tokenize_lines()结果，为None时重新切分（与重复代码检测共用同一次切分）
+        functions_out: 不为None时追加文件中的全部函数（内置Python分析器据此报告too-complex，不再重复计算圈复杂度）
+
+    Returns:
+        文件度量，hotspots为复杂度最高的函数 [函数名, 起始行, 行数, 圈复杂度, 最大嵌套深度]
+    """
+    raw_lines, lines = tokenized if tokenized is not None else tokenize_lines(data, language)
+    counter = Counter()
+    for _, tokens in lines:
+        counter.update(tokens)
+
+    decisions = DECISION_TOKENS.get(language, _C_DECISIONS)
+    if language in _NO_FUNCTIONS:
+        functions = []
+        top_decisions = sum(counter[token] for token in decisions)
+    elif language in _INDENT_FUNCTIONS:
+        functions, top_decisions = _indent_functions(lines, raw_lines, decisions, _INDENT_FUNCTIONS[language],
+                                                     _STATEMENT_DECISIONS.get(language, frozenset()))
+    else:
+        functions, top_decisions = _brace_functions(lines, decisions)
+    if functions_out is not None:
+        functions_out.extend(functions)
+
+    # 文件的总圈复杂度：各函数复杂度之和加上函数外的分支
+    complexity = sum(function[3] for function in functions) + top_decisions + (0 if functions else 1)
+    volume = halstead_volume(counter)
+    code_lines = line_stats["code"] if line_stats else len(lines)
+    comment_lines = line_stats["comment"] if line_stats else 0
+    index = maintainability_index(volume, complexity, code_lines, comment_lines)
+    lengths = [function[2] for function in functions]
+    return {
+        "functions": len(functions),
+        "complexity": complexity,
+        "function_complexity": sum(function[3] for function in functions),
+        "max_complexity": max((function[3] for function in functions), default=0),
+        "complex_functions": sum(1 for function in functions if function[3] > COMPLEX_FUNCTION_THRESHOLD),
+        "max_nesting": max((function[4] for function in functions), default=0),
+        "function_lines": sum(lengths),
+        "max_function_lines": max(lengths, default=0),
+        "long_functions": sum(1 for length in lengths if length > LONG_FUNCTION_LINES),
+        "halstead_volume": round(volume, 1),
+        "maintainability_index": round(index, 2),
+        "hotspots": heapq.nlargest(FILE_HOTSPOTS, functions, key=lambda function: (function[3], function[2])),
+    }
+
+
+def compute_file_metrics(file_path: str, language: Optional[str],
+                         line_stats: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    """
+    读取并计算单个文件的度量，无法读取时返回None
+    """
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return compute_metrics(data, language, line_stats)
+
+
+class MetricsAggregator:
+    """
+    汇总各文件的度量：可维护性指数按代码行数加权平均，保留全局复杂度最高的函数
+    """
+
+    def __init__(self, top_functions: int = DEFAULT_TOP_FUNCTIONS):
+        self.top_functions = top_functions
+        self.files = 0
+        self.totals = Counter()
+        self.max_values = Counter()
+        self.weighted_index = 0.0
+        self.code_lines = 0
+        self.languages: Dict[str, Counter] = {}
+        self._hotspots = []
+        self._sequence = 0
+
+    def add(self, file_path: str, language: str, metrics: Dict[str, Any], code_lines: int):
+        """
+        累加一个文件的度量
+        """
+        self.files += 1
+        for key in ("functions", "complexity", "function_complexity", "complex_functions", "function_lines",
+                    "long_functions"):
+            self.totals[key] += metrics[key]
+        self.totals["halstead_volume"] += metrics["halstead_volume"]
+        for key in ("max_complexity", "max_nesting", "max_function_lines"):
+            self.max_values[key] = max(self.max_values[key], metrics[key])
+        weight = max(code_lines, 1)
+        self.weighted_index += metrics["maintainability_index"] * weight
+        self.code_lines += weight
+
+        lang = self.languages.setdefault(language, Counter())
+        lang["files"] += 1
+        lang["functions"] += metrics["functions"]
+        lang["function_complexity"] += metrics["function_complexity"]
+        lang["complex_functions"] += metrics["complex_functions"]
+        lang["weighted_index"] += metrics["maintainability_index"] * weight
+        lang["code_lines"] += weight
+
+        for name, line, length, complexity, nesting in metrics["hotspots"]:
+            # 序号保证复杂度相同时按加入顺序排列，且不比较后续字段
+            self._sequence += 1
+            item = (complexity, length, -self._sequence, file_path, name, line, nesting)
+            if len(self._hotspots) < self.top_functions:
+                heapq.heappush(self._hotspots, item)
+            elif item > self._hotspots[0]:
+                heapq.heapreplace(self._hotspots, item)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        返回汇总结果
+        """
+        functions = self.totals["functions"]
+        index = self.weighted_index / self.code_lines if self.code_lines else 100.0
+        return {
+            "files": self.files,
+            "functions": functions,
+            "complexity": self.totals["complexity"],
+            "avg_complexity": round(self.totals["function_complexity"] / functions, 2) if functions else 0.0,
+            "max_complexity": self.max_values["max_complexity"],
+            "complex_functions": self.totals["complex_functions"],
+            "complex_function_ratio": round(self.totals["complex_functions"] / functions, 4) if functions else 0.0,
+            "avg_function_lines": round(self.totals["function_lines"] / functions, 1) if functions else 0.0,
+            "max_function_lines": self.max_values["max_function_lines"],
+            "long_functions": self.totals["long_functions"],
+            "max_nesting": self.max_values["max_nesting"],
+            "halstead_volume": round(self.totals["halstead_volume"], 1),
+            "maintainability_index": round(index, 2),
+            "rating": maintainability_rating(index),
+            "languages": {
+                language: {
+                    "files": stats["files"],
+                    "functions": stats["functions"],
+                    "avg_complexity": (round(stats["function_complexity"] / stats["functions"], 2)
+                                       if stats["functions"] else 0.0),
+                    "complex_functions": stats["complex_functions"],
+                    "maintainability_index": round(stats["weighted_index"] / stats["code_lines"], 2),
+                }
+                for language, stats in sorted(self.languages.items())
+            },
+            "hotspots": [
+                {"file": file_path, "function": name, "line": line, "complexity": complexity,
+                 "nesting": nesting, "lines": length}
+                for complexity, length, _, file_path, name, line, nesting in sorted(self._hotspots, reverse=True)
+            ],
+        }
@@ -0,0 +1,165 @@
+"""
+离线的研发投入估算与维护建议模型（COCOMO风格，结果确定，无需网络）
+
+工作量（人月） = A * KLOC^B * EAF
+    - KLOC为按语言系数加权后的代码行数（千行），语言系数反映各语言每行代码的相对开发工作量
+    - A、B为基本COCOMO的模式常数：organic（小团队、需求明确）、semidetached（中等规模）、embedded（强约束环境）
+    - EAF为工作量调整因子，这里只使用产品复杂度（CPLX）驱动因子，其等级由代码度量
+      （平均圈复杂度、复杂函数占比、可维护性等级）确定
+人日 = 人月 * 19（COCOMO按每人月152工时计），开发周期（月） = 2.5 * 人月^D。
+
+维护建议按规则给出：可维护性等级为C、复杂函数占比超过30%或代码重复率超过30%时建议不继续维护（宜重构或重写）。
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from .code_metrics import COMPLEX_FUNCTION_THRESHOLD
+
+# 模式 -> (A, B, D)
+COCOMO_MODES = {
+    "organic": (2.4, 1.05, 0.38),
+    "semidetached": (3.0, 1.12, 0.35),
+    "embedded": (3.6, 1.20, 0.32),
+}
+DEFAULT_MODE = "organic"
+# 每人月的工作日数
+DAYS_PER_PERSON_MONTH = 19
+
+# 语言 -> 每行代码的相对开发工作量（以Java/C#等为1.0，未列出的语言按1.0计）
+LANGUAGE_FACTORS = {
+    "cpp": 1.1, "objective-c": 1.1, "rust": 1.15,
+    "java": 1.0, "csharp": 1.0, "kotlin": 1.0, "scala": 1.0, "swift": 1.0, "go": 1.0, "dart": 1.0,
+    "typescript": 1.0, "javascript": 0.95, "groovy": 0.95, "php": 0.9,
+    "python": 0.9, "ruby": 0.9, "perl": 0.9, "lua": 0.9, "r": 0.9,
+    "sql": 0.85, "shell": 0.8,
+    "makefile": 0.6, "cmake": 0.6, "dockerfile": 0.6,
+}
+
+# 产品复杂度等级 -> 工作量乘数
+COMPLEXITY_MULTIPLIERS = {"低": 0.85, "标称": 1.0, "高": 1.15, "很高": 1.3, "极高": 1.65}
+
+
+def complexity_rating(metrics: Optional[Dict[str, Any]]) -> str:
+    """
+    根据代码度量确定产品复杂度（CPLX）等级，没有函数度量时为"标称"
+    """
+    if not metrics or not metrics["functions"]:
+        return "标称"
+    average = metrics["avg_complexity"]
+    ratio = metrics["complex_function_ratio"]
+    if metrics["rating"] == "C" or average > 10:
+        return "极高"
+    if average > 7 or ratio > 0.25:
+        return "很高"
+    if average > 4.5 or ratio > 0.1:
+        return "高"
+    if average <= 2 and ratio <= 0.02:
+        return "低"
+    return "标称"
+
+
+def estimate_cost(language_stats: Dict[str, Dict[str, Any]], metrics: Optional[Dict[str, Any]] = None,
+                  mode: str = DEFAULT_MODE) -> Dict[str, Any]:
+    """
+    估算项目的研发投入
+
+    Args:
+        language_stats: 各语言的行数统计（使用其中的code）
+        metrics: 代码度量汇总（MetricsAggregator.result()），为None时复杂度按标称计
+        mode: COCOMO模式（organic、semidetached、embedded）
+
+    Returns:
+        估算结果，包含person_days、person_months、schedule_months、kloc、mode、complexity、eaf及各语言分摊的languages（人日）
+    """
+    if mode not in COCOMO_MODES:
+        raise ValueError(f"不支持的COCOMO模式: {mode}，可选值: {', '.join(COCOMO_MODES)}")
+    a, b, d = COCOMO_MODES[mode]
+    weighted = {lang: stats.get("code", 0) * LANGUAGE_FACTORS.get(lang, 1.0) / 1000
+                for lang, stats in language_stats.items()}
+    kloc = sum(weighted.values())
+    rating = complexity_rating(metrics)
+    eaf = COMPLEXITY_MULTIPLIERS[rating]
+    person_months = a * kloc ** b * eaf if kloc > 0 else 0.0
+    person_days = person_months * DAYS_PER_PERSON_MONTH
+    return {
+        "person_days": round(person_days, 2),
+        "person_months": round(person_months, 2),
+        "schedule_months": round(2.5 * person_months ** d, 2) if person_months > 0 else 0.0,
+        "kloc": round(kloc, 3),
+        "mode": mode,
+        "complexity": rating,
+        "eaf": eaf,
+        "languages": {lang: round(person_days * value / kloc, 2) for lang, value in sorted(weighted.items()) if kloc > 0},
+    }
+
+
+def assess_maintenance(metrics: Optional[Dict[str, Any]], risk_counts: Dict[str, int],
+                       duplication: Optional[float] = None) -> Dict[str, str]:
+    """
+    根据代码度量、代码重复率和风险统计给出维护建议
+
+    Returns:
+        {"worth_maintaining": "是"或"否", "reasoning": 理由说明}
+    """
+    if not metrics or not metrics["files"]:
+        return {
+            "worth_maintaining": "否",
+            "reasoning": "没有可计算代码度量的源文件，无法评估可维护性。"
+        }
+
+    problems = []
+    if metrics["rating"] == "C":
+        problems.append("可维护性指数过低")
+    if metrics["complex_function_ratio"] > 0.3:
+        problems.append("复杂函数占比过高")
+    if duplication is not None and duplication > 30:
+        problems.append("重复代码过多")
+
+    reasoning = (
+        f"可维护性指数 {metrics['maintainability_index']}（等级 {metrics['rating']}），"
+        f"共 {metrics['functions']} 个函数，平均圈复杂度 {metrics['avg_complexity']}，"
+        f"圈复杂度超过{COMPLEX_FUNCTION_THRESHOLD}的函数 {metrics['complex_functions']} 个"
+        f"（占 {metrics['complex_function_ratio']:.1%}），最大嵌套深度 {metrics['max_nesting']}，"
+        f"平均函数长度 {metrics['avg_function_lines']} 行"
+    )
+    if duplication is not None:
+        reasoning += f"，代码重复率 {duplication}%"
+    reasoning += f"；严重风险问题 {risk_counts.get('critical', 0)} 个，高风险问题 {risk_counts.get('high', 0)} 个。"
+    if problems:
+        reasoning += f"{'、'.join(problems)}，继续维护的成本较高，建议先重构或重写核心模块。"
+    else:
+        reasoning += "整体结构可以支撑后续开发，建议继续维护。"
+    if metrics["hotspots"]:
+        hotspot = metrics["hotspots"][0]
+        reasoning += (f"复杂度最高的函数为 {hotspot['function']}（{os.path.basename(hotspot['file'])} 第{hotspot['line']}行，"
+                      f"圈复杂度 {hotspot['complexity']}），建议优先拆分。")
+    return {
+        "worth_maintaining": "否" if problems else "是",
+        "reasoning": reasoning
+    }
+
+
+def merge_refinement(parsed: Any, cost_estimate: float,
+                     recommendation: Dict[str, str]) -> Tuple[float, Dict[str, str]]:
+    """
+    合并大模型返回的复核结果：字段缺失或格式不正确时保留本地结果
+
+    Args:
+        parsed: 解析后的JSON对象，应包含cost_estimate、worth_maintaining和reasoning
+    """
+    if not isinstance(parsed, dict):
+        return cost_estimate, recommendation
+    refined = parsed.get("cost_estimate")
+    if isinstance(refined, str):
+        try:
+            refined = float(refined)
+        except ValueError:
+            refined = None
+    if isinstance(refined, (int, float)) and not isinstance(refined, bool) and refined > 0:
+        cost_estimate = round(float(refined), 2)
+    worth = parsed.get("worth_maintaining")
+    reasoning = parsed.get("reasoning")
+    if worth in ("是", "否") and isinstance(reasoning, str) and reasoning.strip():
+        recommendation = {"worth_maintaining": worth, "reasoning": reasoning.strip()}
+    return cost_estimate, recommendation
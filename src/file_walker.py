@@ -0,0 +1,144 @@
+"""
+基于os.scandir的并行目录遍历器
+
+每个目录由线程池中的一个任务通过os.scandir读取，利用DirEntry自带的类型信息区分文件和目录（无需额外stat），
+子目录作为新任务并发遍历；语言类型直接由文件名识别（见languages模块），不为每个文件创建Path对象。
+发现的文件以生成器形式实时产出，可边遍历边分析；产出顺序与按完整路径排序一致，不受各目录完成顺序的影响。
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .languages import detect_language
+from .path_matcher import ExcludeMatcher, read_gitignore
+
+
+class ParallelWalker:
+    """
+    并行目录遍历器，迭代产出 (文件路径, 语言类型)
+
+    每个目录的文件和子目录按名称排序后深度优先产出（子目录按"名称/"参与排序），结果与按完整路径排序一致，
+    多次运行的顺序稳定。打开一个目录时即提交其全部子目录的读取任务，子目录在产出当前目录的文件期间并发读取。
+    """
+
+    def __init__(self, root: str, matcher: ExcludeMatcher,
+                 language_of: Callable[[str, str], Optional[str]] = detect_language,
+                 use_gitignore: bool = False, workers: int = 8):
+        """
+        Args:
+            root: 遍历的目录或单个文件
+            matcher: 排除模式匹配器
+            language_of: 根据文件名和路径返回语言类型的函数，返回None的文件不产出
+            use_gitignore: 是否应用各目录中.gitignore的排除规则
+            workers: 遍历线程数
+        """
+        self.root = root
+        self.matcher = matcher
+        self.language_of = language_of
+        self.use_gitignore = use_gitignore
+        self.workers = max(1, int(workers))
+        self.files = 0
+        self.dirs = 0
+        self.entries = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        started = time.perf_counter()
+        try:
+            if os.path.isfile(self.root):
+                lang = self.language_of(os.path.basename(self.root), self.root)
+                if lang:
+                    self.files += 1
+                    yield self.root, lang
+                return
+
+            matcher = self.matcher
+            if self.use_gitignore:
+                matcher = matcher.extend(read_gitignore(self.root))
+
+            pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cdanalyzer-walk")
+
+            def open_dir(future: Future) -> Iterator[Tuple[bool, Any]]:
+                items, entries, errors = future.result()
+                self.dirs += 1
+                self.entries += entries
+                self.errors += errors
+                # 立即提交全部子目录，产出本目录文件的同时并发读取
+                return iter([(is_dir, pool.submit(self._scan_dir, *value) if is_dir else value)
+                             for is_dir, value in items])
+
+            try:
+                # 深度优先：栈顶为当前目录中尚未产出的项
+                stack = [open_dir(pool.submit(self._scan_dir, self.root, "", matcher))]
+                while stack:
+                    for is_dir, value in stack[-1]:
+                        if is_dir:
+                            stack.append(open_dir(value))
+                            break
+                        self.files += 1
+                        yield value
+                    else:
+                        stack.pop()
+            finally:
+                # 调用方提前结束迭代时不再等待未开始的目录
+                pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            self.elapsed = time.perf_counter() - started
+
+    def _scan_dir(self, dir_path: str, rel_dir: str,
+                  matcher: ExcludeMatcher) -> Tuple[List[Tuple[bool, Tuple[Any, ...]]], int, int]:
+        """
+        读取单个目录
+
+        Returns:
+            (按产出顺序排列的项, 目录项数, 错误数)，项为 (False, (文件路径, 语言类型))
+            或 (True, (子目录路径, 相对路径, 匹配器))
+        """
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return [], 0, 1
+
+        if self.use_gitignore and rel_dir and any(entry.name == ".gitignore" for entry in entries):
+            matcher = matcher.extend(read_gitignore(dir_path), base=rel_dir)
+
+        prefix = rel_dir + "/" if rel_dir else ""
+        # (排序键, 是否为目录, 项)
+        items = []
+        errors = 0
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                errors += 1
+                continue
+            if is_dir:
+                # 与os.walk一致：不进入指向目录的符号链接
+                if not matcher.excluded(name, prefix + name, is_dir=True) and not entry.is_symlink():
+                    items.append((name + os.sep, True, (entry.path, prefix + name, matcher)))
+                continue
+            # 先排除再识别语言，被排除的无扩展名文件无需读取shebang
+            if not matcher.excluded(name, prefix + name):
+                lang = self.language_of(name, entry.path)
+                if lang:
+                    items.append((name, False, (entry.path, lang)))
+        items.sort(key=lambda item: item[0])
+        return [(is_dir, value) for _, is_dir, value in items], len(entries), errors
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回遍历统计：文件数、目录数、目录项数、错误数、耗时及每秒发现的文件数
+        """
+        return {
+            "files": self.files,
+            "dirs": self.dirs,
+            "entries": self.entries,
+            "errors": self.errors,
+            "seconds": round(self.elapsed, 4),
+            "files_per_sec": round(self.files / self.elapsed, 1) if self.elapsed > 0 else 0.0
+        }
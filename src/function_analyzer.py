@@ -0,0 +1,58 @@
+"""
+内置的通用函数分析器（无第三方依赖）
+
+外部分析工具未安装或运行失败时，非Python语言使用本分析器：直接使用代码度量引擎（code_metrics）识别出的函数，
+不再读取或切分文件，结果只取决于文件内容和配置，可以写入增量缓存。
+
+规则及风险等级：
+    too-complex     函数圈复杂度超过上限                 medium（超过上限2倍时为high）
+    deep-nesting    函数嵌套深度超过上限                 medium
+    long-function   函数行数超过LONG_FUNCTION_LINES      low
+"""
+
+from typing import Any, Dict, List
+
+from .code_metrics import LONG_FUNCTION_LINES
+
+# 默认的函数嵌套深度上限
+DEFAULT_MAX_NESTING = 4
+
+# 规则 -> (风险等级, 修复建议)
+RULES = {
+    "too-complex": ("medium", "拆分函数或提取分支逻辑以降低圈复杂度"),
+    "deep-nesting": ("medium", "使用提前返回或提取子函数减少嵌套层级"),
+    "long-function": ("low", "按职责将函数拆分为多个较短的函数"),
+}
+
+
+def analyze_functions(file_path: str, functions: List[List[Any]], max_complexity: int,
+                      max_nesting: int = DEFAULT_MAX_NESTING) -> List[Dict[str, Any]]:
+    """
+    根据代码度量得到的函数检查函数级规则
+
+    Args:
+        functions: compute_metrics的functions_out，[函数名, 起始行, 行数, 圈复杂度, 最大嵌套深度]
+
+    Returns:
+        按行号排序的问题列表（格式与其他分析器一致）
+    """
+    findings = []
+    for name, line, length, complexity, nesting in functions:
+        if complexity > max_complexity:
+            findings.append(("too-complex", line, f"函数 {name} 的圈复杂度为 {complexity}，超过上限 {max_complexity}",
+                             "high" if complexity > 2 * max_complexity else RULES["too-complex"][0]))
+        if nesting > max_nesting:
+            findings.append(("deep-nesting", line, f"函数 {name} 的嵌套深度为 {nesting}，超过上限 {max_nesting}",
+                             RULES["deep-nesting"][0]))
+        if length > LONG_FUNCTION_LINES:
+            findings.append(("long-function", line, f"函数 {name} 共 {length} 行，超过 {LONG_FUNCTION_LINES} 行",
+                             RULES["long-function"][0]))
+
+    return [{
+        "file": file_path,
+        "line": line,
+        "severity": severity,
+        "type": rule,
+        "message": message,
+        "solution": RULES[rule][1]
+    } for rule, line, message, severity in sorted(findings, key=lambda finding: finding[1])]
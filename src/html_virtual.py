@@ -0,0 +1,268 @@
+"""
+大规模HTML报告（虚拟化分页表格）
+
+问题按列式结构编码为紧凑JSON：字符串列去重后按字典序排序，行数据中只保存字符串编号，
+因此编号本身即为排序键；整体gzip压缩后内嵌到HTML（或写入旁路文件）。
+浏览器端解压后只渲染当前页的行，排序和过滤都在预先计算的整数索引数组上进行。
+"""
+
+import base64
+import gzip
+import io
+import json
+from array import array
+from typing import Any, Dict, Iterable, List
+
+# 字符串列（去重编码）与数值列
+STRING_COLUMNS = ("file", "type", "message", "solution", "ai_suggestion")
+COLUMN_ORDER = ("file", "line", "severity", "type", "message", "solution", "ai_suggestion")
+
+# 问题数据格式版本
+DATA_VERSION = 1
+
+
+def build_issue_columns(issues: Iterable[Dict[str, Any]], severities: List[str]) -> Dict[str, Any]:
+    """
+    将问题流编码为列式结构
+
+    Args:
+        issues: 问题迭代器（可为IssueSink，只遍历一次）
+        severities: 按严重程度从高到低排列的风险等级，行数据中保存其序号
+
+    Returns:
+        包含count、strings（各字符串列的去重表）和columns（各列的整数数组）的字典
+    """
+    severity_ids = {severity: i for i, severity in enumerate(severities)}
+    tables = {name: {} for name in STRING_COLUMNS}
+    columns = {name: array("i") for name in COLUMN_ORDER}
+    count = 0
+
+    for issue in issues:
+        for name in STRING_COLUMNS:
+            value = str(issue.get(name, "未获取到AI建议" if name == "ai_suggestion" else ""))
+            table = tables[name]
+            string_id = table.get(value)
+            if string_id is None:
+                string_id = table[value] = len(table)
+            columns[name].append(string_id)
+        columns["line"].append(int(issue.get("line", 0)))
+        columns["severity"].append(severity_ids.get(issue.get("severity"), len(severities) - 1))
+        count += 1
+
+    # 字符串表按字典序排序并重映射编号，使编号顺序与字符串顺序一致
+    strings = {}
+    for name in STRING_COLUMNS:
+        ordered = sorted(tables[name])
+        remap = [0] * len(ordered)
+        for new_id, value in enumerate(ordered):
+            remap[tables[name][value]] = new_id
+        columns[name] = array("i", map(remap.__getitem__, columns[name]))
+        strings[name] = ordered
+
+    return {"count": count, "strings": strings, "columns": columns}
+
+
+def encode_issue_data(data: Dict[str, Any], severity_labels: List[str]) -> bytes:
+    """
+    将列式问题数据序列化为gzip压缩的紧凑JSON
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6, mtime=0) as gz:
+        def write(text: str):
+            gz.write(text.encode("utf-8"))
+
+        write('{"v":%d,"count":%d,"severity_labels":' % (DATA_VERSION, data["count"]))
+        write(json.dumps(severity_labels, ensure_ascii=False, separators=(",", ":")))
+        write(',"strings":')
+        write(json.dumps(data["strings"], ensure_ascii=False, separators=(",", ":")))
+        write(',"columns":{')
+        for i, name in enumerate(COLUMN_ORDER):
+            write('%s"%s":' % ("," if i else "", name))
+            write(json.dumps(data["columns"][name].tolist(), separators=(",", ":")))
+        write("}}")
+    return buffer.getvalue()
+
+
+def decode_issue_data(payload: bytes) -> Dict[str, Any]:
+    """
+    解码encode_issue_data生成的数据（供测试和离线工具使用）
+    """
+    return json.loads(gzip.decompress(payload).decode("utf-8"))
+
+
+def write_virtual_issue_section(f, payload: bytes, sidecar_name: str = None, page_size: int = 100):
+    """
+    写入虚拟化问题表格区块：表格骨架、压缩数据（内嵌或旁路文件）及渲染脚本
+
+    Args:
+        f: HTML报告文件对象
+        payload: encode_issue_data生成的gzip数据
+        sidecar_name: 旁路数据文件名（与报告同目录），为None时数据以base64内嵌
+        page_size: 每页显示的行数
+    """
+    f.write('<div class="section"><h2>🔍 问题详情</h2>\n')
+    f.write('<style>\n')
+    f.write('.vt-toolbar { display: flex; gap: 10px; align-items: center; margin: 20px 0; flex-wrap: wrap; }\n')
+    f.write('.vt-toolbar select, .vt-toolbar button { padding: 8px; border: 1px solid #ddd; border-radius: 4px; background: white; }\n')
+    f.write('#issuesTable th.sorted-asc::after { content: " ▲"; }\n')
+    f.write('#issuesTable th.sorted-desc::after { content: " ▼"; }\n')
+    f.write('#issuesTable td { word-break: break-word; }\n')
+    f.write('</style>\n')
+    f.write('<div class="vt-toolbar">\n')
+    f.write('<input type="text" id="searchInput" placeholder="🔍 输入关键字过滤问题..." class="filter-input">\n')
+    f.write('<select id="severityFilter"><option value="">全部风险等级</option></select>\n')
+    f.write('<button id="prevPage">上一页</button><span id="pageInfo">正在加载问题数据...</span><button id="nextPage">下一页</button>\n')
+    f.write('</div>\n')
+    f.write('<table id="issuesTable">\n<thead>\n<tr>\n')
+    for i, title in enumerate(["文件 📄", "行号 #️⃣", "严重程度 ⚠️", "类型 🏷️", "问题描述 📝", "解决方案 💡", "AI建议 🤖"]):
+        f.write(f'<th data-col="{i}">{title}</th>\n')
+    f.write('</tr>\n</thead>\n<tbody></tbody>\n</table></div>\n')
+
+    if sidecar_name is None:
+        f.write('<script type="application/octet-stream" id="issueData">')
+        f.write(base64.b64encode(payload).decode("ascii"))
+        f.write('</script>\n')
+
+    f.write('<script>\n')
+    f.write(f'const ISSUE_SIDECAR = {json.dumps(sidecar_name)};\n')
+    f.write(f'const PAGE_SIZE = {int(page_size)};\n')
+    f.write(f'const COLUMN_ORDER = {json.dumps(list(COLUMN_ORDER))};\n')
+    f.write(_VIRTUAL_TABLE_SCRIPT)
+    f.write('</script>\n')
+
+
+_VIRTUAL_TABLE_SCRIPT = '''
+(async function () {
+    const info = document.getElementById('pageInfo');
+    let bytes;
+    try {
+        if (ISSUE_SIDECAR) {
+            // 旁路数据文件需要通过HTTP服务访问报告（浏览器禁止file://下的fetch）
+            const response = await fetch(ISSUE_SIDECAR);
+            bytes = new Uint8Array(await response.arrayBuffer());
+        } else {
+            const binary = atob(document.getElementById('issueData').textContent);
+            bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+        }
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        var data = JSON.parse(await new Response(stream).text());
+    } catch (e) {
+        info.textContent = '问题数据加载失败: ' + e;
+        return;
+    }
+
+    const count = data.count;
+    const columns = {};
+    for (const name of COLUMN_ORDER) columns[name] = Int32Array.from(data.columns[name]);
+    const labels = data.severity_labels;
+    const tbody = document.querySelector('#issuesTable tbody');
+    const severityFilter = document.getElementById('severityFilter');
+    const severityClasses = ['critical', 'high', 'medium', 'low'];
+    labels.forEach((label, i) => severityFilter.add(new Option(label, String(i))));
+
+    // 每列的排序索引在首次按该列排序时计算并缓存；字符串编号已按字典序排列，可直接比较
+    const sortCache = {};
+    function sortedIndex(col) {
+        if (!sortCache[col]) {
+            const key = columns[COLUMN_ORDER[col]];
+            const index = new Uint32Array(count);
+            for (let i = 0; i < count; i++) index[i] = i;
+            index.sort((a, b) => (key[a] - key[b]) || (a - b));
+            sortCache[col] = index;
+        }
+        return sortCache[col];
+    }
+
+    let sortCol = -1, sortDesc = false, page = 0;
+    let view = null;
+
+    // 过滤：先在各字符串表上匹配关键字（每个不同字符串只比较一次），再按行查表
+    function matchTable(strings, term) {
+        const matched = new Uint8Array(strings.length);
+        for (let i = 0; i < strings.length; i++) matched[i] = strings[i].toLowerCase().includes(term) ? 1 : 0;
+        return matched;
+    }
+
+    function rebuildView() {
+        const term = document.getElementById('searchInput').value.trim().toLowerCase();
+        const severity = severityFilter.value === '' ? -1 : parseInt(severityFilter.value, 10);
+        const base = sortCol >= 0 ? sortedIndex(sortCol) : null;
+        if (!term && severity < 0) {
+            view = base;
+        } else {
+            const tables = term ? Object.keys(data.strings).map(name => [columns[name], matchTable(data.strings[name], term)]) : [];
+            const labelMatched = term ? labels.map(label => label.toLowerCase().includes(term)) : [];
+            const lines = columns.line, severities = columns.severity;
+            const result = new Uint32Array(count);
+            let n = 0;
+            for (let k = 0; k < count; k++) {
+                const i = base ? base[k] : k;
+                if (severity >= 0 && severities[i] !== severity) continue;
+                if (term) {
+                    let hit = labelMatched[severities[i]] || String(lines[i]).includes(term);
+                    for (let t = 0; !hit && t < tables.length; t++) hit = tables[t][1][tables[t][0][i]] === 1;
+                    if (!hit) continue;
+                }
+                result[n++] = i;
+            }
+            view = result.subarray(0, n);
+        }
+        page = 0;
+        render();
+    }
+
+    function viewLength() { return view ? view.length : count; }
+    function rowAt(k) {
+        const n = viewLength();
+        const pos = sortDesc ? n - 1 - k : k;
+        return view ? view[pos] : pos;
+    }
+
+    function render() {
+        const n = viewLength();
+        const pages = Math.max(1, Math.ceil(n / PAGE_SIZE));
+        page = Math.min(page, pages - 1);
+        const fragment = document.createDocumentFragment();
+        for (let k = page * PAGE_SIZE; k < Math.min(n, (page + 1) * PAGE_SIZE); k++) {
+            const i = rowAt(k);
+            const tr = document.createElement('tr');
+            const severity = columns.severity[i];
+            tr.className = severityClasses[severity] || '';
+            const cells = [
+                data.strings.file[columns.file[i]], columns.line[i], labels[severity],
+                data.strings.type[columns.type[i]], data.strings.message[columns.message[i]],
+                data.strings.solution[columns.solution[i]], data.strings.ai_suggestion[columns.ai_suggestion[i]]
+            ];
+            for (const value of cells) {
+                const td = document.createElement('td');
+                td.textContent = value;
+                tr.appendChild(td);
+            }
+            fragment.appendChild(tr);
+        }
+        tbody.replaceChildren(fragment);
+        info.textContent = `第 ${page + 1} / ${pages} 页，共 ${n} 个问题（总计 ${count} 个）`;
+    }
+
+    document.querySelectorAll('#issuesTable th').forEach(th => th.addEventListener('click', () => {
+        const col = parseInt(th.dataset.col, 10);
+        sortDesc = sortCol === col ? !sortDesc : false;
+        sortCol = col;
+        document.querySelectorAll('#issuesTable th').forEach(h => h.classList.remove('sorted-asc', 'sorted-desc'));
+        th.classList.add(sortDesc ? 'sorted-desc' : 'sorted-asc');
+        rebuildView();
+    }));
+
+    let timer = null;
+    document.getElementById('searchInput').addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(rebuildView, 200);
+    });
+    severityFilter.addEventListener('change', rebuildView);
+    document.getElementById('prevPage').addEventListener('click', () => { if (page > 0) { page--; render(); } });
+    document.getElementById('nextPage').addEventListener('click', () => { page++; render(); });
+
+    render();
+})();
+'''
@@ -0,0 +1,208 @@
+"""
+运行埋点：阶段计时、计数器、直方图和峰值内存
+
+Instrumentation记录各阶段的耗时（span，可嵌套，也可按轨道记录并发执行的阶段）、计数器、瞬时值、数值直方图和进程峰值内存（RSS），
+汇总为execute()返回结果中的metrics，也可以写出为Chrome trace JSON（在chrome://tracing或Perfetto中打开）。
+未启用时使用NULL_INSTRUMENTATION：所有方法都是空操作，span()返回共享的空上下文，不产生计时和内存开销。
+"""
+
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+try:
+    import resource
+except ImportError:
+    # Windows没有resource模块，不统计峰值内存
+    resource = None
+
+# 大模型请求延迟直方图的桶上界（毫秒）
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    返回当前进程（children为True时为已结束的子进程）的峰值常驻内存（MB），平台不支持时返回None
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss在macOS上以字节为单位，在Linux上以KB为单位
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss * scale / 1e6, 1)
+
+
+class Histogram:
+    """
+    固定桶上界的数值直方图
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        返回count、avg、max及各桶的数量（键为"<=上界"，超出最大上界的为">上界"）
+        """
+        buckets = {f"<={bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]}"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 2) if self.count else 0.0,
+            "max": round(self.max, 2),
+            "buckets": buckets
+        }
+
+
+class Instrumentation:
+    """
+    一次运行的埋点记录
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # (名称, 开始时间, 耗时, 轨道, 附加参数)
+        self.spans = []
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        # (采样时间, 峰值RSS)，在每个阶段结束时采样
+        self.rss_samples = []
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        """
+        记录with块的耗时
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter() - start, **args)
+
+    def add_span(self, name: str, start: float, duration: float, track: str = "main", **args):
+        """
+        记录已知开始时间（time.perf_counter()）和耗时的阶段
+
+        Args:
+            track: 轨道名，并发执行的阶段（如并行生成的各报告格式）记录在不同轨道上
+        """
+        self.spans.append((name, start, duration, track, args))
+        self.sample_rss(start + duration)
+
+    def count(self, name: str, value: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(bounds)
+        histogram.observe(value)
+
+    def sample_rss(self, at: float = None):
+        rss = peak_rss_mb()
+        if rss is not None:
+            self.rss_samples.append((at or time.perf_counter(), rss))
+
+    def stage_seconds(self, name: str) -> float:
+        """
+        返回同名阶段的总耗时（秒）
+        """
+        return sum(duration for span_name, _, duration, _, _ in self.spans if span_name == name)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        汇总为execute()返回结果中的metrics：总耗时、各阶段耗时（同名阶段累加）、计数器、瞬时值、直方图和峰值内存
+        """
+        stages = {}
+        for name, _, duration, _, _ in self.spans:
+            stages[name] = stages.get(name, 0.0) + duration
+        return {
+            "total_seconds": round(time.perf_counter() - self.origin, 4),
+            "stages": {name: round(seconds, 4) for name, seconds in stages.items()},
+            "counters": {name: round(value, 4) for name, value in self.counters.items()},
+            "gauges": {name: round(value, 2) for name, value in self.gauges.items()},
+            "histograms": {name: histogram.result() for name, histogram in self.histograms.items()},
+            "peak_rss_mb": peak_rss_mb(),
+            "children_peak_rss_mb": peak_rss_mb(children=True)
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        转换为Chrome trace格式：阶段为完整事件（ph=X），峰值内存为计数器事件（ph=C），时间单位为微秒
+        """
+        pid = os.getpid()
+
+        def micros(value: float) -> int:
+            return int((value - self.origin) * 1e6)
+
+        tracks = {}
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "cdanalyzer"}}]
+        for name, start, duration, track, args in self.spans:
+            tid = tracks.setdefault(track, len(tracks))
+            events.append({"name": name, "ph": "X", "pid": pid, "tid": tid, "ts": micros(start),
+                           "dur": max(1, int(duration * 1e6)), "args": args})
+        for track, tid in tracks.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": track}})
+        for at, rss in self.rss_samples:
+            events.append({"name": "peak_rss_mb", "ph": "C", "pid": pid, "tid": 0, "ts": micros(at), "args": {"MB": rss}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        """
+        将Chrome trace JSON写入文件
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+class NullInstrumentation:
+    """
+    未启用埋点时使用的空实现
+    """
+
+    enabled = False
+    _null_span = nullcontext()
+
+    def span(self, name: str, **args):
+        return self._null_span
+
+    def add_span(self, name: str, start: float, duration: float, track: str = "main", **args):
+        pass
+
+    def count(self, name: str, value: float = 1):
+        pass
+
+    def gauge(self, name: str, value: float):
+        pass
+
+    def observe(self, name: str, value: float, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        pass
+
+    def sample_rss(self, at: float = None):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
@@ -0,0 +1,138 @@
+"""
+流式问题管道
+
+分析阶段产生的问题逐条写入临时spool文件（JSON Lines），内存中只保留风险统计等汇总数据。
+已附加AI建议的问题会实时推送给各报告格式的行写入器，报告明细在分析过程中即开始生成。
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+
+class IssueSpool:
+    """
+    追加写入的问题临时文件，写入完成后可多次顺序读取
+    """
+
+    def __init__(self, spool_dir: str, prefix: str = "issues_"):
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".jsonl", dir=spool_dir)
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self.count = 0
+
+    def add(self, issue: Dict[str, Any]):
+        """
+        追加一个问题
+        """
+        self._file.write(json.dumps(issue, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def iter_batches(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """
+        按批读取问题，每批最多batch_size个
+        """
+        batch = []
+        for issue in self:
+            batch.append(issue)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        """
+        结束写入
+        """
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 结束写入后可传递给报告生成子进程，子进程只读取spool文件
+        state = dict(self.__dict__)
+        state["_file"] = None
+        return state
+
+
+class IssueRowWriter:
+    """
+    报告行写入器：将问题按报告格式格式化后写入报告片段文件
+    """
+
+    def __init__(self, path: str, formatter: Callable[[Dict[str, Any], int], str]):
+        self.path = path
+        self._formatter = formatter
+        self._file = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, issue: Dict[str, Any]):
+        self.count += 1
+        self._file.write(self._formatter(issue, self.count))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class IssueSink(IssueSpool):
+    """
+    已定型问题（已附加AI建议）的汇聚点：写入spool、维护风险统计并推送给报告行写入器
+    """
+
+    def __init__(self, spool_dir: str):
+        super().__init__(spool_dir, "issues_")
+        self.risk_counts = {severity: 0 for severity in SEVERITIES}
+        self._row_writers = {}
+        self._row_parts = {}
+
+    def add_row_writer(self, name: str, formatter: Callable[[Dict[str, Any], int], str]):
+        """
+        注册报告行写入器，之后加入的每个问题都会实时写入该格式的报告片段
+        """
+        path = f"{self.path[:-len('.jsonl')]}.{name}.part"
+        self._row_writers[name] = IssueRowWriter(path, formatter)
+        self._row_parts[name] = path
+
+    def row_part(self, name: str) -> Optional[str]:
+        """
+        获取指定格式已生成的报告片段文件路径，未注册时返回None
+        """
+        return self._row_parts.get(name)
+
+    def add(self, issue: Dict[str, Any]):
+        super().add(issue)
+        severity = issue.get("severity")
+        if severity in self.risk_counts:
+            self.risk_counts[severity] += 1
+        for writer in self._row_writers.values():
+            writer.write(issue)
+
+    def close(self):
+        """
+        结束写入并关闭所有报告行写入器
+        """
+        super().close()
+        for writer in self._row_writers.values():
+            writer.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state["_row_writers"] = {}
+        return state
@@ -0,0 +1,231 @@
+"""
+分析任务队列
+
+submit()提交分析任务并立即返回任务ID，调用方可以通过status()轮询任务状态，或通过events()订阅结构化进度
+（异步迭代器；常驻服务中以server-sent events推送，见src/server.py）。进度来自CdanalyzerAgentSkill.progress，包含：
+    stage             当前阶段：analyzing、clones、suggestions、assessment、reports、done
+    files_discovered  已发现的文件数（与分析同时进行的目录遍历）
+    files_total       待分析的文件总数，目录遍历结束前为None
+    files_analyzed    已分析的文件数
+    issues_found      已发现的问题数
+    llm_pending       已提交但尚未完成的大模型请求数
+    eta_seconds       按已分析文件的速度估算的分析阶段剩余时间（秒），总数未知时为None
+
+cancel()取消任务：未开始的分析分块逐个取消（共享进程池中其他任务的分块不受影响），进行中的大模型请求随之取消，
+正在执行的分块不会被中断，但取消不等待它完成。
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from .CdanalyzerAgentSkill import CdanalyzerAgentSkill
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+# 保留的已结束任务数，超出时丢弃最早结束的任务
+DEFAULT_MAX_FINISHED = 100
+# 进度事件的最小间隔（秒），间隔内的多次更新合并为一个事件
+DEFAULT_EVENT_INTERVAL = 0.2
+
+ProgressListener = Callable[[Dict[str, Any]], None]
+Runner = Callable[[Dict[str, Any], ProgressListener], Awaitable[Dict[str, Any]]]
+
+
+async def run_analysis(inputs: Dict[str, Any], progress_listener: ProgressListener) -> Dict[str, Any]:
+    """
+    默认的任务执行方式：使用新的分析实例执行一次分析
+    """
+    skill = CdanalyzerAgentSkill()
+    skill.progress_listener = progress_listener
+    return await skill.execute(inputs)
+
+
+class Job:
+    """
+    单个分析任务，状态依次为queued、running及succeeded、failed或cancelled之一
+    """
+
+    def __init__(self, job_id: str, inputs: Dict[str, Any]):
+        self.id = job_id
+        self.inputs = inputs
+        self.state = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.submitted = time.perf_counter()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def update(self, progress: Dict[str, Any]):
+        """
+        进度回调（作为分析实例的progress_listener），收到第一次进度时任务进入running状态
+        """
+        if self.state == "queued":
+            self.state = "running"
+            self.started = time.perf_counter()
+        self.progress = progress
+        self.notify()
+
+    def notify(self):
+        """
+        唤醒所有订阅者
+        """
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def eta(self) -> Optional[float]:
+        """
+        估算分析阶段的剩余时间（秒）
+        """
+        progress = self.progress
+        total = progress.get("files_total")
+        analyzed = progress.get("files_analyzed", 0)
+        if progress.get("stage") != "analyzing" or not total or not analyzed or self.started is None:
+            return None
+        elapsed = time.perf_counter() - self.started
+        return round(elapsed / analyzed * max(0, total - analyzed), 1)
+
+    def snapshot(self, include_result: bool = False) -> Dict[str, Any]:
+        """
+        返回任务状态
+
+        Args:
+            include_result: 任务结束后是否附带execute()的返回结果
+        """
+        end = self.finished or time.perf_counter()
+        snapshot = {
+            "job_id": self.id,
+            "state": self.state,
+            **self.progress,
+            "eta_seconds": self.eta(),
+            "elapsed": round(end - (self.started or end), 3),
+        }
+        if self.error:
+            snapshot["error"] = self.error
+        if include_result and self.result is not None:
+            snapshot["result"] = self.result
+        return snapshot
+
+    async def events(self, interval: float = DEFAULT_EVENT_INTERVAL) -> AsyncIterator[Dict[str, Any]]:
+        """
+        订阅进度：立即产出当前状态，之后每次更新时产出最新状态，任务结束时产出最终状态后结束
+
+        Args:
+            interval: 相邻两个事件的最小间隔（秒）
+        """
+        while True:
+            # 在产出前取得事件对象，产出期间发生的更新不会丢失
+            changed = self._changed
+            yield self.snapshot()
+            if self.done:
+                return
+            await changed.wait()
+            if interval and not self.done:
+                await asyncio.sleep(interval)
+
+
+class JobManager:
+    """
+    管理分析任务：提交、查询、订阅进度和取消（须在事件循环中使用）
+    """
+
+    def __init__(self, runner: Runner = run_analysis, max_finished: int = DEFAULT_MAX_FINISHED):
+        """
+        Args:
+            runner: 执行任务的协程函数，参数为分析参数和进度回调（常驻服务中为AnalysisService.analyze）
+            max_finished: 保留的已结束任务数
+        """
+        self.runner = runner
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def submit(self, inputs: Dict[str, Any]) -> str:
+        """
+        提交分析任务，立即返回任务ID
+        """
+        job = Job(uuid.uuid4().hex, inputs)
+        self._jobs[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job))
+        self._prune()
+        return job.id
+
+    async def _run(self, job: Job):
+        try:
+            job.result = await self.runner(job.inputs, job.update)
+            if job.result.get("success"):
+                job.state = "succeeded"
+            else:
+                job.state = "failed"
+                job.error = job.result.get("error")
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.perf_counter()
+            job.notify()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        按ID获取任务，任务不存在（或已被清理）时返回None
+        """
+        return self._jobs.get(job_id)
+
+    def _require(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"未知任务: {job_id}")
+        return job
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """
+        轮询任务状态，任务结束后附带execute()的返回结果
+        """
+        return self._require(job_id).snapshot(include_result=True)
+
+    def events(self, job_id: str, interval: float = DEFAULT_EVENT_INTERVAL) -> AsyncIterator[Dict[str, Any]]:
+        """
+        订阅任务进度，见Job.events()
+        """
+        return self._require(job_id).events(interval)
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        取消任务并等待其停止
+
+        Returns:
+            任务是否被取消（已结束的任务返回False）
+        """
+        job = self._require(job_id)
+        if job.done:
+            return False
+        job.task.cancel()
+        await asyncio.wait({job.task})
+        # 尚未开始执行就被取消的任务不会进入_run
+        if not job.done:
+            job.state = "cancelled"
+            job.finished = time.perf_counter()
+            job.notify()
+        return True
+
+    async def close(self):
+        """
+        取消所有未结束的任务
+        """
+        for job_id in [job_id for job_id, job in self._jobs.items() if not job.done]:
+            await self.cancel(job_id)
@@ -0,0 +1,160 @@
+"""
+统一的语言注册表
+
+扩展名、特殊文件名（Makefile、Dockerfile等）和shebang解释器到语言类型的映射在模块加载时构建一次。
+没有扩展名且文件名不在规则中的文件读取首行shebang判断语言；识别结果随文件在分析流程中传递，每个文件只识别一次。
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+# 扩展名（小写，含"."） -> 语言类型
+EXTENSION_LANGUAGES: Dict[str, str] = {}
+
+_LANGUAGE_EXTENSIONS = {
+    "python": (".py", ".pyw", ".pyi"),
+    "javascript": (".js", ".jsx", ".mjs", ".cjs"),
+    "typescript": (".ts", ".tsx", ".mts", ".cts"),
+    "java": (".java",),
+    # C与C++共用cpp分析标准
+    "cpp": (".c", ".h", ".cc", ".cpp", ".cxx", ".c++", ".hh", ".hpp", ".hxx", ".h++", ".inl", ".ipp"),
+    "objective-c": (".m", ".mm"),
+    "csharp": (".cs",),
+    "go": (".go",),
+    "ruby": (".rb", ".rake", ".gemspec"),
+    "php": (".php", ".phtml"),
+    "kotlin": (".kt", ".kts"),
+    "rust": (".rs",),
+    "swift": (".swift",),
+    "scala": (".scala", ".sc"),
+    "groovy": (".groovy", ".gradle"),
+    "dart": (".dart",),
+    "lua": (".lua",),
+    "perl": (".pl", ".pm"),
+    "shell": (".sh", ".bash", ".zsh", ".ksh"),
+    "sql": (".sql",),
+    "r": (".r",),
+    "makefile": (".mk", ".mak"),
+    "cmake": (".cmake",),
+    "dockerfile": (".dockerfile",),
+}
+for _language, _extensions in _LANGUAGE_EXTENSIONS.items():
+    for _ext in _extensions:
+        EXTENSION_LANGUAGES[_ext] = _language
+
+# 没有可识别扩展名的特殊文件名 -> 语言类型
+FILENAME_LANGUAGES: Dict[str, str] = {
+    "Makefile": "makefile",
+    "makefile": "makefile",
+    "GNUmakefile": "makefile",
+    "Dockerfile": "dockerfile",
+    "Containerfile": "dockerfile",
+    "CMakeLists.txt": "cmake",
+    "Rakefile": "ruby",
+    "Gemfile": "ruby",
+    "Vagrantfile": "ruby",
+    "Jenkinsfile": "groovy",
+}
+
+# 带后缀的特殊文件名前缀（如Dockerfile.dev、Makefile.am）
+FILENAME_PREFIX_LANGUAGES: Dict[str, str] = {
+    "Dockerfile.": "dockerfile",
+    "Makefile.": "makefile",
+}
+
+# shebang中的解释器名 -> 语言类型
+SHEBANG_LANGUAGES: Dict[str, str] = {
+    "python": "python",
+    "node": "javascript",
+    "nodejs": "javascript",
+    "deno": "typescript",
+    "ruby": "ruby",
+    "php": "php",
+    "perl": "perl",
+    "lua": "lua",
+    "sh": "shell",
+    "bash": "shell",
+    "zsh": "shell",
+    "ksh": "shell",
+    "dash": "shell",
+    "make": "makefile",
+    "Rscript": "r",
+}
+
+# 所有支持的语言类型
+SUPPORTED_LANGUAGES: List[str] = sorted(
+    set(EXTENSION_LANGUAGES.values()) | set(FILENAME_LANGUAGES.values()) | set(SHEBANG_LANGUAGES.values())
+)
+
+# 解释器名中的版本号后缀（python3.11、perl5等）
+_INTERPRETER_VERSION = re.compile(r"[\d.]+$")
+
+# 读取shebang时最多读取的字节数
+_SHEBANG_READ_SIZE = 256
+
+
+def file_extension(name: str) -> str:
+    """
+    获取文件扩展名（小写，含"."），与Path.suffix一致：以"."开头的隐藏文件名和以"."结尾的文件名没有扩展名
+    """
+    dot = name.rfind(".")
+    if dot <= 0 or dot == len(name) - 1:
+        return ""
+    return name[dot:].lower()
+
+
+def language_for_name(name: str) -> Optional[str]:
+    """
+    仅根据文件名（扩展名和特殊文件名规则）识别语言类型，不读取文件
+    """
+    lang = FILENAME_LANGUAGES.get(name)
+    if lang:
+        return lang
+    lang = EXTENSION_LANGUAGES.get(file_extension(name))
+    if lang:
+        return lang
+    for prefix, prefix_lang in FILENAME_PREFIX_LANGUAGES.items():
+        if name.startswith(prefix):
+            return prefix_lang
+    return None
+
+
+def language_from_shebang(file_path: str) -> Optional[str]:
+    """
+    根据文件首行的shebang识别语言类型（支持"#!/usr/bin/env python3"等形式），无法识别时返回None
+    """
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(_SHEBANG_READ_SIZE)
+    except OSError:
+        return None
+    if not head.startswith(b"#!"):
+        return None
+    words = head[2:].split(b"\n", 1)[0].decode("utf-8", "ignore").split()
+    if not words:
+        return None
+    interpreter = os.path.basename(words[0])
+    if interpreter == "env":
+        # 跳过env的选项（如"-S"）
+        args = [word for word in words[1:] if not word.startswith("-") and "=" not in word]
+        if not args:
+            return None
+        interpreter = os.path.basename(args[0])
+    return SHEBANG_LANGUAGES.get(interpreter) or SHEBANG_LANGUAGES.get(_INTERPRETER_VERSION.sub("", interpreter))
+
+
+def detect_language(name: str, file_path: Optional[str] = None) -> Optional[str]:
+    """
+    识别文件的语言类型：扩展名 > 特殊文件名 > shebang
+
+    只有没有扩展名的文件才读取首行判断shebang，避免对大量无关文件（图片、文档等）进行I/O。
+
+    Args:
+        name: 文件名
+        file_path: 文件路径，为None时不读取文件内容
+    """
+    lang = language_for_name(name)
+    if lang or file_path is None or file_extension(name):
+        return lang
+    return language_from_shebang(file_path)
@@ -0,0 +1,191 @@
+"""
+流式行数统计引擎
+
+以二进制定长缓冲区读取文件并统计 b'\\n'，同时按语言的注释语法区分空行、注释行和代码行。
+超长的行（生成代码、压缩后的脚本）只保留行首和行尾各MAX_LINE_BYTES/2字节用于分类，
+内存占用与文件大小和行长都无关，只取决于缓冲区大小。
+read_source()在统计的同时保留不超过MAX_CONTENT_SIZE的文件内容，供后续的度量、语法分析、安全扫描和指纹计算共用，
+每个文件只读取一次。
+"""
+
+from typing import Dict, Optional, Any, Tuple
+
+# 默认读取缓冲区大小（1MB）
+CHUNK_SIZE = 1 << 20
+# 参与分类的单行最大字节数，超出时只保留行首和行尾各一半
+MAX_LINE_BYTES = 64 << 10
+# read_source()保留文件内容的上限（8MB），更大的文件只统计行数
+MAX_CONTENT_SIZE = 8 << 20
+
+# 各语言的注释语法
+#   line: 单行注释前缀
+#   block: 块注释起止标记
+#   inline_block: 块注释是否可以出现在代码行中间（False表示只识别位于行首的块注释，如Python文档字符串）
+COMMENT_SYNTAX = {
+    "python": {"line": (b"#",), "block": ((b'"""', b'"""'), (b"'''", b"'''")), "inline_block": False},
+    "javascript": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "typescript": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "java": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "cpp": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "csharp": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "go": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "ruby": {"line": (b"#",), "block": ((b"=begin", b"=end"),), "inline_block": False},
+    "php": {"line": (b"//", b"#"), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "objective-c": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "kotlin": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "rust": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "swift": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "scala": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "groovy": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "dart": {"line": (b"//",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "sql": {"line": (b"--",), "block": ((b"/*", b"*/"),), "inline_block": True},
+    "lua": {"line": (b"--",), "block": ((b"--[[", b"]]"),), "inline_block": False},
+    "perl": {"line": (b"#",), "block": ((b"=pod", b"=cut"),), "inline_block": False},
+    "shell": {"line": (b"#",), "block": (), "inline_block": False},
+    "r": {"line": (b"#",), "block": (), "inline_block": False},
+    "makefile": {"line": (b"#",), "block": (), "inline_block": False},
+    "cmake": {"line": (b"#",), "block": ((b"#[[", b"]]"),), "inline_block": False},
+    "dockerfile": {"line": (b"#",), "block": (), "inline_block": False},
+}
+
+_NO_COMMENTS = {"line": (), "block": (), "inline_block": False}
+
+
+def empty_line_stats() -> Dict[str, int]:
+    """
+    返回一份空的行数统计
+    """
+    return {"lines": 0, "blank": 0, "comment": 0, "code": 0}
+
+
+class LineClassifier:
+    """
+    逐行分类器：记录跨行的块注释状态，将每一行归类为空行、注释行或代码行
+    """
+
+    def __init__(self, language: Optional[str] = None):
+        syntax = COMMENT_SYNTAX.get(language, _NO_COMMENTS)
+        self.line_prefixes = syntax["line"]
+        self.blocks = syntax["block"]
+        self.inline_block = syntax["inline_block"]
+        self.block_end = None
+        self.stats = empty_line_stats()
+
+    def feed(self, line: bytes):
+        """
+        对一行（不含换行符）进行分类
+        """
+        stats = self.stats
+        stats["lines"] += 1
+        stripped = line.strip()
+
+        if self.block_end is not None:
+            stats["comment"] += 1
+            if self.block_end in stripped:
+                self.block_end = None
+            return
+
+        if not stripped:
+            stats["blank"] += 1
+            return
+
+        # 先识别块注释：Lua的"--[["、CMake的"#[["以单行注释前缀开头
+        for start, end in self.blocks:
+            if stripped.startswith(start):
+                stats["comment"] += 1
+                if end not in stripped[len(start):]:
+                    self.block_end = end
+                return
+
+        if self.line_prefixes and stripped.startswith(self.line_prefixes):
+            stats["comment"] += 1
+            return
+
+        stats["code"] += 1
+        if self.inline_block:
+            for start, end in self.blocks:
+                pos = stripped.find(start)
+                if pos != -1 and stripped.find(end, pos + len(start)) == -1:
+                    self.block_end = end
+                    return
+
+
+def _bounded_line(line: bytes) -> bytes:
+    """
+    超长的行只保留行首和行尾，使跨缓冲区拼接的行不随行长增长
+    """
+    if len(line) <= MAX_LINE_BYTES:
+        return line
+    half = MAX_LINE_BYTES // 2
+    return line[:half] + line[-half:]
+
+
+def read_source(file_path: str, language: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+                hasher: Any = None, max_content: int = MAX_CONTENT_SIZE) -> Tuple[Dict[str, int], Optional[bytes]]:
+    """
+    统计文件的行数，同时保留文件内容
+
+    Args:
+        max_content: 保留内容的上限，文件超过该大小时不保留内容（为0时不保留）
+
+    Returns:
+        (行数统计, 文件内容)，内容超过上限时为None
+    """
+    classifier = LineClassifier(language)
+    feed = classifier.feed
+    carry = b""
+    parts = [] if max_content > 0 else None
+    size = 0
+
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            if hasher is not None:
+                hasher.update(chunk)
+            if parts is not None:
+                size += len(chunk)
+                if size > max_content:
+                    parts = None
+                else:
+                    parts.append(chunk)
+            start = 0
+            if carry:
+                # 上一块末尾未结束的行：拼接到本块的第一个换行符为止，拼接结果有长度上限
+                newline = chunk.find(b"\n")
+                if newline == -1:
+                    carry = _bounded_line(carry + chunk)
+                    continue
+                feed(_bounded_line(carry + chunk[:newline]))
+                start = newline + 1
+            lines = chunk[start:].split(b"\n") if start else chunk.split(b"\n")
+            carry = _bounded_line(lines.pop())
+            for line in lines:
+                feed(line)
+
+    if carry:
+        feed(carry)
+
+    content = b"".join(parts) if parts is not None else None
+    return classifier.stats, content
+
+
+def count_file_lines(file_path: str, language: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+                     hasher: Any = None) -> Dict[str, int]:
+    """
+    统计文件的总行数、空行数、注释行数和代码行数
+
+    行数语义与文本模式下 len(f.readlines()) 一致：每个 b'\\n' 计为一行，
+    文件末尾没有换行符的最后一段内容也计为一行。
+
+    Args:
+        file_path: 文件路径
+        language: 语言类型，用于选择注释语法
+        chunk_size: 每次读取的缓冲区大小
+        hasher: 可选的hashlib对象，读取的同时更新内容哈希，避免为计算哈希再次读取文件
+
+    Returns:
+        包含lines、blank、comment、code的字典
+    """
+    return read_source(file_path, language, chunk_size, hasher, max_content=0)[0]
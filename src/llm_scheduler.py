@@ -0,0 +1,153 @@
+"""
+大模型请求调度器
+
+限制同时进行的请求数，按提供商进行请求数/令牌数的令牌桶限流，
+并对429及5xx响应按指数退避重试（优先使用服务端返回的Retry-After）。
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+# 需要重试的HTTP状态码
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# 估算令牌数时为模型输出预留的令牌数
+COMPLETION_TOKEN_RESERVE = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的令牌数：中日韩字符按每字1个令牌，其余字符按每4个字符1个令牌
+    """
+    cjk = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def parse_retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    """
+    解析Retry-After响应头（秒数或HTTP日期），无法解析时返回None
+    """
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    令牌桶限流器，按每分钟速率连续补充令牌，容量为一分钟的配额
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        """
+        获取指定数量的令牌，不足时等待补充；超过桶容量的请求按容量计算
+        """
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class LLMScheduler:
+    """
+    单个大模型提供商的请求调度器
+    """
+
+    def __init__(self, max_in_flight: int = 8, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_retries: int = 3,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.stats = {"submitted": 0, "succeeded": 0, "failed": 0, "retries": 0, "rate_limited": 0}
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """
+        计算重试等待时间：优先使用Retry-After，否则使用带随机抖动的指数退避
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    async def submit(self, request: Callable[[], Awaitable[Any]], estimated_tokens: int = 1) -> Any:
+        """
+        按并发上限和限流配额执行请求，429/5xx及网络错误自动重试
+
+        Args:
+            request: 无参数的协程函数，每次重试都会重新调用
+            estimated_tokens: 本次请求预计消耗的令牌数
+
+        Returns:
+            request的返回值；重试耗尽后抛出最后一次的异常
+        """
+        self.stats["submitted"] += 1
+        attempt = 0
+        while True:
+            if self._request_bucket:
+                await self._request_bucket.acquire(1)
+            if self._token_bucket:
+                await self._token_bucket.acquire(estimated_tokens)
+
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    result = await request()
+                self.stats["succeeded"] += 1
+                return result
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if status not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+                if status == 429:
+                    self.stats["rate_limited"] += 1
+                retry_after = parse_retry_after(e.response)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        返回调度统计
+        """
+        return dict(self.stats)
@@ -0,0 +1,252 @@
+"""
+预编译的排除模式匹配器
+
+exclude_patterns在构造时一次性编译：不含通配符的文件名放入集合，"*.ext"形式的模式放入按长度分组的后缀集合，
+其余文件名通配符合并为一个正则表达式；含"/"的模式按gitignore语义匹配相对路径（支持"**"、行首"/"锚定、
+末尾"/"只匹配目录），"!"开头的模式重新包含此前被排除的路径。常见情况下每个名称的匹配开销为O(1)。
+"""
+
+import fnmatch
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_GLOB_CHARS = set("*?[")
+# 匹配器缓存保留的模式列表数（各请求的模式列表含目标目录的.gitignore内容，常驻服务中不能无限增长）
+DEFAULT_MATCHER_CACHE_SIZE = 32
+
+
+def _has_glob(text: str) -> bool:
+    return any(ch in _GLOB_CHARS for ch in text)
+
+
+def _path_glob_to_regex(pattern: str) -> str:
+    """
+    将gitignore风格的路径模式（已去掉行首"/"）转换为匹配相对路径的正则表达式
+
+    "*"和"?"不匹配"/"，"**/"匹配零个或多个目录，末尾的"/**"只匹配目录下的内容而不匹配目录本身（与git一致），
+    目录本身不被剪枝，其中的文件可以被"!"模式重新包含
+    """
+    i, n = 0, len(pattern)
+    parts = []
+    while i < n:
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            parts.append("/.+")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        else:
+            ch = pattern[i]
+            if ch == "*":
+                parts.append("[^/]*")
+            elif ch == "?":
+                parts.append("[^/]")
+            elif ch == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    parts.append(re.escape(ch))
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    parts.append("[" + body.replace("\\", "\\\\") + "]")
+                    i = end
+            else:
+                parts.append(re.escape(ch))
+            i += 1
+    return "".join(parts)
+
+
+class _PatternSet:
+    """
+    同一类（排除/重新包含、是否只匹配目录）模式的编译结果
+    """
+
+    def __init__(self):
+        self.literals: Set[str] = set()
+        self.suffixes: Dict[int, Set[str]] = {}
+        self.name_globs: List[str] = []
+        self.path_globs: List[str] = []
+        self.name_regex = None
+        self.path_regex = None
+
+    def add(self, pattern: str, is_path: bool):
+        if is_path:
+            self.path_globs.append(_path_glob_to_regex(pattern))
+        elif not _has_glob(pattern):
+            self.literals.add(pattern)
+        elif pattern.startswith("*") and pattern != "*" and not _has_glob(pattern[1:]):
+            suffix = pattern[1:]
+            self.suffixes.setdefault(len(suffix), set()).add(suffix)
+        else:
+            self.name_globs.append(fnmatch.translate(pattern))
+
+    def compile(self):
+        if self.name_globs:
+            self.name_regex = re.compile("|".join(f"(?:{regex})" for regex in self.name_globs))
+        if self.path_globs:
+            self.path_regex = re.compile("(?:" + "|".join(self.path_globs) + r")\Z", re.DOTALL)
+
+    def __bool__(self) -> bool:
+        return bool(self.literals or self.suffixes or self.name_globs or self.path_globs)
+
+    def matches(self, name: str, rel_path: Optional[str]) -> bool:
+        if name in self.literals:
+            return True
+        for length, suffixes in self.suffixes.items():
+            if len(name) >= length and name[-length:] in suffixes:
+                return True
+        if self.name_regex is not None and self.name_regex.match(name):
+            return True
+        return rel_path is not None and self.path_regex is not None and self.path_regex.match(rel_path) is not None
+
+
+class ExcludeMatcher:
+    """
+    排除模式匹配器
+
+    不含"/"的模式与原fnmatch行为一致，匹配任意层级的文件名或目录名；
+    含"/"的模式匹配相对于分析目标的路径（使用"/"分隔）；后出现的模式优先（与gitignore一致）。
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns: List[str] = []
+        self._entries = []
+        self._extend(patterns, "")
+
+    def _extend(self, patterns: Iterable[str], base: str):
+        for raw in patterns:
+            pattern = raw.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negate = pattern.startswith("!")
+            if negate:
+                pattern = pattern[1:]
+            if pattern.startswith("\\"):
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            pattern = os.path.normcase(pattern.rstrip("/"))
+            if not pattern:
+                continue
+
+            # 含"/"（末尾除外）的模式相对于所在目录锚定，否则匹配任意层级的名称
+            is_path = "/" in pattern
+            if is_path:
+                pattern = pattern.lstrip("/")
+            if base:
+                pattern = f"{base}/{pattern}" if is_path else f"{base}/**/{pattern}"
+                is_path = True
+            self.patterns.append(("!" if negate else "") + pattern + ("/" if dir_only else ""))
+            self._entries.append((negate, dir_only, is_path, pattern))
+        self._compile()
+
+    def _compile(self):
+        self._sets = {(negate, dir_only): _PatternSet() for negate in (False, True) for dir_only in (False, True)}
+        for negate, dir_only, is_path, pattern in self._entries:
+            self._sets[(negate, dir_only)].add(pattern, is_path)
+        for pattern_set in self._sets.values():
+            pattern_set.compile()
+        self._has_negation = bool(self._sets[(True, False)] or self._sets[(True, True)])
+        self._ordered = None
+
+    def extend(self, patterns: Iterable[str], base: str = "") -> "ExcludeMatcher":
+        """
+        返回追加了模式的新匹配器（原匹配器不变）
+
+        Args:
+            base: 模式所在目录相对于分析目标的路径（子目录中的.gitignore），模式只作用于该目录下
+        """
+        matcher = ExcludeMatcher.__new__(ExcludeMatcher)
+        matcher.patterns = list(self.patterns)
+        matcher._entries = list(self._entries)
+        matcher._extend(patterns, base.strip("/"))
+        return matcher
+
+    def _matches(self, negate: bool, name: str, rel_path: Optional[str], is_dir: bool) -> bool:
+        if self._sets[(negate, False)].matches(name, rel_path):
+            return True
+        return is_dir and self._sets[(negate, True)].matches(name, rel_path)
+
+    def excluded(self, name: str, rel_path: Optional[str] = None, is_dir: bool = False) -> bool:
+        """
+        判断文件或目录是否被排除
+
+        Args:
+            name: 文件名或目录名
+            rel_path: 相对于分析目标的路径（"/"分隔），为None时只按名称匹配
+            is_dir: 是否为目录
+        """
+        name = os.path.normcase(name)
+        if rel_path is not None:
+            rel_path = os.path.normcase(rel_path)
+        if not self._matches(False, name, rel_path, is_dir):
+            return False
+        if not self._has_negation or not self._matches(True, name, rel_path, is_dir):
+            return True
+        # 同时命中排除和重新包含模式时按顺序判断，后出现的模式优先
+        return self._last_match_excludes(name, rel_path, is_dir)
+
+    def _last_match_excludes(self, name: str, rel_path: Optional[str], is_dir: bool) -> bool:
+        if self._ordered is None:
+            self._ordered = []
+            for negate, dir_only, is_path, pattern in self._entries:
+                single = _PatternSet()
+                single.add(pattern, is_path)
+                single.compile()
+                self._ordered.append((negate, dir_only, single))
+        for negate, dir_only, single in reversed(self._ordered):
+            if dir_only and not is_dir:
+                continue
+            if single.matches(name, rel_path):
+                return not negate
+        return False
+
+
+class MatcherCache:
+    """
+    按模式列表缓存预编译的匹配器，超过容量时淘汰最久未使用的一项（线程安全，常驻服务中各请求共用）
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MATCHER_CACHE_SIZE):
+        self.max_size = max(1, max_size)
+        self._matchers: "OrderedDict[Tuple[str, ...], ExcludeMatcher]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._matchers)
+
+    def get(self, patterns: Iterable[str]) -> ExcludeMatcher:
+        """
+        获取模式列表对应的匹配器，相同的模式列表只编译一次
+        """
+        key = tuple(patterns)
+        with self._lock:
+            matcher = self._matchers.get(key)
+            if matcher is not None:
+                self._matchers.move_to_end(key)
+                return matcher
+        # 编译不持有锁；并发编译同一模式列表时保留先写入的结果
+        matcher = ExcludeMatcher(key)
+        with self._lock:
+            matcher = self._matchers.setdefault(key, matcher)
+            self._matchers.move_to_end(key)
+            while len(self._matchers) > self.max_size:
+                self._matchers.popitem(last=False)
+        return matcher
+
+
+def read_gitignore(directory: str) -> List[str]:
+    """
+    读取目录下的.gitignore文件，不存在或无法读取时返回空列表
+    """
+    try:
+        with open(os.path.join(directory, ".gitignore"), "r", encoding="utf-8", errors="ignore") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
@@ -0,0 +1,75 @@
+"""
+PDF报告的分块排版工具
+
+问题明细按每N行（可选按文件）拆分为多个带表头的小表格，避免单个巨型Table在分页时反复拆分；
+表格由生成器按需产出，reportlab构建文档时只驻留少量表格，内存占用与问题总数无关。
+"""
+
+import heapq
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+
+class LazyFlowables(list):
+    """
+    按需从生成器补充flowable的列表
+
+    reportlab的build()从列表头部逐个取出flowable（拆分后的剩余部分会插回头部），
+    这里在每次删除后从生成器补充，列表中始终只保留lookahead个待排版的flowable。
+    """
+
+    def __init__(self, source: Iterable[Any], lookahead: int = 4):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = max(2, lookahead)
+        self._refill()
+
+    def _refill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self) -> int:
+        self._refill()
+        return list.__len__(self)
+
+    def __delitem__(self, key):
+        list.__delitem__(self, key)
+        self._refill()
+
+
+def iter_issue_chunks(issues: Iterable[Dict[str, Any]], chunk_rows: int,
+                      group_by_file: bool = False) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    将问题流拆分为多个分块
+
+    Args:
+        chunk_rows: 每个分块的最大行数
+        group_by_file: 为True时文件变化处也开始新的分块
+
+    Returns:
+        (分块所属文件（未按文件分组时为None）, 问题列表) 的迭代器
+    """
+    chunk_rows = max(1, int(chunk_rows))
+    chunk = []
+    current_file = None
+    for issue in issues:
+        if chunk and (len(chunk) >= chunk_rows or (group_by_file and issue["file"] != current_file)):
+            yield (current_file if group_by_file else None), chunk
+            chunk = []
+        current_file = issue["file"]
+        chunk.append(issue)
+    if chunk:
+        yield (current_file if group_by_file else None), chunk
+
+
+def top_issues(issues: Iterable[Dict[str, Any]], k: int, weight: Callable[[Dict[str, Any]], int]) -> List[Dict[str, Any]]:
+    """
+    在单次遍历中选出风险权重最高的k个问题，同权重按原始顺序，内存中最多保留k个问题
+    """
+    order = count()
+    return [issue for _, _, issue in heapq.nsmallest(
+        max(0, int(k)), ((-weight(issue), next(order), issue) for issue in issues)
+    )]
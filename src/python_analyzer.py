@@ -0,0 +1,271 @@
+"""
+内置的Python分析器（无第三方依赖）
+
+每个文件只读取一次：tokenize收集带"noqa"注释的行用于抑制问题（源码中含"noqa"时才执行），ast语法树在一次递归遍历中完成全部规则检查，
+包括作用域内的变量使用情况；函数圈复杂度使用代码度量引擎（code_metrics）的计算结果，两处统计保持一致。
+本机未安装pylint时作为python标准的分析器。
+
+规则及风险等级：
+    syntax-error        语法错误                     critical
+    eval-exec           使用eval/exec                high
+    bare-except         裸except                     medium
+    mutable-default     可变对象作为参数默认值         medium
+    too-complex         函数圈复杂度超过上限           medium（超过上限2倍时为high）
+    unused-import       未使用的导入                  low
+    unused-variable     函数内赋值后未使用的局部变量    low
+"""
+
+import ast
+import io
+import os
+import tokenize
+from typing import Any, Dict, List, Optional, Set
+
+from .code_metrics import compute_metrics
+
+# 默认的函数圈复杂度上限
+DEFAULT_MAX_COMPLEXITY = 10
+
+# 规则 -> (风险等级, 修复建议)
+RULES = {
+    "syntax-error": ("critical", "修复语法错误，确保文件可以被Python解释器解析"),
+    "eval-exec": ("high", "避免执行动态代码，改用ast.literal_eval或显式的分派逻辑"),
+    "bare-except": ("medium", "捕获具体的异常类型，至少使用except Exception以免吞掉KeyboardInterrupt等"),
+    "mutable-default": ("medium", "使用None作为默认值，在函数内部创建新的可变对象"),
+    "too-complex": ("medium", "拆分函数或提取分支逻辑以降低圈复杂度"),
+    "unused-import": ("low", "删除未使用的导入"),
+    "unused-variable": ("low", "删除未使用的变量，或以下划线开头命名表示有意忽略"),
+}
+
+_MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+_MUTABLE_FACTORIES = {"list", "dict", "set", "bytearray", "defaultdict", "OrderedDict", "deque"}
+
+
+class _FunctionScope:
+    def __init__(self, node: ast.AST):
+        self.node = node
+        self.stores: Dict[str, int] = {}
+        self.loads: Set[str] = set()
+        # 使用locals()、global/nonlocal声明的函数不检查未使用变量
+        self.dynamic = False
+        self.declared: Set[str] = set()
+
+
+class _Checker(ast.NodeVisitor):
+    """
+    单次遍历语法树，检查除圈复杂度外的全部规则
+    """
+
+    def __init__(self):
+        self.findings = []
+        self.imports: Dict[str, int] = {}
+        self.module_loads: Set[str] = set()
+        self.exported: Set[str] = set()
+        self.scopes: List[_FunctionScope] = []
+
+    def report(self, rule: str, line: int, message: str, severity: Optional[str] = None):
+        self.findings.append((rule, line, message, severity or RULES[rule][0]))
+
+    # 作用域
+    def _visit_function(self, node):
+        self._check_defaults(node)
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+            self.visit(default)
+        arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs + [node.args.vararg, node.args.kwarg]
+        for argument in arguments:
+            if argument is not None and argument.annotation is not None:
+                self.visit(argument.annotation)
+        if node.returns is not None:
+            self.visit(node.returns)
+
+        scope = _FunctionScope(node)
+        self.scopes.append(scope)
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+
+        if not scope.dynamic:
+            for name, line in scope.stores.items():
+                if name not in scope.loads and name not in scope.declared and not name.startswith("_"):
+                    self.report("unused-variable", line, f"局部变量 {name} 赋值后未被使用")
+        self._merge_loads(scope)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        for expr in node.decorator_list + node.bases + [keyword.value for keyword in node.keywords]:
+            self.visit(expr)
+        # 函数内定义的类：类属性不是局部变量，只记录其中的名称使用
+        if not self.scopes:
+            for statement in node.body:
+                self.visit(statement)
+            return
+        scope = _FunctionScope(node)
+        scope.dynamic = True
+        self.scopes.append(scope)
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+        self._merge_loads(scope)
+
+    def _merge_loads(self, scope: _FunctionScope):
+        # 内层作用域对外层名称的引用计为外层的使用
+        if self.scopes:
+            self.scopes[-1].loads |= scope.loads
+        else:
+            self.module_loads |= scope.loads
+
+    def visit_Global(self, node: ast.Global):
+        if self.scopes:
+            self.scopes[-1].declared.update(node.names)
+
+    visit_Nonlocal = visit_Global
+
+    # 名称的定义与使用
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, (ast.Load, ast.Del)):
+            if self.scopes:
+                self.scopes[-1].loads.add(node.id)
+                if node.id == "locals":
+                    self.scopes[-1].dynamic = True
+            else:
+                self.module_loads.add(node.id)
+
+    def visit_Assign(self, node: ast.Assign):
+        if self.scopes:
+            for target in node.targets:
+                # 只检查简单赋值，元组解包中的变量常用于占位
+                if isinstance(target, ast.Name):
+                    self.scopes[-1].stores.setdefault(target.id, target.lineno)
+        elif any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                self.exported.update(e.value for e in node.value.elts
+                                     if isinstance(e, ast.Constant) and isinstance(e.value, str))
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        # 增量赋值同时读取变量
+        if isinstance(node.target, ast.Name):
+            self.visit_Name(ast.Name(id=node.target.id, ctx=ast.Load()))
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if self.scopes and node.value is not None and isinstance(node.target, ast.Name):
+            self.scopes[-1].stores.setdefault(node.target.id, node.target.lineno)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        if not self.scopes:
+            for alias in node.names:
+                name = alias.asname or alias.name.split(".")[0]
+                self.imports.setdefault(name, node.lineno)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if not self.scopes and node.module != "__future__":
+            for alias in node.names:
+                if alias.name != "*":
+                    self.imports.setdefault(alias.asname or alias.name, node.lineno)
+
+    # 其他规则
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id in ("eval", "exec"):
+            self.report("eval-exec", node.lineno, f"使用 {node.func.id}() 执行动态代码")
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.type is None:
+            self.report("bare-except", node.lineno, "使用了不指定异常类型的except")
+        self.generic_visit(node)
+
+    def _check_defaults(self, node):
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+            mutable = isinstance(default, _MUTABLE_LITERALS) or (
+                isinstance(default, ast.Call) and isinstance(default.func, ast.Name)
+                and default.func.id in _MUTABLE_FACTORIES
+            )
+            if mutable:
+                self.report("mutable-default", default.lineno, f"函数 {node.name} 使用可变对象作为参数默认值")
+
+    def finish(self, is_package_init: bool):
+        # 包的__init__.py中的导入通常用于重新导出，不检查
+        if not is_package_init:
+            for name, line in self.imports.items():
+                if name not in self.module_loads and name not in self.exported:
+                    self.report("unused-import", line, f"导入的 {name} 未被使用")
+
+
+def _noqa_lines(source: bytes) -> Set[int]:
+    """
+    使用tokenize收集带有"noqa"注释的行号（源码中不含"noqa"时跳过tokenize）
+    """
+    lines = set()
+    if b"noqa" not in source.lower():
+        return lines
+    try:
+        for token in tokenize.tokenize(io.BytesIO(source).readline):
+            if token.type == tokenize.COMMENT and "noqa" in token.string.lower():
+                lines.add(token.start[0])
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return lines
+
+
+def analyze_python_source(source: bytes, file_path: str, max_complexity: int = DEFAULT_MAX_COMPLEXITY,
+                          functions: Optional[List[List[Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    分析Python源码
+
+    Args:
+        functions: 代码度量得到的全部函数（compute_metrics的functions_out），为None时重新计算
+
+    Returns:
+        按行号排序的问题列表（格式与其他分析器一致）
+    """
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except (SyntaxError, ValueError) as e:
+        line = getattr(e, "lineno", None) or 1
+        findings = [("syntax-error", line, f"语法错误: {getattr(e, 'msg', e)}", RULES["syntax-error"][0])]
+    else:
+        checker = _Checker()
+        checker.visit(tree)
+        checker.finish(os.path.basename(file_path) == "__init__.py")
+        findings = checker.findings
+
+        if functions is None:
+            functions = []
+            compute_metrics(source, "python", functions_out=functions)
+        for name, line, _, complexity, _ in functions:
+            if complexity > max_complexity:
+                findings.append(("too-complex", line, f"函数 {name} 的圈复杂度为 {complexity}，超过上限 {max_complexity}",
+                                 "high" if complexity > 2 * max_complexity else RULES["too-complex"][0]))
+
+    suppressed = _noqa_lines(source)
+    issues = []
+    for rule, line, message, severity in sorted(findings, key=lambda finding: finding[1]):
+        if line in suppressed:
+            continue
+        issues.append({
+            "file": file_path,
+            "line": line,
+            "severity": severity,
+            "type": rule,
+            "message": message,
+            "solution": RULES[rule][1]
+        })
+    return issues
+
+
+def analyze_python_file(file_path: str, max_complexity: int = DEFAULT_MAX_COMPLEXITY) -> List[Dict[str, Any]]:
+    """
+    读取并分析单个Python文件，无法读取时返回空列表
+    """
+    try:
+        with open(file_path, "rb") as f:
+            source = f.read()
+    except OSError:
+        return []
+    return analyze_python_source(source, file_path, max_complexity)
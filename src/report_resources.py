@@ -0,0 +1,164 @@
+"""
+报告资源注册表
+
+PDF报告使用的中文字体和Logo图片在进程内只查找、注册一次，之后的报告直接复用。
+字体可通过配置（pdf_font_path）或环境变量CDANALYZER_PDF_FONT显式指定。
+"""
+
+import os
+import platform
+import threading
+from typing import Dict, List, Optional
+
+# 显式指定PDF字体文件的环境变量
+FONT_ENV_VAR = "CDANALYZER_PDF_FONT"
+
+# 注册到reportlab的字体名，找不到可用字体时回退到内置字体
+DEFAULT_FONT_NAME = "CustomChineseFont"
+FALLBACK_FONT_NAME = "Helvetica"
+
+_lock = threading.Lock()
+# 字体文件路径 -> 已注册的字体名
+_registered_fonts: Dict[str, str] = {}
+# 字体请求（显式路径或None） -> 解析得到的字体名
+_resolved_fonts: Dict[Optional[str], str] = {}
+# Logo查找结果，列表为空表示尚未查找
+_logo_path: List[Optional[str]] = []
+
+
+def candidate_font_paths() -> List[str]:
+    """
+    当前平台上按优先级排列的中文字体候选路径
+    """
+    system = platform.system()
+    if system == "Windows":
+        # 尝试多个常见的中文字体路径
+        return [
+            "C:/Windows/Fonts/simsun.ttc",      # 宋体
+            "C:/Windows/Fonts/simhei.ttf",      # 黑体
+            "C:/Windows/Fonts/msyh.ttc",        # 微软雅黑
+            "C:/Windows/Fonts/msyhbd.ttc",      # 微软雅黑粗体
+            "C:/Windows/Fonts/simsunb.ttf",     # 宋体粗体
+            "C:/Windows/Fonts/Arial Unicode.ttf",  # Arial Unicode
+            "C:/Windows/Fonts/mingliu.ttc",     # 细明体
+            "C:/Windows/Fonts/msjh.ttc"         # 微软正黑体
+        ]
+    if system == "Darwin":  # macOS
+        return [
+            "/System/Library/Fonts/STHeiti Light.ttc",  # 黑体-简
+            "/System/Library/Fonts/STHeiti Medium.ttc", # 黑体-简
+            "/System/Library/Fonts/STSong.ttc",         # 宋体-简
+            "/System/Library/Fonts/PingFang.ttc",       # 苹果
+            "/System/Library/Fonts/Helvetica.ttc",      # Helvetica
+            "/System/Library/Fonts/Menlo.ttc",          # Menlo
+            "/Library/Fonts/Songti.ttc",                # 宋体
+            "/Library/Fonts/Heiti.ttc"                  # 黑体
+        ]
+    # Linux
+    return [
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",   # 文泉驿微米黑
+        "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",     # 文泉驿正黑
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc", # Noto Sans CJK
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # DejaVu Sans
+        "/usr/share/fonts/TTF/SourceHanSansCN-Regular.otf", # 思源黑体
+        "/usr/share/fonts/google-noto-cjk/SourceHanSansCN-Regular.ttc", # Google Noto CJK
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf", # Liberation Sans
+        "/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc" # Noto Sans CJK
+    ]
+
+
+def find_font_path(explicit_path: Optional[str] = None) -> Optional[str]:
+    """
+    确定要使用的字体文件：显式指定的路径 > 环境变量 > 平台候选路径
+    """
+    for path in (explicit_path, os.getenv(FONT_ENV_VAR)):
+        if path:
+            if os.path.exists(path):
+                return path
+            print(f"⚠ 警告：指定的字体文件不存在: {path}，改为自动查找")
+    for path in candidate_font_paths():
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _register_font(font_path: str) -> str:
+    """
+    向reportlab注册字体文件（每个文件只注册一次），失败时返回回退字体名
+    """
+    if font_path in _registered_fonts:
+        return _registered_fonts[font_path]
+
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font_name = DEFAULT_FONT_NAME if not _registered_fonts else f"{DEFAULT_FONT_NAME}{len(_registered_fonts)}"
+    try:
+        pdfmetrics.registerFont(TTFont(font_name, font_path))
+
+        # 验证字体是否注册成功
+        if font_name in pdfmetrics.getRegisteredFontNames():
+            print(f"成功注册字体: {font_path}")
+        else:
+            print(f"字体注册失败: {font_path}")
+            font_name = FALLBACK_FONT_NAME
+    except Exception as e:
+        print(f"字体注册异常: {e}")
+        font_name = FALLBACK_FONT_NAME
+
+    _registered_fonts[font_path] = font_name
+    return font_name
+
+
+def get_pdf_font(explicit_path: Optional[str] = None) -> str:
+    """
+    获取PDF报告使用的字体名，首次调用时查找并注册字体，之后直接返回缓存结果
+
+    Args:
+        explicit_path: 显式指定的字体文件路径，为None时依次使用环境变量和平台候选路径
+    """
+    key = explicit_path or os.getenv(FONT_ENV_VAR) or None
+    font_name = _resolved_fonts.get(key)
+    if font_name is not None:
+        return font_name
+
+    with _lock:
+        if key not in _resolved_fonts:
+            font_path = find_font_path(explicit_path)
+            if font_path:
+                _resolved_fonts[key] = _register_font(font_path)
+            else:
+                print(f"未找到合适的中文字体，使用默认字体")
+                _resolved_fonts[key] = FALLBACK_FONT_NAME
+        return _resolved_fonts[key]
+
+
+def get_logo_path() -> Optional[str]:
+    """
+    获取报告Logo图片路径，首次调用时查找，之后直接返回缓存结果
+    """
+    if _logo_path:
+        return _logo_path[0]
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    # 尝试多个可能的图片路径
+    logo_paths = [
+        os.path.join(src_dir, "..", "cdico_64_64.jpg"),  # 项目根目录
+        os.path.join(src_dir, "cdico_64_64.jpg"),      # 当前目录
+        os.path.join(os.path.dirname(src_dir), "cdico_64_64.jpg"),  # 项目根目录
+        "cdico_64_64.jpg"  # 当前工作目录
+    ]
+    found = next((path for path in logo_paths if os.path.exists(path)), None)
+    with _lock:
+        if not _logo_path:
+            _logo_path.append(found)
+    return _logo_path[0]
+
+
+def reset_report_resources():
+    """
+    清空查找结果缓存（已注册到reportlab的字体保留，供测试及更换字体配置后使用）
+    """
+    with _lock:
+        _resolved_fonts.clear()
+        _logo_path.clear()
@@ -0,0 +1,223 @@
+"""
+基于正则的多语言敏感信息与危险模式扫描器
+
+检查硬编码的凭据、云服务密钥、私钥、SQL字符串拼接和命令注入调用点。
+
+Python的re对多分支正则在每个位置逐一尝试所有分支，直接用合并后的大正则扫描全文只有每秒数MB。
+因此每条规则声明若干必然出现在匹配中的字面量锚点：先在小写化的内容上用bytes.find（C实现，每秒GB级）
+定位锚点所在的行，只有这些候选行才交给对应规则的正则确认（各规则分别匹配，同一行可同时报告多条规则，
+例如赋值给token变量的GitHub令牌）。
+文件按块读取（块边界对齐到换行，超过块大小的单行按块大小切分，跨越切分点的匹配可能漏报），内存占用与文件大小和行长都无关；
+已读入内存的内容（见line_counter.read_source）直接用scan_source()扫描。发现的问题类型为security_vulnerability，
+问题描述中不包含匹配到的敏感内容本身。
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# 每次读取的块大小（4MB）
+CHUNK_SIZE = 4 << 20
+# 用于判断二进制文件的文件头长度
+BINARY_SNIFF_SIZE = 8192
+# 每个文件最多报告的问题数
+DEFAULT_MAX_FINDINGS = 100
+# 规则集版本（写入增量缓存），修改规则后递增
+RULESET_VERSION = 2
+
+
+class SecurityRule(NamedTuple):
+    rule_id: str
+    pattern: bytes
+    # 匹配中必然出现的字面量（小写），任一锚点出现的行才用正则确认
+    anchors: Tuple[bytes, ...]
+    severity: str
+    message: str
+    solution: str
+    # 适用的语言，None表示所有语言
+    languages: Optional[Tuple[str, ...]] = None
+
+
+_JVM = ("java", "kotlin", "scala", "groovy")
+_JS = ("javascript", "typescript")
+_SQL_STATEMENT = rb"\b(?:select\s[^\"'\n]*\bfrom|insert\s+into|update\s+\w+\s+set|delete\s+from)\b"
+_SQL_ANCHORS = (b"select", b"insert", b"update", b"delete")
+
+_SECRET_SOLUTION = "立即吊销并轮换该凭据，改为从环境变量或密钥管理服务读取，并从版本历史中清除"
+_SQL_SOLUTION = "使用参数化查询或ORM的绑定参数，不要拼接SQL字符串"
+_SHELL_SOLUTION = "避免通过shell执行命令，使用参数列表形式调用并对外部输入进行白名单校验"
+
+RULES: List[SecurityRule] = [
+    SecurityRule("private-key", rb"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----", (b"private key",),
+                 "critical", "源码中包含私钥", _SECRET_SOLUTION),
+    SecurityRule("aws-access-key", rb"\b(?:AKIA|ASIA)[0-9A-Z]{16}\b", (b"akia", b"asia"),
+                 "critical", "硬编码的AWS访问密钥", _SECRET_SOLUTION),
+    SecurityRule("github-token", rb"\bgh[pousr]_[A-Za-z0-9]{36,}\b", (b"ghp_", b"gho_", b"ghu_", b"ghs_", b"ghr_"),
+                 "critical", "硬编码的GitHub令牌", _SECRET_SOLUTION),
+    SecurityRule("slack-token", rb"\bxox[abprs]-[A-Za-z0-9-]{10,}", (b"xox",),
+                 "critical", "硬编码的Slack令牌", _SECRET_SOLUTION),
+    SecurityRule("google-api-key", rb"\bAIza[0-9A-Za-z_\-]{35}", (b"aiza",),
+                 "critical", "硬编码的Google API密钥", _SECRET_SOLUTION),
+    SecurityRule("hardcoded-credential",
+                 # 名称允许带前缀（DB_PASSWORD、GITHUB_TOKEN、dbPassword）；较短的pwd/pass只匹配单独的单词或"_"之后的部分，
+                 # 避免bypass、compass等误报
+                 rb"(?i:(?:\b[A-Za-z0-9_]*?(?:password|passwd|secret(?:_?key)?|api_?key|token)"
+                 rb"|(?<![A-Za-z0-9])(?:pwd|pass))\b"
+                 rb"[\"']?\s*(?::=|=>|[:=])\s*[\"'][^\"'\s]{6,}[\"'])",
+                 (b"pass", b"pwd", b"secret", b"apikey", b"api_key", b"token"),
+                 "high", "硬编码的密码或密钥", _SECRET_SOLUTION),
+    SecurityRule("sql-concatenation",
+                 rb"(?i:[\"'][^\"'\n]*" + _SQL_STATEMENT + rb"[^\n]*?[\"']\s*(?:\+|\.|%)\s*[\w$(])", _SQL_ANCHORS,
+                 "high", "SQL语句通过字符串拼接构造，可能存在SQL注入", _SQL_SOLUTION,
+                 ("python", "php", "ruby", "perl", "go", "csharp", "cpp", "objective-c") + _JVM + _JS),
+    SecurityRule("sql-interpolation", rb"(?i:\bf[\"'][^\"'\n]*" + _SQL_STATEMENT + rb"[^\"'\n]*\{)", _SQL_ANCHORS,
+                 "high", "SQL语句通过f-string插值构造，可能存在SQL注入", _SQL_SOLUTION, ("python",)),
+    SecurityRule("sql-interpolation", rb"(?i:`[^`\n]*" + _SQL_STATEMENT + rb"[^`\n]*\$\{)", _SQL_ANCHORS,
+                 "high", "SQL语句通过模板字符串插值构造，可能存在SQL注入", _SQL_SOLUTION, _JS),
+    SecurityRule("shell-injection", rb"\bos\.(?:system|popen)\s*\(|\bsubprocess\.\w+\([^)\n]*\bshell\s*=\s*True",
+                 (b"os.system", b"os.popen", b"shell"), "high", "通过shell执行命令，可能存在命令注入", _SHELL_SOLUTION, ("python",)),
+    SecurityRule("shell-injection", rb"\bchild_process\b[^\n]*\bexec(?:Sync)?\b|\bexec(?:Sync)?\s*\(\s*`[^`\n]*\$\{",
+                 (b"exec",), "high", "通过child_process执行shell命令，可能存在命令注入", _SHELL_SOLUTION, _JS),
+    SecurityRule("shell-injection", rb"\b(?:shell_exec|system|passthru|exec|popen|proc_open)\s*\([^)\n]*\$",
+                 (b"exec", b"system", b"passthru", b"popen", b"proc_open"), "high", "将变量传入命令执行函数，可能存在命令注入", _SHELL_SOLUTION, ("php",)),
+    SecurityRule("shell-injection", rb"`[^`\n]*#\{|\b(?:system|exec)\s*\(?\s*\"[^\"\n]*#\{|%x\{",
+                 (b"#{", b"%x{"), "high", "在shell命令中插值，可能存在命令注入", _SHELL_SOLUTION, ("ruby",)),
+    SecurityRule("shell-injection", rb"\bexec\.Command\(\s*\"(?:sh|bash)\"\s*,\s*\"-c\"",
+                 (b"exec.command",), "high", "通过sh -c执行命令，可能存在命令注入", _SHELL_SOLUTION, ("go",)),
+    SecurityRule("shell-injection", rb"\bRuntime\.getRuntime\(\)\.exec\s*\(",
+                 (b"runtime.getruntime",), "high", "通过Runtime.exec执行命令，可能存在命令注入", _SHELL_SOLUTION, _JVM),
+    SecurityRule("shell-injection", rb"\b(?:system|popen)\s*\(",
+                 (b"system", b"popen"), "high", "通过system/popen执行shell命令，可能存在命令注入", _SHELL_SOLUTION, ("cpp", "objective-c")),
+    SecurityRule("shell-injection", rb"\beval\s+[\"']?\$",
+                 (b"eval",), "high", "对变量内容执行eval，可能存在命令注入", _SHELL_SOLUTION, ("shell",)),
+    SecurityRule("shell-injection", rb"`[^`\n]*\$\w|\bsystem\s*\(?\s*\"[^\"\n]*\$\w",
+                 (b"`", b"system"), "high", "在shell命令中插值变量，可能存在命令注入", _SHELL_SOLUTION, ("perl",)),
+]
+
+# 规则序号 -> 编译后的正则
+_PATTERNS: List[re.Pattern] = [re.compile(rule.pattern) for rule in RULES]
+# 语言 -> 锚点 -> 规则序号
+_anchor_tables: Dict[Optional[str], Dict[bytes, Tuple[int, ...]]] = {}
+
+
+def anchor_table(language: Optional[str]) -> Dict[bytes, Tuple[int, ...]]:
+    """
+    获取某种语言适用规则的锚点表（锚点 -> 规则序号），结果在进程内缓存
+    """
+    if language not in _anchor_tables:
+        table: Dict[bytes, List[int]] = {}
+        for i, rule in enumerate(RULES):
+            if rule.languages is None or language in rule.languages:
+                for anchor in rule.anchors:
+                    table.setdefault(anchor, []).append(i)
+        _anchor_tables[language] = {anchor: tuple(indices) for anchor, indices in table.items()}
+    return _anchor_tables[language]
+
+
+def _candidate_lines(block: bytes, anchors: Dict[bytes, Tuple[int, ...]]) -> Dict[int, Tuple[int, set]]:
+    """
+    在块中定位包含锚点的行
+
+    Returns:
+        行起始位置 -> (行结束位置, 候选规则序号集合)
+    """
+    lower = block.lower()
+    lines = {}
+    for anchor, indices in anchors.items():
+        position = lower.find(anchor)
+        while position != -1:
+            line_start = lower.rfind(b"\n", 0, position) + 1
+            line_end = lower.find(b"\n", position)
+            if line_end == -1:
+                line_end = len(lower)
+            entry = lines.get(line_start)
+            if entry is None:
+                lines[line_start] = (line_end, set(indices))
+            else:
+                entry[1].update(indices)
+            position = lower.find(anchor, line_end)
+    return lines
+
+
+def scan_blocks(blocks: Iterable[bytes], file_path: str, language: Optional[str],
+                max_findings: int = DEFAULT_MAX_FINDINGS) -> List[Dict[str, Any]]:
+    """
+    扫描按行对齐的内容块（每个块以完整的行结束）
+
+    Returns:
+        问题列表（格式与其他分析器一致）
+    """
+    anchors = anchor_table(language)
+    issues = []
+    line_offset = 1
+    for block in blocks:
+        line = line_offset
+        position = 0
+        for line_start, (line_end, indices) in sorted(_candidate_lines(block, anchors).items()):
+            line += block.count(b"\n", position, line_start)
+            position = line_start
+            for rule_index in sorted(indices):
+                if not _PATTERNS[rule_index].search(block, line_start, line_end):
+                    continue
+                rule = RULES[rule_index]
+                issues.append({
+                    "file": file_path,
+                    "line": line,
+                    "severity": rule.severity,
+                    "type": "security_vulnerability",
+                    "message": f"安全风险：{rule.message} ({rule.rule_id})",
+                    "solution": rule.solution
+                })
+                if len(issues) >= max_findings:
+                    return issues
+        line_offset += block.count(b"\n")
+    return issues
+
+
+def _iter_blocks(f, chunk_size: int):
+    """
+    按块读取文件，块边界对齐到换行符；没有换行的内容累积到块大小时直接作为一块产出，
+    未对齐的块不增加行号，后续块中的问题行号仍然正确
+    """
+    carry = b""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        data = carry + chunk if carry else chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            if len(data) >= chunk_size:
+                carry = b""
+                yield data
+            else:
+                carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry:
+        yield carry
+
+
+def scan_source(data: bytes, file_path: str, language: Optional[str],
+                max_findings: int = DEFAULT_MAX_FINDINGS) -> List[Dict[str, Any]]:
+    """
+    扫描已读入内存的文件内容，二进制内容返回空列表
+    """
+    if b"\0" in data[:BINARY_SNIFF_SIZE]:
+        return []
+    return scan_blocks((data,), file_path, language, max_findings)
+
+
+def scan_file(file_path: str, language: Optional[str], max_findings: int = DEFAULT_MAX_FINDINGS,
+              chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """
+    按块读取并扫描单个文件，二进制文件或无法读取时返回空列表
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if b"\0" in f.read(BINARY_SNIFF_SIZE):
+                return []
+            f.seek(0)
+            return scan_blocks(_iter_blocks(f, chunk_size), file_path, language, max_findings)
+    except OSError:
+        return []
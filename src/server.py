@@ -0,0 +1,350 @@
+"""
+常驻分析服务
+
+基于asyncio的最小HTTP/1.1服务，监听TCP端口或Unix套接字，接受与config.json输入结构一致的JSON分析请求。
+服务启动时创建常驻的工作进程池（工作进程在启动时即完成初始化）和共享的大模型HTTP客户端，
+每个请求使用独立的CdanalyzerAgentSkill实例，大模型配置和各项分析配置互不影响，
+只共享进程池、HTTP连接池和预编译的排除模式匹配器。同时执行的分析任务数受max_jobs限制，超出的请求排队等待。
+
+接口（每个连接处理一个请求）：
+    POST   /analyze          请求体为分析参数JSON，分析完成后返回execute()的结果；参数不符合输入结构时返回400
+    POST   /jobs             提交分析任务（请求体同上），立即返回202及job_id
+    GET    /jobs/{id}        轮询任务状态和进度，任务结束后附带execute()的结果
+    GET    /jobs/{id}/events 以server-sent events推送进度（event为progress，任务结束时为done），见src/jobs.py
+    DELETE /jobs/{id}        取消任务，返回取消后的任务状态
+    GET    /health           返回服务状态（工作进程数、运行中/排队中/已完成的任务数）
+
+用法:
+    python -m src.server [--host 127.0.0.1] [--port 8765] [--unix-socket 路径] [--workers N] [--max-jobs N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .CdanalyzerAgentSkill import CdanalyzerAgentSkill, create_http_client, warm_up_worker
+from .jobs import FINISHED_STATES, JobManager
+from .path_matcher import MatcherCache
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 默认同时执行的分析任务数
+DEFAULT_MAX_JOBS = 2
+# 请求体大小上限（1MB）
+MAX_BODY_SIZE = 1 << 20
+
+_JSON_TYPES = {"string": str, "number": (int, float), "boolean": bool, "array": list, "object": dict}
+_STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def load_input_schema(config_path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """
+    读取config.json中的输入参数结构
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        return json.load(f)["parameters"]["input_schema"]
+
+
+def _check_type(name: str, value: Any, spec: Dict[str, Any]):
+    expected = _JSON_TYPES.get(spec.get("type"))
+    # bool是int的子类，数值参数不接受布尔值
+    if expected is not None and (not isinstance(value, expected)
+                                 or (spec["type"] == "number" and isinstance(value, bool))):
+        raise ValueError(f"参数 {name} 应为{spec['type']}类型")
+    if "enum" in spec and value not in spec["enum"]:
+        raise ValueError(f"参数 {name} 的取值 {value!r} 不在允许范围内: {', '.join(map(str, spec['enum']))}")
+
+
+def validate_inputs(inputs: Any, schema: Dict[str, Any]):
+    """
+    按输入参数结构校验请求（必填参数、未知参数、参数类型和枚举取值），不符合时抛出ValueError
+    """
+    if not isinstance(inputs, dict):
+        raise ValueError("请求体应为JSON对象")
+    properties = schema.get("properties", {})
+    for name in schema.get("required", []):
+        if name not in inputs:
+            raise ValueError(f"缺少必填参数: {name}")
+    for name, value in inputs.items():
+        spec = properties.get(name)
+        if spec is None:
+            raise ValueError(f"未知参数: {name}")
+        if value is None:
+            continue
+        _check_type(name, value, spec)
+        if spec.get("type") == "array" and "items" in spec:
+            for item in value:
+                _check_type(f"{name}[]", item, spec["items"])
+
+
+class AnalysisService:
+    """
+    常驻分析服务：持有预热的进程池和共享的HTTP客户端，按并发上限执行分析任务
+    """
+
+    def __init__(self, workers: int = 0, max_jobs: int = DEFAULT_MAX_JOBS, schema: Dict[str, Any] = None):
+        """
+        Args:
+            workers: 工作进程数，0表示使用全部CPU核心
+            max_jobs: 同时执行的分析任务数上限
+            schema: 输入参数结构，为None时读取config.json
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs = max(1, max_jobs)
+        self.schema = schema or load_input_schema()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.http_client = None
+        # 按排除模式列表缓存的预编译匹配器，各请求共用（容量有限，淘汰最久未使用的模式列表）
+        self.exclude_matchers = MatcherCache()
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(self):
+        """
+        创建并预热进程池（同时提交与工作进程数相同的任务，使全部工作进程立即启动并完成初始化），创建共享HTTP客户端
+        """
+        self._slots = asyncio.Semaphore(self.max_jobs)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up_worker)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+        self.http_client = create_http_client(CdanalyzerAgentSkill().llm_http_config)
+
+    def new_skill(self) -> CdanalyzerAgentSkill:
+        """
+        为单个请求创建独立的分析实例，并接入服务共享的资源
+        """
+        skill = CdanalyzerAgentSkill()
+        skill.shared_executor = self.executor
+        skill.shared_http_client = self.http_client
+        skill._exclude_matchers = self.exclude_matchers
+        return skill
+
+    async def analyze(self, inputs: Dict[str, Any],
+                      progress_listener: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        校验参数后执行一次分析，达到并发上限时排队等待
+
+        未指定parallel_workers时使用服务的全部工作进程。
+
+        Args:
+            progress_listener: 分析进度回调（见CdanalyzerAgentSkill.progress_listener）
+        """
+        validate_inputs(inputs, self.schema)
+        self.queued += 1
+        waiting = True
+        try:
+            async with self._slots:
+                self.queued -= 1
+                waiting = False
+                self.running += 1
+                try:
+                    skill = self.new_skill()
+                    skill.progress_listener = progress_listener
+                    return await skill.execute({"parallel_workers": self.workers, **inputs})
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+        finally:
+            if waiting:
+                self.queued -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        返回服务状态
+        """
+        return {"workers": self.workers, "max_jobs": self.max_jobs, "running": self.running,
+                "queued": self.queued, "completed": self.completed}
+
+    async def close(self):
+        """
+        关闭共享HTTP客户端和进程池
+        """
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown, True, cancel_futures=True)
+            self.executor = None
+
+
+class AnalysisServer:
+    """
+    分析服务的HTTP/1.1接口
+    """
+
+    def __init__(self, service: AnalysisService):
+        self.service = service
+        self.jobs = JobManager(service.analyze)
+
+    def _parse_inputs(self, body: bytes) -> Dict[str, Any]:
+        inputs = json.loads(body or b"null")
+        validate_inputs(inputs, self.service.schema)
+        return inputs
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """
+        分发请求
+
+        Returns:
+            (HTTP状态码, 响应JSON)；进度订阅的响应为进度事件的异步迭代器
+        """
+        if path == "/jobs" or path.startswith("/jobs/"):
+            parts = [part for part in path[len("/jobs"):].split("/") if part]
+            return await self.route_jobs(method, parts, body)
+        if path == "/health":
+            if method != "GET":
+                return 405, {"error": "仅支持GET"}
+            return 200, self.service.stats()
+        if path == "/analyze":
+            if method != "POST":
+                return 405, {"error": "仅支持POST"}
+            try:
+                inputs = self._parse_inputs(body)
+            except ValueError as e:
+                return 400, {"success": False, "error": str(e), "message": "请求参数无效"}
+            return 200, await self.service.analyze(inputs)
+        return 404, {"error": f"未知路径: {path}"}
+
+    async def route_jobs(self, method: str, parts: List[str], body: bytes) -> Tuple[int, Any]:
+        """
+        分发/jobs下的请求
+        """
+        if not parts:
+            if method != "POST":
+                return 405, {"error": "仅支持POST"}
+            try:
+                inputs = self._parse_inputs(body)
+            except ValueError as e:
+                return 400, {"success": False, "error": str(e), "message": "请求参数无效"}
+            return 202, {"job_id": self.jobs.submit(inputs)}
+
+        job_id = parts[0]
+        if self.jobs.get(job_id) is None:
+            return 404, {"error": f"未知任务: {job_id}"}
+        if parts[1:] == ["events"]:
+            if method != "GET":
+                return 405, {"error": "仅支持GET"}
+            return 200, self.jobs.events(job_id)
+        if len(parts) > 1:
+            return 404, {"error": f"未知路径: /jobs/{'/'.join(parts)}"}
+        if method == "GET":
+            return 200, self.jobs.status(job_id)
+        if method == "DELETE":
+            await self.jobs.cancel(job_id)
+            return 200, self.jobs.status(job_id)
+        return 405, {"error": "仅支持GET和DELETE"}
+
+    async def _write_events(self, writer: asyncio.StreamWriter, events):
+        """
+        以server-sent events写出进度事件，客户端断开时停止订阅
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream; charset=utf-8\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        try:
+            async for event in events:
+                name = "done" if event["state"] in FINISHED_STATES else "progress"
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                writer.write(f"event: {name}\ndata: {data}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            await events.aclose()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        处理一个连接上的单个请求
+        """
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            try:
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                status, payload = 400, {"error": "无法解析的HTTP请求"}
+            else:
+                if length > MAX_BODY_SIZE:
+                    status, payload = 413, {"error": f"请求体超过 {MAX_BODY_SIZE} 字节"}
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self.route(method, target.split("?", 1)[0], body)
+                    except Exception as e:
+                        status, payload = 500, {"success": False, "error": str(e)}
+            if hasattr(payload, "__aiter__"):
+                await self._write_events(writer, payload)
+                return
+            data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {_STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    unix_socket: str = None) -> asyncio.AbstractServer:
+        """
+        开始监听TCP端口或Unix套接字（指定unix_socket时）
+        """
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle, path=unix_socket)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = None,
+                workers: int = 0, max_jobs: int = DEFAULT_MAX_JOBS):
+    """
+    启动常驻分析服务，直到进程被中断
+    """
+    service = AnalysisService(workers, max_jobs)
+    await service.start()
+    app = AnalysisServer(service)
+    try:
+        server = await app.start(host, port, unix_socket)
+        address = unix_socket or f"http://{host}:{port}"
+        print(f"【分析服务已启动：{address}，{service.workers} 个常驻工作进程，最多同时执行 {service.max_jobs} 个任务】")
+        async with server:
+            await server.serve_forever()
+    finally:
+        await app.jobs.close()
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="龙析常驻分析服务")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument("--unix-socket", default=None, help="改为监听的Unix套接字路径")
+    parser.add_argument("--workers", type=int, default=0, help="常驻工作进程数，0表示使用全部CPU核心")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS, help="同时执行的分析任务数上限")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix_socket, args.workers, args.max_jobs))
+    except KeyboardInterrupt:
+        print("\n【分析服务已停止】")
+
+
+if __name__ == "__main__":
+    main()
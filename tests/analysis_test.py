@@ -0,0 +1,245 @@
+import unittest
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+
+from skill import CdanalyzerAgentSkill
+
+
+class AnalysisPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.skill = CdanalyzerAgentSkill()
+        self.skill.use_llm_config = 1
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = self.temp_dir.name
+        self.spool_dir = tempfile.TemporaryDirectory()
+        for i in range(20):
+            with open(os.path.join(self.project, f"module_{i}.py"), "w", encoding="utf-8") as f:
+                f.write("import os\n" * (i + 1))
+        with open(os.path.join(self.project, "app.js"), "w", encoding="utf-8") as f:
+            f.write("var a = 1;\nvar b = 2;")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        self.spool_dir.cleanup()
+
+    def _analyze(self, **kwargs):
+        file_list, languages = self.skill._identify_target_files(self.project, [])
+        file_list.sort()
+        standards = self.skill._confirm_analysis_standards(languages, {})
+        return asyncio.run(self.skill._perform_analysis(file_list, standards, self.spool_dir.name, **kwargs))
+
+    def test_parallel_matches_serial(self):
+        serial = self._analyze()
+        parallel = self._analyze(workers=2, chunk_size=3)
+
+        self.assertEqual(dict(serial["language_stats"]), dict(parallel["language_stats"]))
+        self.assertEqual(serial["language_stats"]["python"]["lines"], sum(range(1, 21)))
+        self.assertEqual(serial["language_stats"]["javascript"]["lines"], 2)
+
+        # 问题的内容和顺序与串行模式一致
+        self.assertEqual(list(serial["issues_found"]), list(parallel["issues_found"]))
+
+    def test_streamed_file_list_matches_list(self):
+        expected = self._analyze()
+        walker = self.skill._create_file_walker(self.project, [], workers=4)
+        standards = self.skill._confirm_analysis_standards(["python", "javascript"], {})
+        streamed = asyncio.run(self.skill._perform_analysis(
+            (path for path, _ in walker), standards, self.spool_dir.name, workers=2, chunk_size=3
+        ))
+
+        # 遍历器按完整路径顺序产出，边遍历边分析的结果顺序与文件列表一致
+        self.assertEqual(streamed["files_analyzed"], expected["files_analyzed"])
+        self.assertEqual(dict(streamed["language_stats"]), dict(expected["language_stats"]))
+        self.assertEqual(walker.stats()["files"], 21)
+
+    def test_incremental_cache_reuses_unchanged_files(self):
+        cache_dir = os.path.join(self.project, "reports")
+        first = self._analyze(cache_dir=cache_dir)
+        self.assertEqual(first["cache_stats"], {"hits": 0, "misses": 21})
+
+        with open(os.path.join(self.project, "app.js"), "a", encoding="utf-8") as f:
+            f.write("\nvar c = 3;")
+        second = self._analyze(cache_dir=cache_dir)
+        self.assertEqual(second["cache_stats"], {"hits": 20, "misses": 1})
+        self.assertEqual(second["language_stats"]["javascript"]["lines"], 3)
+        # 缓存命中文件的代码度量从缓存读取
+        self.assertEqual(second["metrics"]["files"], 21)
+        self.assertEqual(second["metrics"]["maintainability_index"], first["metrics"]["maintainability_index"])
+
+        # 缓存命中文件的问题与首次分析结果一致
+        python_issues = lambda result: [i for i in result["issues_found"] if i["file"].endswith(".py")]
+        strip = lambda issues: [{k: v for k, v in i.items() if k != "ai_suggestion"} for i in issues]
+        self.assertEqual(strip(python_issues(first)), strip(python_issues(second)))
+
+    def test_touched_files_are_verified_in_workers(self):
+        cache_dir = os.path.join(self.project, "reports")
+        self._analyze(cache_dir=cache_dir)
+
+        # 模拟全新检出：所有文件的修改时间变化，其中一个文件内容变化但大小不变
+        for name in os.listdir(self.project):
+            path = os.path.join(self.project, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with open(os.path.join(self.project, "module_0.py"), "w", encoding="utf-8") as f:
+            f.write("import re\n")
+
+        second = self._analyze(cache_dir=cache_dir, workers=2, chunk_size=3)
+        self.assertEqual(second["cache_stats"], {"hits": 20, "misses": 1})
+        self.assertEqual(second["language_stats"]["python"]["lines"], sum(range(1, 21)))
+        # 校验后刷新了修改时间，再次分析时直接命中
+        third = self._analyze(cache_dir=cache_dir, workers=2, chunk_size=3)
+        self.assertEqual(third["cache_stats"], {"hits": 21, "misses": 0})
+
+    def test_concurrent_runs_share_cache_dir(self):
+        cache_dir = os.path.join(self.project, "reports")
+        file_list, languages = self.skill._identify_target_files(self.project, [])
+        file_list.sort()
+        standards = self.skill._confirm_analysis_standards(languages, {})
+
+        async def run_both():
+            skills = [CdanalyzerAgentSkill(), CdanalyzerAgentSkill()]
+            return await asyncio.wait_for(asyncio.gather(*(
+                skill._perform_analysis(file_list, standards, self.spool_dir.name, chunk_size=3, cache_dir=cache_dir)
+                for skill in skills
+            )), timeout=20)
+
+        # 同一报告目录的两个任务交替写入缓存，都能完成，不会等待对方释放写锁直到超时
+        for result in asyncio.run(run_both()):
+            self.assertEqual(len(result["files_analyzed"]), 21)
+        self.assertEqual(self._analyze(cache_dir=cache_dir)["cache_stats"], {"hits": 21, "misses": 0})
+
+    def test_blocking_discovery_does_not_block_event_loop(self):
+        file_list, languages = self.skill._identify_target_files(self.project, [])
+        file_list.sort()
+        standards = self.skill._confirm_analysis_standards(languages, {})
+        cache_dir = os.path.join(self.project, "reports")
+
+        def slow_walk():
+            for file_path in file_list:
+                time.sleep(0.02)
+                yield file_path
+
+        async def run_with_ticker():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            try:
+                result = await self.skill._perform_analysis(slow_walk(), standards, self.spool_dir.name,
+                                                            chunk_size=3, cache_dir=cache_dir)
+            finally:
+                task.cancel()
+            return result, ticks
+
+        # 目录遍历和缓存检查在线程中执行，遍历期间（约0.4秒）事件循环仍能调度其他任务
+        result, ticks = asyncio.run(run_with_ticker())
+        self.assertEqual(result["files_analyzed"], file_list)
+        self.assertGreater(ticks, 20)
+
+        # 任务被取消时遍历器在线程中正在执行的批次结束后关闭
+        closed = []
+
+        def endless_walk():
+            try:
+                while True:
+                    time.sleep(0.01)
+                    yield file_list[0]
+            finally:
+                closed.append(True)
+
+        async def cancel_midway():
+            task = asyncio.create_task(self.skill._perform_analysis(endless_walk(), standards, self.spool_dir.name,
+                                                                    chunk_size=3))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_midway())
+        for _ in range(100):
+            if closed:
+                break
+            time.sleep(0.01)
+        self.assertEqual(closed, [True])
+
+    def test_files_deleted_before_analysis_are_skipped(self):
+        missing = os.path.join(self.project, "deleted.py")
+        file_list, languages = self.skill._identify_target_files(self.project, [])
+        standards = self.skill._confirm_analysis_standards(languages, {})
+        # 已被删除的文件（包括待校验内容哈希的文件）不影响同一分块中的其他文件
+        results = self.skill._analyze_file_batch(
+            [(0, missing, "python"), (1, missing, "python"), (2, file_list[0], None)], standards,
+            compute_hash=True, expected_hashes={0: "0" * 32})
+        self.assertEqual([result.get("skipped", False) for result in results], [True, True, False])
+
+        cache_dir = os.path.join(self.project, "reports")
+        result = asyncio.run(self.skill._perform_analysis(sorted(file_list + [missing]), standards, self.spool_dir.name,
+                                                          workers=2, chunk_size=3, cache_dir=cache_dir))
+        self.assertEqual(len(result["files_analyzed"]), 21)
+        self.assertNotIn(missing, result["files_analyzed"])
+
+    def test_issues_stream_to_report_rows(self):
+        result = self._analyze(workers=2, chunk_size=3, stream_formats=["html", "txt"])
+        sink = result["issues_found"]
+        issues = list(sink)
+        self.assertEqual(len(sink), len(issues))
+
+        # 风险统计在写入时汇总，与逐条统计结果一致
+        expected = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        for issue in issues:
+            expected[issue["severity"]] += 1
+        self.assertEqual(result["risk_counts"], expected)
+        self.assertEqual(result["total_lines"], sum(range(1, 21)) + 2)
+
+        # 分析过程中已生成的报告片段与事后逐条格式化的结果一致
+        with open(sink.row_part("txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "".join(
+                self.skill._format_text_issue_row(issue, i) for i, issue in enumerate(issues, 1)))
+        with open(sink.row_part("html"), encoding="utf-8") as f:
+            self.assertEqual(f.read().count("<tr "), len(issues))
+
+    def test_changed_since_uses_cached_baseline(self):
+        def git(*args):
+            subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                           cwd=self.project, check=True, capture_output=True)
+        git("init", "-q")
+        git("add", "-A")
+        git("commit", "-q", "-m", "init")
+
+        report_dir = os.path.join(self.temp_dir.name, "reports")
+        with open(os.path.join(self.project, ".gitignore"), "w", encoding="utf-8") as f:
+            f.write("reports/\n")
+        inputs = {"target_path": self.project, "report_path": report_dir, "report_format": [], "use_llm_config": 1}
+        full = self.skill.run_skill(inputs)
+        self.assertTrue(full["success"], msg=full.get("error"))
+
+        with open(os.path.join(self.project, "module_0.py"), "a", encoding="utf-8") as f:
+            f.write("import sys\n")
+        with open(os.path.join(self.project, "new_module.py"), "w", encoding="utf-8") as f:
+            f.write("import re\n")
+
+        result = self.skill.run_skill({**inputs, "changed_since": "HEAD"})
+        self.assertTrue(result["success"], msg=result.get("error"))
+        summary = result["summary"]
+        self.assertEqual(summary["total_files"], 2)
+        self.assertEqual(summary["baseline"], {"files": 20, "missing": 0})
+        self.assertEqual(summary["language_breakdown"]["python"]["files"], 21)
+        self.assertEqual(summary["total_lines"], full["summary"]["total_lines"] + 2)
+        self.assertEqual(summary["metrics"]["files"], 22)
+        # 未变更文件使用缓存的指纹参与重复代码检测，重复率覆盖全仓
+        self.assertEqual(full["summary"]["clones"]["files"], 21)
+        self.assertEqual(summary["clones"]["files"], 22)
+        self.assertIn("duplication", summary["language_breakdown"]["javascript"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from skill import CdanalyzerAgentSkill
+from src import analyzers
+from src.analyzers import AnalyzerError, AnalyzerRunner, CppcheckRunner, PylintRunner
+
+# 替身工具：记录调用次数，对每个文件报告一个问题
+_SCRIPT = """
+import json, sys, time
+log, delay, files = sys.argv[1], float(sys.argv[2]), sys.argv[3:]
+time.sleep(delay)
+with open(log, "a") as f:
+    f.write(str(len(files)) + "\\n")
+print(json.dumps([{"path": p, "line": 3, "level": "error", "rule": "stand-in", "message": "msg"} for p in files]))
+"""
+
+
+class _ScriptRunner(AnalyzerRunner):
+    name = "stand-in"
+    executable = sys.executable
+    severity_map = {"error": "high"}
+    log_path = None
+    delay = 0.0
+
+    def command(self, files):
+        return [sys.executable, "-c", _SCRIPT, self.log_path, str(self.delay), *files]
+
+    def parse(self, stdout, stderr):
+        for item in json.loads(stdout):
+            yield item["path"], self.issue(item["path"], item["line"], item["level"], item["rule"], item["message"])
+
+
+class AnalyzerRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.skill = CdanalyzerAgentSkill()
+        self.skill.use_llm_config = 1
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.temp_dir.name, "project")
+        os.makedirs(self.project)
+        for i in range(5):
+            with open(os.path.join(self.project, f"m{i}.py"), "w", encoding="utf-8") as f:
+                f.write("import os\n")
+        _ScriptRunner.log_path = os.path.join(self.temp_dir.name, "calls.log")
+        _ScriptRunner.delay = 0.0
+        self.original_runners = dict(analyzers.RUNNERS)
+        analyzers.register_runner("pylint", _ScriptRunner)
+
+    def tearDown(self):
+        analyzers.RUNNERS.clear()
+        analyzers.RUNNERS.update(self.original_runners)
+        self.temp_dir.cleanup()
+
+    def _analyze(self, **kwargs):
+        file_list, languages = self.skill._identify_target_files(self.project, [])
+        standards = self.skill._confirm_analysis_standards(languages, {})
+        spool_dir = os.path.join(self.temp_dir.name, "spool")
+        os.makedirs(spool_dir, exist_ok=True)
+        return asyncio.run(self.skill._perform_analysis(file_list, standards, spool_dir, **kwargs))
+
+    def _calls(self):
+        if not os.path.exists(_ScriptRunner.log_path):
+            return []
+        with open(_ScriptRunner.log_path) as f:
+            return [int(line) for line in f]
+
+    def test_batches_and_normalizes_issues(self):
+        self.skill.analyzer_config["batch_size"] = 2
+        result = self._analyze()
+        self.assertEqual(self._calls(), [2, 2, 1])
+        issues = list(result["issues_found"])
+        self.assertEqual(sorted(issue["file"] for issue in issues), result["files_analyzed"])
+        self.assertEqual({(issue["severity"], issue["type"], issue["line"]) for issue in issues},
+                         {("high", "stand-in:stand-in", 3)})
+
+    def test_missing_tool_and_timeout_fall_back_to_builtin(self):
+        _ScriptRunner.executable = "cdanalyzer-missing-tool"
+        try:
+            result = self._analyze()
+        finally:
+            _ScriptRunner.executable = sys.executable
+        self.assertEqual(self._calls(), [])
+        self.assertEqual({issue["type"] for issue in result["issues_found"]}, {"unused-import"})
+
+        _ScriptRunner.delay = 5
+        self.skill.analyzer_config["timeouts"] = {"stand-in": 0.5}
+        with self.assertRaises(AnalyzerError):
+            analyzers.get_runner("pylint", self.skill.analyzer_config).analyze([os.path.join(self.project, "m0.py")])
+        self.assertGreater(len(self._analyze()["issues_found"]), 0)
+
+    def test_runtime_failure_is_not_cached_as_tool_result(self):
+        cache_dir = os.path.join(self.temp_dir.name, "reports")
+        _ScriptRunner.delay = 5
+        self.skill.analyzer_config["timeouts"] = {"stand-in": 0.5}
+        result = self._analyze(cache_dir=cache_dir)
+        self.assertEqual({issue["type"] for issue in result["issues_found"]}, {"unused-import"})
+        self.assertEqual(result["cache_stats"], {"hits": 0, "misses": 5})
+
+        # 内置分析器的结果以内置引擎的标识写入缓存，工具恢复后重新调用工具分析
+        _ScriptRunner.delay = 0.0
+        result = self._analyze(cache_dir=cache_dir)
+        self.assertEqual(result["cache_stats"], {"hits": 0, "misses": 5})
+        self.assertEqual({issue["type"] for issue in result["issues_found"]}, {"stand-in:stand-in"})
+        self.assertEqual(self._analyze(cache_dir=cache_dir)["cache_stats"], {"hits": 5, "misses": 0})
+
+    def test_tool_output_parsers(self):
+        pylint_output = json.dumps([{"type": "convention", "line": 1, "path": "a.py", "symbol": "missing-docstring",
+                                     "message-id": "C0114", "message": "Missing module docstring"}])
+        (path, issue), = PylintRunner().parse(pylint_output, "")
+        self.assertEqual((path, issue["severity"], issue["type"]), ("a.py", "low", "pylint:missing-docstring"))
+
+        (path, issue), = CppcheckRunner().parse("", "a.c:::7:::error:::nullPointer:::Null pointer dereference\n"
+                                                    "Checking a.c ...\n")
+        self.assertEqual((path, issue["line"], issue["severity"]), ("a.c", 7, "high"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import textwrap
+
+from skill import CdanalyzerAgentSkill
+from src.clone_detector import (WINDOW, CloneDetector, fingerprint_source, normalize_tokens, pack_fingerprints,
+                                tokenize_lines, unpack_fingerprints)
+
+_FUNCTION = textwrap.dedent('''
+    def merge_reports(reports, options):
+        merged = {}
+        for report in reports:
+            for key, value in report.items():
+                if key in merged and options.get("strict"):
+                    raise ValueError("duplicate key: " + key)
+                merged.setdefault(key, []).append(value)
+        totals = {key: len(values) for key, values in merged.items()}
+        ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return [name for name, count in ordered if count > options.get("min", 1)]
+''')
+
+# 同一段代码：注释、空白和字面量不同
+_COPY = textwrap.dedent('''
+    # 从其他模块复制而来
+    def merge_reports(reports, options):
+        merged = {}
+
+        for report in reports:
+            for key, value in report.items():   # 遍历
+                if key in merged and options.get('STRICT'):
+                    raise ValueError('重复: ' + key)
+                merged.setdefault(key, []).append(value)
+        totals = {key: len(values) for key, values in merged.items()}
+        ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return [name for name, count in ordered if count > options.get("min", 2)]
+''')
+
+
+def _unique(seed):
+    return "".join(f"value_{seed}_{i} = compute_{seed}(argument_{i}, {i})\n" for i in range(20))
+
+
+class CloneDetectorTest(unittest.TestCase):
+    def _detect(self, sources, min_lines=5):
+        detector = CloneDetector(min_lines)
+        for name, source in sources:
+            detector.add(name, "python", fingerprint_source(source.encode("utf-8"), "python"))
+        return detector.detect()
+
+    def test_normalized_copy_is_reported(self):
+        result = self._detect([("a.py", _unique("a") + _FUNCTION), ("b.py", _COPY + _unique("b"))])
+        self.assertEqual(len(result["issues"]), 1)
+        issue = result["issues"][0]
+        self.assertEqual((issue["file"], issue["type"], issue["severity"]), ("b.py", "duplicate-code", "medium"))
+        self.assertIn("a.py", issue["message"])
+        self.assertGreaterEqual(issue["line"], 3)
+        stats = result["languages"]["python"]
+        self.assertEqual(stats["lines"], 40 + 2 * 10)
+        self.assertTrue(15 <= stats["duplicated_lines"] <= 20, stats)
+        self.assertEqual(stats["duplication"], round(stats["duplicated_lines"] / stats["lines"] * 100, 2))
+
+    def test_renamed_identifiers_are_not_clones(self):
+        renamed = _FUNCTION.replace("merged", "combined").replace("totals", "counts").replace("key", "name")
+        result = self._detect([("a.py", _FUNCTION), ("b.py", renamed), ("c.py", _unique("c"))])
+        self.assertEqual(result["issues"], [])
+        self.assertEqual(result["duplication"], 0.0)
+
+    def test_min_lines_threshold(self):
+        result = self._detect([("a.py", _FUNCTION), ("b.py", _FUNCTION)], min_lines=30)
+        self.assertEqual(result["issues"], [])
+        self.assertEqual(result["duplicated_lines"], 20)
+
+    def test_fingerprints_are_compact_arrays(self):
+        source = (_FUNCTION * 20).encode("utf-8")
+        fingerprints = fingerprint_source(source, "python")
+        self.assertEqual(fingerprints.hashes.typecode, "Q")
+        self.assertEqual(len(fingerprints.hashes), len(fingerprints.starts))
+        # winnowing选取的指纹数约为词法单元数的2/(WINDOW+1)
+        tokens, _ = normalize_tokens(source, "python")
+        self.assertLess(len(fingerprints.hashes), len(tokens) * 3 / (WINDOW + 1))
+        # 文件内部的重复也会被发现
+        result = self._detect([("a.py", _FUNCTION * 20)], min_lines=5)
+        self.assertEqual(result["languages"]["python"]["duplication"], 100.0)
+
+    def test_shared_tokenization(self):
+        # 代码度量的词法切分结果可直接用于指纹，数字字面量规范化为占位符
+        source = (_FUNCTION * 3).encode("utf-8")
+        tokenized = tokenize_lines(source, "python")
+        self.assertEqual(fingerprint_source(source, "python", tokenized), fingerprint_source(source, "python"))
+        tokens, _ = normalize_tokens(b"x = 42 + y1 >= 0x1F\n", "python")
+        self.assertEqual(tokens, [b"x", b"=", b"0", b"+", b"y1", b">=", b"0"])
+
+    def test_packed_fingerprints_round_trip(self):
+        fingerprints = fingerprint_source((_FUNCTION * 3).encode("utf-8"), "python")
+        self.assertEqual(unpack_fingerprints(pack_fingerprints(fingerprints)), fingerprints)
+        self.assertEqual(pack_fingerprints(None), b"")
+        self.assertIsNone(unpack_fingerprints(b""))
+
+    def test_pipeline_reports_duplication(self):
+        skill = CdanalyzerAgentSkill()
+        skill.use_llm_config = 1
+        skill.clone_config["min_lines"] = 5
+        with tempfile.TemporaryDirectory() as project, tempfile.TemporaryDirectory() as spool_dir:
+            for name, source in (("a.py", _FUNCTION), ("b.py", _COPY), ("c.py", _unique("c"))):
+                with open(os.path.join(project, name), "w", encoding="utf-8") as f:
+                    f.write(source)
+            file_list, languages = skill._identify_target_files(project, [])
+            standards = skill._confirm_analysis_standards(languages, {})
+            result = asyncio.run(skill._perform_analysis(file_list, standards, spool_dir))
+            clones = [issue for issue in result["issues_found"] if issue["type"] == "duplicate-code"]
+
+        self.assertEqual([os.path.basename(issue["file"]) for issue in clones], ["b.py"])
+        self.assertEqual(result["clone_stats"]["files"], 3)
+        self.assertEqual(result["language_stats"]["python"]["duplicated_lines"], 20)
+        self.assertEqual(result["language_stats"]["python"]["duplication"], 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import textwrap
+
+from src.code_metrics import MetricsAggregator, compute_metrics, maintainability_index, maintainability_rating
+
+_JAVASCRIPT = textwrap.dedent('''
+    // if while for 注释中的关键字不计入
+    function merge(a, b) {
+      if (a && b) {
+        for (let i = 0; i < 3; i++) {
+          if (i) { return "if (x) {"; }
+        }
+      }
+      return a ? b : 0;
+    }
+    const twice = (x) => {
+      return x || 1;
+    };
+    class Queue {
+      drain(items) {
+        while (items.length) { items.pop(); }
+      }
+    }
+    items.forEach(function (x) { console.log(x); });
+''')
+
+_PYTHON = textwrap.dedent('''
+    import os
+
+
+    def outer(a,
+              b):
+        """
+        if while for
+        """
+        if a and b:
+            for x in a:
+                if x:
+                    pass
+
+        def inner():
+            return 1 if a else 2
+        return [y for y in b if y]
+
+
+    class Worker:
+        async def run(self):
+            while True:
+                break
+
+
+    FLAG = 1 if os.name else 2
+''')
+
+
+def _functions(metrics):
+    return sorted((name, line, length, complexity, nesting) for name, line, length, complexity, nesting
+                  in metrics["hotspots"])
+
+
+class CodeMetricsTest(unittest.TestCase):
+    def test_brace_language_functions(self):
+        metrics = compute_metrics(_JAVASCRIPT.encode("utf-8"), "javascript")
+        self.assertEqual(metrics["functions"], 4)
+        # 注释和字符串中的关键字、花括号不影响结果
+        self.assertEqual(_functions(metrics), [
+            ("<anonymous>", 11, 3, 2, 0),
+            ("drain", 15, 3, 2, 1),
+            ("merge", 3, 8, 6, 3),
+        ])
+        self.assertEqual(metrics["complexity"], 6 + 2 + 2 + 1)
+        self.assertEqual((metrics["max_nesting"], metrics["max_function_lines"]), (3, 8))
+
+    def test_indent_language_functions(self):
+        metrics = compute_metrics(_PYTHON.encode("utf-8"), "python")
+        self.assertEqual(metrics["functions"], 3)
+        # 跨行的参数列表和文档字符串不会提前结束函数体，函数外的条件表达式计入文件复杂度
+        self.assertEqual(_functions(metrics), [
+            ("inner", 15, 2, 2, 0),
+            ("outer", 5, 13, 7, 3),
+            ("run", 21, 3, 2, 1),
+        ])
+        self.assertEqual(metrics["complexity"], 7 + 2 + 2 + 1)
+
+    def test_python_soft_keywords_and_continued_strings(self):
+        source = textwrap.dedent('''
+            def dispatch(case, command):
+                for case in command.cases:
+                    check(case=case)
+                match command:
+                    case "go":
+                        return r'"""\\
+            (if'
+                    case _:
+                        return 0
+
+
+            def after():
+                return 1
+        ''')
+        metrics = compute_metrics(source.encode("utf-8"), "python")
+        # 用作标识符的case不计入；反斜杠续行的字符串中的三引号和括号不会吞掉后面的函数
+        self.assertEqual(_functions(metrics), [
+            ("after", 13, 2, 1, 0),
+            ("dispatch", 2, 9, 4, 2),
+        ])
+
+    def test_maintainability_index(self):
+        self.assertEqual(maintainability_index(0, 1, 0, 0), 100.0)
+        simple = maintainability_index(100, 1, 10, 0)
+        complex_ = maintainability_index(50000, 120, 2000, 0)
+        self.assertGreater(simple, complex_)
+        # 注释使指数升高
+        self.assertGreater(maintainability_index(50000, 120, 2000, 500), complex_)
+        self.assertEqual([maintainability_rating(value) for value in (85, 20, 19.9, 9.9)], ["A", "A", "B", "C"])
+
+    def test_aggregate_hotspots(self):
+        aggregator = MetricsAggregator(top_functions=2)
+        aggregator.add("a.js", "javascript", compute_metrics(_JAVASCRIPT.encode("utf-8"), "javascript"), 17)
+        aggregator.add("b.py", "python", compute_metrics(_PYTHON.encode("utf-8"), "python"), 15)
+        summary = aggregator.result()
+        self.assertEqual((summary["files"], summary["functions"]), (2, 7))
+        self.assertEqual([(item["file"], item["function"]) for item in summary["hotspots"]],
+                         [("b.py", "outer"), ("a.js", "merge")])
+        self.assertEqual(sorted(summary["languages"]), ["javascript", "python"])
+        self.assertEqual(summary["avg_complexity"], round((6 + 2 + 2 + 1 + 7 + 2 + 2) / 7, 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import asyncio
+
+from skill import CdanalyzerAgentSkill
+from src.cost_model import assess_maintenance, complexity_rating, estimate_cost
+
+
+def _metrics(avg_complexity=3.0, ratio=0.05, rating="A", functions=100):
+    return {
+        "files": 10, "functions": functions, "avg_complexity": avg_complexity, "complex_functions": int(functions * ratio),
+        "complex_function_ratio": ratio, "avg_function_lines": 20.0, "max_nesting": 3,
+        "maintainability_index": 45.0 if rating == "A" else 5.0, "rating": rating,
+        "hotspots": [{"file": "/src/app.py", "function": "dispatch", "line": 42, "complexity": 31, "nesting": 4, "lines": 120}],
+    }
+
+
+class CostModelTest(unittest.TestCase):
+    def test_cocomo_estimate(self):
+        estimate = estimate_cost({"java": {"code": 10000}}, _metrics())
+        # organic模式：2.4 * 10^1.05 人月，每人月19个工作日
+        self.assertEqual((estimate["kloc"], estimate["complexity"], estimate["eaf"]), (10.0, "标称", 1.0))
+        self.assertAlmostEqual(estimate["person_months"], round(2.4 * 10 ** 1.05, 2))
+        self.assertAlmostEqual(estimate["person_days"], round(2.4 * 10 ** 1.05 * 19, 2))
+
+        # 语言系数、复杂度和模式都会改变估算结果，结果确定
+        python = estimate_cost({"python": {"code": 10000}}, _metrics())
+        complex_ = estimate_cost({"java": {"code": 10000}}, _metrics(avg_complexity=8))
+        embedded = estimate_cost({"java": {"code": 10000}}, _metrics(), mode="embedded")
+        self.assertLess(python["person_days"], estimate["person_days"])
+        self.assertEqual(complex_["complexity"], "很高")
+        self.assertGreater(complex_["person_days"], estimate["person_days"])
+        self.assertGreater(embedded["person_days"], complex_["person_days"])
+        self.assertEqual(estimate_cost({"java": {"code": 10000}}, _metrics()), estimate)
+
+        mixed = estimate_cost({"java": {"code": 6000}, "shell": {"code": 500}}, None)
+        self.assertAlmostEqual(sum(mixed["languages"].values()), mixed["person_days"], delta=0.02)
+        self.assertEqual(estimate_cost({}, None)["person_days"], 0.0)
+        with self.assertRaises(ValueError):
+            estimate_cost({"java": {"code": 1}}, None, mode="agile")
+
+    def test_complexity_rating(self):
+        self.assertEqual(complexity_rating(None), "标称")
+        self.assertEqual(complexity_rating(_metrics(avg_complexity=1.5, ratio=0.0)), "低")
+        self.assertEqual(complexity_rating(_metrics(ratio=0.15)), "高")
+        self.assertEqual(complexity_rating(_metrics(rating="C")), "极高")
+
+    def test_maintenance_rules(self):
+        healthy = assess_maintenance(_metrics(), {"critical": 1, "high": 2}, 5.0)
+        self.assertEqual(healthy["worth_maintaining"], "是")
+        self.assertIn("dispatch（app.py 第42行", healthy["reasoning"])
+        duplicated = assess_maintenance(_metrics(), {}, 45.0)
+        self.assertEqual(duplicated["worth_maintaining"], "否")
+        self.assertIn("重复代码过多", duplicated["reasoning"])
+        self.assertEqual(assess_maintenance(None, {})["worth_maintaining"], "否")
+
+    def test_llm_refinement_is_one_structured_call(self):
+        skill = CdanalyzerAgentSkill()
+        skill.use_llm_config = 0
+        skill.llm_configs = {"ollama": {}}
+        analysis_results = {"files_analyzed": ["a.java"], "language_stats": {"java": {"code": 10000}},
+                            "risk_counts": {"critical": 0, "high": 0, "medium": 0, "low": 0}, "metrics": _metrics()}
+        cost_model = skill._estimate_development_cost(analysis_results)
+        local = skill._get_maintenance_recommendation(analysis_results)
+        prompts = []
+
+        def refine(response):
+            async def call(provider, prompt):
+                prompts.append(prompt)
+                return response
+            skill._call_llm_api = call
+            return asyncio.run(skill._refine_assessment(analysis_results, cost_model, local))
+
+        cost, recommendation = refine('结果如下：{"cost_estimate": 321.5, "worth_maintaining": "否", "reasoning": "历史包袱较重"}')
+        self.assertEqual(len(prompts), 1)
+        self.assertIn(str(cost_model["person_days"]), prompts[0])
+        self.assertEqual((cost, recommendation), (321.5, {"worth_maintaining": "否", "reasoning": "历史包袱较重"}))
+
+        # 无法解析或字段不合法时保留本地结果
+        self.assertEqual(refine("无法估算"), (cost_model["person_days"], local))
+        self.assertEqual(refine('{"cost_estimate": -1, "worth_maintaining": "可能"}'), (cost_model["person_days"], local))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import tempfile
+
+from src.file_walker import ParallelWalker
+from src.path_matcher import ExcludeMatcher
+
+
+class ParallelWalkerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = self.temp_dir.name
+        for d in range(4):
+            for s in range(3):
+                sub = os.path.join(self.project, f"pkg{d}", f"sub{s}")
+                os.makedirs(sub)
+                for f in range(5):
+                    for name in (f"m{f}.py", f"s{f}.JS", f"n{f}.txt"):
+                        with open(os.path.join(sub, name), "w", encoding="utf-8") as fh:
+                            fh.write("x\n")
+        os.makedirs(os.path.join(self.project, "node_modules", "lib"))
+        with open(os.path.join(self.project, "node_modules", "lib", "a.js"), "w", encoding="utf-8") as fh:
+            fh.write("x\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _reference(self, excluded_dirs):
+        expected = set()
+        for root, dirs, files in os.walk(self.project):
+            dirs[:] = [d for d in dirs if d not in excluded_dirs]
+            for name in files:
+                if os.path.splitext(name)[1].lower() in (".py", ".js"):
+                    expected.add(os.path.join(root, name))
+        return expected
+
+    def test_matches_os_walk(self):
+        for workers in (1, 4):
+            walker = ParallelWalker(self.project, ExcludeMatcher(["node_modules"]), workers=workers)
+            found = list(walker)
+            self.assertEqual({path for path, _ in found}, self._reference({"node_modules"}))
+            self.assertEqual(len(found), len(set(found)))
+            # 产出顺序与按完整路径排序一致，不受各目录完成顺序影响
+            self.assertEqual([path for path, _ in found], sorted(path for path, _ in found))
+            self.assertEqual({lang for _, lang in found}, {"python", "javascript"})
+
+            stats = walker.stats()
+            self.assertEqual(stats["files"], 120)
+            self.assertEqual(stats["dirs"], 17)
+            self.assertGreater(stats["files_per_sec"], 0)
+
+    def test_order_interleaves_files_and_directories(self):
+        for rel in ["a/b.py", "a.py", "a.b.py", "ab.py", "a/c/d.py", "a/e.py"]:
+            path = os.path.join(self.project, "order", *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("x\n")
+        root = os.path.join(self.project, "order")
+        found = [path for path, _ in ParallelWalker(root, ExcludeMatcher(), workers=4)]
+        self.assertEqual(found, sorted(found))
+        self.assertEqual(len(found), 6)
+
+    def test_single_file(self):
+        path = os.path.join(self.project, "pkg0", "sub0", "m0.py")
+        self.assertEqual(list(ParallelWalker(path, ExcludeMatcher())), [(path, "python")])
+        path = os.path.join(self.project, "pkg0", "sub0", "n0.txt")
+        self.assertEqual(list(ParallelWalker(path, ExcludeMatcher())), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
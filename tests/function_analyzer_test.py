@@ -0,0 +1,50 @@
+import unittest
+import textwrap
+
+from src.code_metrics import compute_metrics
+from src.function_analyzer import analyze_functions
+
+_SOURCE = textwrap.dedent('''
+    function small(a) {
+        return a + 1;
+    }
+
+    function branchy(items) {
+        for (const item of items) {
+            if (item.a && item.b) {
+                while (item.next) {
+                    if (item.c || item.d) {
+                        if (item.e) {
+                            item = item.next;
+                        }
+                    }
+                }
+            }
+        }
+        return items;
+    }
+''')
+
+
+class FunctionAnalyzerTest(unittest.TestCase):
+    def _findings(self, source, **kwargs):
+        functions = []
+        compute_metrics(source.encode("utf-8"), "javascript", functions_out=functions)
+        issues = analyze_functions("sample.js", functions, **kwargs)
+        return [(issue["type"], issue["line"], issue["severity"]) for issue in issues]
+
+    def test_function_rules(self):
+        # branchy: 1 + for + 3个if + while + && + || = 8，嵌套深度5
+        self.assertEqual(self._findings(_SOURCE, max_complexity=10), [("deep-nesting", 6, "medium")])
+        self.assertEqual(self._findings(_SOURCE, max_complexity=7, max_nesting=5), [("too-complex", 6, "medium")])
+        self.assertEqual(self._findings(_SOURCE, max_complexity=3, max_nesting=5), [("too-complex", 6, "high")])
+
+    def test_long_function(self):
+        source = "function long() {\n" + "    call();\n" * 70 + "}\n"
+        self.assertEqual(self._findings(source, max_complexity=10), [("long-function", 1, "low")])
+        # 结果只取决于文件内容，多次分析完全一致
+        self.assertEqual(self._findings(source, max_complexity=10), self._findings(source, max_complexity=10))
+
+
+if __name__ == '__main__':
+    unittest.main()
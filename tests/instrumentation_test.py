@@ -0,0 +1,80 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+
+from skill import CdanalyzerAgentSkill
+from src.instrumentation import NULL_INSTRUMENTATION, Histogram, Instrumentation
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_spans_counters_and_trace(self):
+        instrumentation = Instrumentation()
+        with instrumentation.span("analysis", files=2):
+            with instrumentation.span("clones"):
+                pass
+        start = instrumentation.origin + 1.0
+        instrumentation.add_span("report:pdf", start, 0.5, track="report:pdf")
+        instrumentation.add_span("report:pdf", start, 0.25)
+        instrumentation.count("files", 2)
+        instrumentation.count("files")
+        instrumentation.gauge("files_per_sec", 12.345)
+        for value in (10, 50, 51, 40000):
+            instrumentation.observe("llm_latency_ms", value)
+
+        result = instrumentation.result()
+        self.assertEqual(sorted(result["stages"]), ["analysis", "clones", "report:pdf"])
+        self.assertEqual(result["stages"]["report:pdf"], 0.75)
+        self.assertEqual((result["counters"], result["gauges"]), ({"files": 3}, {"files_per_sec": 12.35}))
+        histogram = result["histograms"]["llm_latency_ms"]
+        self.assertEqual((histogram["count"], histogram["max"]), (4, 40000))
+        self.assertEqual((histogram["buckets"]["<=50"], histogram["buckets"]["<=100"], histogram["buckets"][">30000"]),
+                         (2, 1, 1))
+
+        events = instrumentation.chrome_trace()["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        self.assertEqual([event["name"] for event in spans], ["clones", "analysis", "report:pdf", "report:pdf"])
+        self.assertEqual(spans[1]["args"], {"files": 2})
+        # 并发的阶段位于不同轨道，时间戳相对于创建时刻（微秒）
+        self.assertNotEqual(spans[2]["tid"], spans[3]["tid"])
+        self.assertEqual((spans[2]["ts"], spans[2]["dur"]), (1000000, 500000))
+
+    def test_null_instrumentation(self):
+        self.assertFalse(NULL_INSTRUMENTATION.enabled)
+        with NULL_INSTRUMENTATION.span("analysis"):
+            NULL_INSTRUMENTATION.count("files")
+            NULL_INSTRUMENTATION.observe("llm_latency_ms", 1)
+        self.assertIs(NULL_INSTRUMENTATION.span("a"), NULL_INSTRUMENTATION.span("b"))
+        self.assertEqual(Histogram().result()["avg"], 0.0)
+
+    def test_execute_metrics_block(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project = os.path.join(temp_dir, "project")
+            os.makedirs(project)
+            for i in range(5):
+                with open(os.path.join(project, f"module_{i}.py"), "w", encoding="utf-8") as f:
+                    f.write("import os\n" * (i + 1))
+            inputs = {"target_path": project, "report_format": ["txt"], "use_llm_config": 1, "use_analysis_cache": False,
+                      "report_path": os.path.join(temp_dir, "reports")}
+
+            plain = asyncio.run(CdanalyzerAgentSkill().execute(dict(inputs)))
+            trace_path = os.path.join(temp_dir, "trace", "run.json")
+            traced = asyncio.run(CdanalyzerAgentSkill().execute({**inputs, "trace_path": trace_path}))
+            with open(trace_path, encoding="utf-8") as f:
+                trace = json.load(f)
+
+        self.assertNotIn("metrics", plain)
+        metrics = traced["metrics"]
+        self.assertEqual(traced["trace_path"], trace_path)
+        for stage in ("discovery", "analysis", "clones", "assessment", "reports", "report:txt"):
+            self.assertIn(stage, metrics["stages"])
+        self.assertEqual((metrics["counters"]["files"], metrics["counters"]["issues"]), (5, sum(plain["summary"]["risk_counts"].values())))
+        self.assertEqual(metrics["counters"]["bytes"], sum(10 * (i + 1) for i in range(5)))
+        self.assertIn("counting_seconds", metrics["counters"])
+        self.assertGreater(metrics["gauges"]["files_per_sec"], 0)
+        self.assertIn("analysis", {event["name"] for event in trace["traceEvents"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from skill import CdanalyzerAgentSkill
+from src.jobs import JobManager
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.temp_dir.name, "project")
+        os.makedirs(self.project)
+        for i in range(10):
+            with open(os.path.join(self.project, f"module_{i}.py"), "w", encoding="utf-8") as f:
+                f.write(f"import os\ndef f{i}(x):\n    return eval(x)\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _inputs(self, **kwargs):
+        return {"target_path": self.project, "report_format": [], "use_external_analyzers": False,
+                "report_path": os.path.join(self.temp_dir.name, "reports"), "parallel_chunk_size": 3, **kwargs}
+
+    def test_progress_events(self):
+        async def run():
+            manager = JobManager()
+            job_id = manager.submit(self._inputs(use_llm_config=1))
+            events = [event async for event in manager.events(job_id, interval=0)]
+            return events, manager.status(job_id)
+
+        events, status = asyncio.run(run())
+        self.assertEqual(events[0]["state"], "queued")
+        self.assertEqual(events[-1]["state"], "succeeded")
+        analyzed = [event["files_analyzed"] for event in events if "files_analyzed" in event]
+        self.assertEqual(analyzed, sorted(analyzed))
+        self.assertEqual((events[-1]["stage"], events[-1]["files_total"], events[-1]["files_analyzed"]), ("done", 10, 10))
+        self.assertGreaterEqual(events[-1]["issues_found"], 10)
+        self.assertEqual(status["result"]["summary"]["total_files"], 10)
+
+    def test_cancel_stops_llm_requests(self):
+        started, cancelled = [], []
+
+        async def hang(request):
+            started.append(request.url.path)
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.append(request.url.path)
+                raise
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(hang))
+
+            async def runner(inputs, listener):
+                skill = CdanalyzerAgentSkill()
+                skill.shared_http_client = client
+                skill.progress_listener = listener
+                return await skill.execute(inputs)
+
+            manager = JobManager(runner)
+            job_id = manager.submit(self._inputs(
+                use_llm_config=0, llm_provider="ollama", llm_base_url="http://llm.test", llm_model="test",
+                use_suggestion_cache=False, llm_max_retries=0
+            ))
+            async for event in manager.events(job_id, interval=0):
+                if event.get("llm_pending"):
+                    break
+            cancelled_ok = await asyncio.wait_for(manager.cancel(job_id), timeout=5)
+            await client.aclose()
+            return cancelled_ok, manager.status(job_id), await manager.cancel(job_id)
+
+        cancelled_ok, status, again = asyncio.run(run())
+        self.assertTrue(cancelled_ok)
+        self.assertFalse(again)
+        self.assertEqual((status["state"], status["stage"]), ("cancelled", "suggestions"))
+        self.assertNotIn("result", status)
+        self.assertTrue(started)
+        self.assertEqual(sorted(cancelled), sorted(started))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import os
+import tempfile
+
+from src.languages import SUPPORTED_LANGUAGES, detect_language, file_extension, language_for_name
+from src.line_counter import COMMENT_SYNTAX, count_file_lines
+
+
+class LanguageRegistryTest(unittest.TestCase):
+    def test_names_and_extensions(self):
+        cases = {
+            "main.py": "python", "App.TSX": "typescript", "view.jsx": "javascript", "util.h": "cpp",
+            "impl.hpp": "cpp", "x.cc": "cpp", "Main.kt": "kotlin", "lib.rs": "rust", "View.swift": "swift",
+            "Makefile": "makefile", "Dockerfile": "dockerfile", "Dockerfile.dev": "dockerfile",
+            "CMakeLists.txt": "cmake", "Gemfile": "ruby", "notes.txt": None, "README": None,
+        }
+        for name, expected in cases.items():
+            self.assertEqual(language_for_name(name), expected, msg=name)
+        self.assertEqual(file_extension("A.Tar.GZ"), ".gz")
+        self.assertEqual(file_extension(".bashrc"), "")
+        self.assertEqual(file_extension("name."), "")
+
+    def test_shebang_detection(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scripts = {
+                "run": b"#!/usr/bin/env python3\nprint(1)\n",
+                "deploy": b"#!/bin/bash -e\necho hi\n",
+                "serve": b"#!/usr/bin/env -S node --harmony\n",
+                "tool.txt": b"#!/usr/bin/python\n",
+                "data": b"plain text\n",
+            }
+            for name, content in scripts.items():
+                with open(os.path.join(temp_dir, name), "wb") as f:
+                    f.write(content)
+            detected = {name: detect_language(name, os.path.join(temp_dir, name)) for name in scripts}
+            # 有扩展名的文件不读取shebang
+            self.assertEqual(detected, {"run": "python", "deploy": "shell", "serve": "javascript",
+                                        "tool.txt": None, "data": None})
+
+    def test_every_language_has_comment_syntax(self):
+        self.assertEqual(set(SUPPORTED_LANGUAGES) - set(COMMENT_SYNTAX), set())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a.lua")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("--[[\nblock\n]]\n-- line\nprint(1)\n")
+            self.assertEqual(count_file_lines(path, "lua"), {"lines": 5, "blank": 0, "comment": 4, "code": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import tempfile
+
+from src.line_counter import MAX_LINE_BYTES, count_file_lines, read_source
+
+
+class LineCounterTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content: bytes):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_line_count_matches_readlines(self):
+        samples = [b"", b"a", b"a\n", b"a\nb", b"\n\n", "中文\n行".encode("utf-8")]
+        for i, content in enumerate(samples):
+            path = self._write(f"sample_{i}.txt", content)
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                expected = len(f.readlines())
+            for chunk_size in (1, 2, 1024):
+                self.assertEqual(count_file_lines(path, chunk_size=chunk_size)["lines"], expected)
+
+    def test_classifies_python_lines(self):
+        path = self._write("sample.py", b'"""\nmodule doc\n"""\nimport os\n\n# comment\nx = 1  # trailing\n')
+        stats = count_file_lines(path, "python", chunk_size=4)
+        self.assertEqual(stats, {"lines": 7, "blank": 1, "comment": 4, "code": 2})
+
+    def test_classifies_c_like_block_comments(self):
+        path = self._write("sample.js", b"/* a\n b */\nvar a = 1; /* start\n end */\n// c\n\nvar b;")
+        stats = count_file_lines(path, "javascript")
+        self.assertEqual(stats, {"lines": 7, "blank": 1, "comment": 4, "code": 2})
+
+    def test_long_lines_are_bounded(self):
+        # 没有换行的超长行：行首是代码，行尾是注释起始，分类只看行首和行尾
+        path = self._write("long.js", b"var a = '" + b"x" * (MAX_LINE_BYTES * 8) + b"'; /* start\nend */\n")
+        for chunk_size in (1000, 1 << 20):
+            stats = count_file_lines(path, "javascript", chunk_size=chunk_size)
+            self.assertEqual(stats, {"lines": 2, "blank": 0, "comment": 1, "code": 1})
+
+    def test_read_source_keeps_bounded_content(self):
+        content = b"import os\n\nx = 1\n"
+        path = self._write("sample.py", content)
+        stats, data = read_source(path, "python", chunk_size=4)
+        self.assertEqual(stats, count_file_lines(path, "python"))
+        self.assertEqual(data, content)
+        self.assertIsNone(read_source(path, "python", chunk_size=4, max_content=8)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
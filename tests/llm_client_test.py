@@ -0,0 +1,143 @@
+import unittest
+import asyncio
+import tempfile
+
+from benchmark import StandInLLMServer
+from skill import CdanalyzerAgentSkill
+
+
+class LLMClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInLLMServer().__enter__()
+        self.skill = CdanalyzerAgentSkill()
+        self.skill.llm_configs["openai"] = {
+            "api_key": "test", "base_url": self.server.base_url, "model": "stand-in", "top_p": 0.7
+        }
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_pooled_client_reuses_connections(self):
+        async def run():
+            results = []
+            for i in range(5):
+                results.append(await self.skill._call_llm_api("openai", f"prompt {i}"))
+            client = self.skill._http_client
+            await self.skill.close_http_client()
+            return results, client
+
+        results, client = asyncio.run(run())
+        self.assertEqual(results, ["模拟的AI建议"] * 5)
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(self.skill._http_client)
+
+        metrics = self.skill.get_llm_http_metrics()
+        self.assertEqual(metrics["requests"], 5)
+        self.assertEqual(metrics["new_connections"], 1)
+        self.assertEqual(metrics["connection_reuse_rate"], 0.8)
+
+
+class LLMSchedulerTest(unittest.TestCase):
+    def _skill_for(self, server):
+        skill = CdanalyzerAgentSkill()
+        skill.llm_configs["openai"] = {
+            "api_key": "test", "base_url": server.base_url, "model": "stand-in", "top_p": 0.7
+        }
+        return skill
+
+    def _suggest(self, skill, count):
+        issues = [{"type": "t", "severity": "low", "message": f"m{i}", "solution": "s"} for i in range(count)]
+
+        async def run():
+            try:
+                return await skill._get_ai_suggestions(issues)
+            finally:
+                await skill.close_http_client()
+        return asyncio.run(run())
+
+    def test_concurrency_is_bounded(self):
+        with StandInLLMServer(latency=0.02) as server:
+            skill = self._skill_for(server)
+            skill.llm_scheduler_config["max_in_flight"] = 3
+            suggestions = self._suggest(skill, 20)
+            self.assertEqual(suggestions, ["模拟的AI建议"] * 20)
+            self.assertLessEqual(server.server.max_active, 3)
+
+    def test_rate_limited_requests_are_retried(self):
+        with StandInLLMServer(fail_first=4) as server:
+            skill = self._skill_for(server)
+            skill.llm_scheduler_config["backoff_base"] = 0.01
+            suggestions = self._suggest(skill, 6)
+            self.assertEqual(suggestions, ["模拟的AI建议"] * 6)
+            stats = skill.get_llm_http_metrics()["scheduler"]
+            self.assertEqual(stats["rate_limited"], 4)
+            self.assertEqual(stats["succeeded"], 6)
+            self.assertEqual(stats["failed"], 0)
+
+
+class SuggestionDedupTest(unittest.TestCase):
+    def test_duplicate_prompts_hit_network_once(self):
+        issues = [{"type": "t", "severity": "low", "message": f"m{i % 2}", "solution": "s"} for i in range(10)]
+        with tempfile.TemporaryDirectory() as cache_dir, StandInLLMServer() as server:
+            def run_once():
+                skill = CdanalyzerAgentSkill()
+                skill.llm_configs["openai"] = {
+                    "api_key": "test", "base_url": server.base_url, "model": "stand-in", "top_p": 0.7
+                }
+                skill.suggestion_cache_config["cache_dir"] = cache_dir
+
+                async def run():
+                    try:
+                        return await skill._get_ai_suggestions(issues)
+                    finally:
+                        await skill.close_http_client()
+                return asyncio.run(run()), skill.get_llm_http_metrics()["suggestions"]
+
+            suggestions, stats = run_once()
+            self.assertEqual(suggestions, ["模拟的AI建议"] * 10)
+            self.assertEqual(server.server.received, 2)
+            self.assertEqual(stats["unique_prompts"], 2)
+            self.assertEqual(stats["cache_hits"], 0)
+
+            # 第二次运行全部命中持久化缓存
+            suggestions, stats = run_once()
+            self.assertEqual(suggestions, ["模拟的AI建议"] * 10)
+            self.assertEqual(server.server.received, 2)
+            self.assertEqual(stats["cache_hits"], 2)
+
+
+class BatchedSuggestionTest(unittest.TestCase):
+    def _suggest(self, server, count):
+        skill = CdanalyzerAgentSkill()
+        skill.llm_configs["openai"] = {
+            "api_key": "test", "base_url": server.base_url, "model": "stand-in", "top_p": 0.7
+        }
+        skill.suggestion_cache_config["enabled"] = False
+        skill.llm_batch_tokens = 2000
+        issues = [{"type": "t", "severity": "low", "message": f"m{i}", "solution": "s"} for i in range(count)]
+
+        async def run():
+            try:
+                return await skill._get_ai_suggestions(issues)
+            finally:
+                await skill.close_http_client()
+        return asyncio.run(run()), skill.get_llm_http_metrics()["suggestions"]
+
+    def test_issues_are_packed_into_batches(self):
+        with StandInLLMServer() as server:
+            suggestions, stats = self._suggest(server, 20)
+            self.assertEqual(suggestions, ["模拟的AI建议"] * 20)
+            self.assertEqual(server.server.received, stats["batches"])
+            self.assertLess(stats["batches"], 20)
+            self.assertEqual(stats["batch_fallbacks"], 0)
+
+    def test_malformed_batch_falls_back_to_single_requests(self):
+        with StandInLLMServer(malformed_batches=True) as server:
+            suggestions, stats = self._suggest(server, 4)
+            self.assertEqual(suggestions, ["模拟的AI建议"] * 4)
+            self.assertEqual(stats["batch_fallbacks"], 4)
+            self.assertEqual(server.server.received, stats["batches"] + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import fnmatch
+import os
+import tempfile
+
+from skill import CdanalyzerAgentSkill
+from src.path_matcher import ExcludeMatcher, MatcherCache
+
+
+class ExcludeMatcherTest(unittest.TestCase):
+    def test_name_patterns_match_fnmatch(self):
+        patterns = [".git", "__pycache__", "*.gitignore", "*.min.js", "test_*.py", "*~", "[ab]*.c", "node_modules"]
+        matcher = ExcludeMatcher(patterns)
+        names = [".git", "git", "x.gitignore", "app.min.js", "app.js", "test_a.py", "a_test.py", "f~",
+                 "a1.c", "c1.c", "node_modules", "node_modules2"]
+        for name in names:
+            expected = any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+            self.assertEqual(matcher.excluded(name), expected, msg=name)
+
+    def test_gitignore_style_paths(self):
+        matcher = ExcludeMatcher(["build/**", "/dist", "docs/*.md", "**/generated/*.py", "logs/", "*.py", "!keep.py"])
+        # "build/**"只匹配目录下的内容，目录本身不被剪枝
+        self.assertFalse(matcher.excluded("build", "build", is_dir=True))
+        self.assertTrue(matcher.excluded("sub", "build/sub", is_dir=True))
+        self.assertTrue(matcher.excluded("a.c", "build/sub/a.c"))
+        self.assertFalse(matcher.excluded("keep.py", "build/keep.py"))
+        self.assertFalse(matcher.excluded("build", "src/build", is_dir=True))
+        self.assertTrue(matcher.excluded("dist", "dist", is_dir=True))
+        self.assertFalse(matcher.excluded("dist", "src/dist", is_dir=True))
+        self.assertTrue(matcher.excluded("a.md", "docs/a.md"))
+        self.assertFalse(matcher.excluded("a.md", "docs/sub/a.md"))
+        self.assertTrue(matcher.excluded("x.py", "a/b/generated/x.py"))
+        self.assertTrue(matcher.excluded("logs", "a/logs", is_dir=True))
+        self.assertFalse(matcher.excluded("logs", "a/logs", is_dir=False))
+        # 后出现的重新包含模式优先
+        self.assertTrue(matcher.excluded("main.py", "src/main.py"))
+        self.assertFalse(matcher.excluded("keep.py", "src/keep.py"))
+
+    def test_negation_under_excluded_directory_contents(self):
+        with tempfile.TemporaryDirectory() as project:
+            os.makedirs(os.path.join(project, "build", "sub"))
+            for rel in ["main.py", "build/keep.py", "build/out.py", "build/sub/keep.py"]:
+                with open(os.path.join(project, rel), "w", encoding="utf-8") as f:
+                    f.write("x = 1\n")
+
+            skill = CdanalyzerAgentSkill()
+            # 与git一致：build目录本身未被排除，其中的文件可以重新包含；被排除的子目录中的文件不能重新包含
+            for patterns in (["build/**", "!keep.py"], ["build/**", "!build/keep.py"]):
+                files, _ = skill._identify_target_files(project, patterns)
+                found = sorted(os.path.relpath(p, project).replace(os.sep, "/") for p in files)
+                self.assertEqual(found, ["build/keep.py", "main.py"], msg=patterns)
+
+    def test_nested_gitignore_is_applied(self):
+        with tempfile.TemporaryDirectory() as project:
+            os.makedirs(os.path.join(project, "pkg", "out"))
+            for rel in ["main.py", "gen.py", "pkg/a.py", "pkg/gen.py", "pkg/out/b.py", "pkg/keep.py"]:
+                with open(os.path.join(project, rel), "w", encoding="utf-8") as f:
+                    f.write("x = 1\n")
+            with open(os.path.join(project, ".gitignore"), "w", encoding="utf-8") as f:
+                f.write("# 注释\n/gen.py\nout/\n")
+            with open(os.path.join(project, "pkg", ".gitignore"), "w", encoding="utf-8") as f:
+                f.write("*.py\n!a.py\n")
+
+            skill = CdanalyzerAgentSkill()
+            files, _ = skill._identify_target_files(project, [], use_gitignore=True)
+            found = sorted(os.path.relpath(p, project).replace(os.sep, "/") for p in files)
+            self.assertEqual(found, ["main.py", "pkg/a.py"])
+
+            files, _ = skill._identify_target_files(project, [])
+            self.assertEqual(len(files), 6)
+
+    def test_matcher_cache_evicts_least_recently_used(self):
+        cache = MatcherCache(max_size=2)
+        first = cache.get(["*.pyc"])
+        self.assertIs(cache.get(("*.pyc",)), first)
+        cache.get(["build/"])
+        # 再次使用的模式列表保留，最久未使用的被淘汰
+        cache.get(["*.pyc"])
+        cache.get(["dist/"])
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get(["*.pyc"]), first)
+        self.assertTrue(cache.get(["*.pyc"]).excluded("a.pyc"))
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
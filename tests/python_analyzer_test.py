@@ -0,0 +1,85 @@
+import unittest
+import textwrap
+
+from src.code_metrics import compute_metrics
+from src.python_analyzer import analyze_python_source
+
+_SOURCE = textwrap.dedent('''
+    import os
+    import sys
+    from typing import List, Optional
+    import json  # noqa
+
+
+    def load(path, cache={}, items=list()):
+        unused = 1
+        _ignored = 2
+        total = 0
+        for item in items:
+            total += item
+        try:
+            return eval(open(path).read())
+        except:
+            return None
+
+
+    def branchy(x: Optional[int]) -> int:
+        if x and x > 1 or x == -1:
+            return 1
+        elif x == 2:
+            return 2
+        return [y for y in range(3) if y][0]
+
+
+    def outer():
+        value = sys.argv
+
+        def inner():
+            return value
+        return inner
+''')
+
+
+class PythonAnalyzerTest(unittest.TestCase):
+    def _findings(self, source, **kwargs):
+        return [(issue["type"], issue["line"], issue["severity"])
+                for issue in analyze_python_source(source.encode("utf-8"), "sample.py", **kwargs)]
+
+    def test_core_rules(self):
+        findings = self._findings(_SOURCE)
+        self.assertEqual(findings, [
+            ("unused-import", 2, "low"),
+            ("unused-import", 4, "low"),
+            ("mutable-default", 8, "medium"),
+            ("mutable-default", 8, "medium"),
+            ("unused-variable", 9, "low"),
+            ("eval-exec", 15, "high"),
+            ("bare-except", 16, "medium"),
+        ])
+
+    def test_complexity_threshold(self):
+        # branchy: 1 + if + elif + 2个布尔运算 + 推导式 + 推导式条件 = 7
+        findings = self._findings(_SOURCE, max_complexity=6)
+        self.assertIn(("too-complex", 20, "medium"), findings)
+        findings = self._findings(_SOURCE, max_complexity=3)
+        self.assertIn(("too-complex", 20, "high"), findings)
+
+    def test_complexity_matches_code_metrics(self):
+        # too-complex与代码度量使用同一份圈复杂度，传入已计算的函数列表时不再重新计算
+        source = _SOURCE.encode("utf-8")
+        functions = []
+        metrics = compute_metrics(source, "python", functions_out=functions)
+        self.assertEqual(metrics["max_complexity"], 7)
+        self.assertEqual([(f[0], f[1], f[3]) for f in functions if f[3] > 6], [("branchy", 20, 7)])
+        # 传入的函数列表被直接使用
+        functions = [["branchy", 20, 10, 7, 1], ["load", 8, 5, 13, 0]]
+        issues = analyze_python_source(source, "sample.py", 6, functions)
+        complex_issues = [(issue["line"], issue["severity"]) for issue in issues if issue["type"] == "too-complex"]
+        self.assertEqual(complex_issues, [(8, "high"), (20, "medium")])
+
+    def test_syntax_error(self):
+        self.assertEqual(self._findings("def broken(:\n    pass\n"), [("syntax-error", 1, "critical")])
+
+
+if __name__ == '__main__':
+    unittest.main()
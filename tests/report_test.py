@@ -0,0 +1,186 @@
+import unittest
+import asyncio
+import base64
+import itertools
+import os
+import re
+import tempfile
+
+from benchmark import build_synthetic_results
+from skill import CdanalyzerAgentSkill
+from src.html_virtual import decode_issue_data
+from src.pdf_layout import LazyFlowables, iter_issue_chunks, top_issues
+from src import report_resources
+
+
+class _ReportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.skill = CdanalyzerAgentSkill()
+        self.skill.use_llm_config = 1
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.results = build_synthetic_results(self.temp_dir.name, 200, file_count=20)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _generate(self, name, formats, **kwargs):
+        report_dir = os.path.join(self.temp_dir.name, name)
+        return asyncio.run(self.skill._generate_reports(self.results, report_dir, formats, "target", **kwargs))
+
+
+class ReportGenerationTest(_ReportTestCase):
+    def test_parallel_generation_matches_sequential(self):
+        sequential_paths, sequential = self._generate("sequential", ["html", "pdf", "txt"], parallel=False)
+        parallel_paths, parallel = self._generate("parallel", ["html", "pdf", "txt"], parallel=True)
+
+        self.assertEqual(set(parallel), {"html", "pdf", "txt", "total"})
+        self.assertEqual([os.path.splitext(p)[1] for p in parallel_paths], [".html", ".pdf", ".txt"])
+        for path in parallel_paths:
+            self.assertGreater(os.path.getsize(path), 0)
+
+        with open(sequential_paths[0], encoding="utf-8") as a, open(parallel_paths[0], encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_unknown_formats_are_skipped(self):
+        paths, timings = self._generate("single", ["txt", "docx"])
+        self.assertEqual(len(paths), 1)
+        self.assertEqual(set(timings), {"txt", "total"})
+
+
+class VirtualHtmlReportTest(_ReportTestCase):
+    def _html(self, name):
+        paths, _ = self._generate(name, ["html"])
+        with open(paths[0], encoding="utf-8") as f:
+            return paths[0], f.read()
+
+    def test_auto_mode_switches_on_threshold(self):
+        _, html = self._html("full")
+        self.assertIn("function sortTable", html)
+
+        self.skill.html_report_config["virtual_threshold"] = 100
+        _, html = self._html("virtual")
+        self.assertNotIn("function sortTable", html)
+        self.assertEqual(html.count("<tr class="), 0)
+
+        # 内嵌数据解码后可还原每个问题
+        payload = base64.b64decode(re.search(r'id="issueData">([^<]*)</script>', html).group(1))
+        data = decode_issue_data(payload)
+        self.assertEqual(data["count"], 200)
+        strings, columns = data["strings"], data["columns"]
+        for i, issue in enumerate(self.results["issues_found"]):
+            self.assertEqual(strings["file"][columns["file"][i]], issue["file"])
+            self.assertEqual(strings["message"][columns["message"][i]], issue["message"])
+            self.assertEqual(columns["line"][i], issue["line"])
+            self.assertEqual(data["severity_labels"][columns["severity"][i]],
+                             self.skill.risk_levels[issue["severity"]]["label"])
+        # 字符串表有序，编号可直接作为排序键
+        self.assertEqual(strings["file"], sorted(strings["file"]))
+
+    def test_sidecar_data_file(self):
+        self.skill.html_report_config.update({"mode": "virtual", "sidecar": True})
+        path, html = self._html("sidecar")
+        sidecar = os.path.splitext(path)[0] + ".issues.json.gz"
+        self.assertNotIn('id="issueData"', html)
+        self.assertIn(os.path.basename(sidecar), html)
+        with open(sidecar, "rb") as f:
+            self.assertEqual(decode_issue_data(f.read())["count"], 200)
+
+
+class PdfLayoutTest(_ReportTestCase):
+    def test_chunks_and_top_issues(self):
+        issues = list(self.results["issues_found"])
+        chunks = list(iter_issue_chunks(issues, 30))
+        self.assertEqual([len(chunk) for _, chunk in chunks], [30] * 6 + [20])
+        self.assertEqual([issue for _, chunk in chunks for issue in chunk], issues)
+
+        by_file = list(iter_issue_chunks(sorted(issues, key=lambda i: i["file"]), 30, group_by_file=True))
+        for file_path, chunk in by_file:
+            self.assertTrue(all(issue["file"] == file_path for issue in chunk))
+
+        weight = lambda issue: self.skill.risk_levels[issue["severity"]]["weight"]
+        top = top_issues(issues, 25, weight)
+        expected = sorted(issues, key=weight, reverse=True)[:25]
+        self.assertEqual(top, expected)
+
+    def test_lazy_flowables_are_consumed_in_order(self):
+        flowables = LazyFlowables(iter(range(10)), lookahead=3)
+        seen = []
+        while len(flowables):
+            self.assertLessEqual(list.__len__(flowables), 3)
+            seen.append(flowables[0])
+            del flowables[0]
+        self.assertEqual(seen, list(range(10)))
+
+    def test_pdf_flowables_are_not_shared(self):
+        from reportlab.platypus import Flowable
+        from src.report_resources import get_pdf_font
+
+        font_name = get_pdf_font(self.skill.pdf_report_config.get("font_path"))
+        pdf_styles = self.skill._get_pdf_styles(font_name)
+        self.assertIs(self.skill._get_pdf_styles(font_name), pdf_styles)
+        # 按字体缓存的只有样式对象，并行生成的多份PDF不会共用同一个flowable
+        self.assertFalse(any(isinstance(value, Flowable) for value in pdf_styles.values()))
+        chunk = list(itertools.islice(self.results["issues_found"], 5))
+        first = self.skill._build_pdf_issue_table(chunk, pdf_styles, font_name)
+        second = self.skill._build_pdf_issue_table(chunk, pdf_styles, font_name)
+        self.assertTrue(set(map(id, first._cellvalues[0])).isdisjoint(map(id, second._cellvalues[0])))
+
+        async def generate_concurrently():
+            report_dir = os.path.join(self.temp_dir.name, "concurrent")
+            os.makedirs(report_dir)
+            paths = [os.path.join(report_dir, f"report{i}.pdf") for i in range(4)]
+            await asyncio.gather(*(asyncio.to_thread(self.skill._generate_pdf_report, self.results, path, "target")
+                                   for path in paths))
+            return paths
+
+        for path in asyncio.run(generate_concurrently()):
+            with open(path, "rb") as f:
+                self.assertTrue(f.read().startswith(b"%PDF"))
+
+    def test_chunked_and_summary_pdf(self):
+        self.skill.pdf_report_config.update({"mode": "full", "chunk_rows": 40})
+        paths, _ = self._generate("full", ["pdf"])
+        with open(paths[0], "rb") as f:
+            full_pdf = f.read()
+        self.assertTrue(full_pdf.startswith(b"%PDF"))
+
+        self.skill.pdf_report_config.update({"mode": "auto", "max_issues": 100, "top_k": 10})
+        paths, _ = self._generate("summary", ["pdf"])
+        with open(paths[0], "rb") as f:
+            summary_pdf = f.read()
+        self.assertLess(len(summary_pdf), len(full_pdf))
+
+
+class ReportResourcesTest(unittest.TestCase):
+    def tearDown(self):
+        report_resources.reset_report_resources()
+
+    def test_font_is_resolved_once(self):
+        report_resources.reset_report_resources()
+        calls = []
+        original = report_resources.find_font_path
+        report_resources.find_font_path = lambda path=None: calls.append(path) or original(path)
+        try:
+            first = report_resources.get_pdf_font()
+            second = report_resources.get_pdf_font()
+        finally:
+            report_resources.find_font_path = original
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+
+    def test_explicit_font_path(self):
+        font_path = report_resources.find_font_path()
+        if font_path is None:
+            self.skipTest("没有可用的字体文件")
+        os.environ[report_resources.FONT_ENV_VAR] = font_path
+        try:
+            self.assertEqual(report_resources.find_font_path(), font_path)
+            self.assertIn(report_resources.get_pdf_font(), report_resources._registered_fonts.values())
+            # 不存在的显式路径回退到自动查找
+            self.assertEqual(report_resources.find_font_path("/nonexistent/font.ttf"), font_path)
+        finally:
+            del os.environ[report_resources.FONT_ENV_VAR]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import os
+import tempfile
+import textwrap
+
+from src.security_scanner import scan_blocks, scan_file, scan_source
+
+# 拼接构造示例密钥，避免源码本身被密钥扫描工具标记
+_AWS_KEY = "AKIA" + "IOSFODNN7EXAMPLE"
+_GITHUB_TOKEN = "ghp" + "_" + "a1B2" * 9
+
+_SOURCE = textwrap.dedent(f'''
+    import os
+    import subprocess
+
+    AWS_KEY = "{_AWS_KEY}"
+    password = "hunter2-secret"
+    token = os.environ["TOKEN"]
+
+
+    def find(cursor, name):
+        cursor.execute("SELECT * FROM users WHERE name = '" + name)
+        cursor.execute(f"DELETE FROM users WHERE id = {{name}}")
+        subprocess.run("ls " + name, shell=True)
+        return os.system("echo " + name)
+''')
+
+
+class SecurityScannerTest(unittest.TestCase):
+    def _findings(self, source, language="python", **kwargs):
+        return [(issue["type"], issue["line"], issue["message"].rsplit("(", 1)[1].rstrip(")"))
+                for issue in scan_blocks([source.encode("utf-8")], "sample", language, **kwargs)]
+
+    def test_python_rules_and_lines(self):
+        findings = self._findings(_SOURCE)
+        self.assertEqual(sorted(findings), [
+            ("security_vulnerability", 5, "aws-access-key"),
+            ("security_vulnerability", 6, "hardcoded-credential"),
+            ("security_vulnerability", 11, "sql-concatenation"),
+            ("security_vulnerability", 12, "sql-interpolation"),
+            ("security_vulnerability", 13, "shell-injection"),
+            ("security_vulnerability", 14, "shell-injection"),
+        ])
+
+    def test_language_specific_rules(self):
+        # f-string和os.system规则只适用于Python
+        self.assertEqual([rule for _, _, rule in self._findings(_SOURCE, "javascript")],
+                         ["aws-access-key", "hardcoded-credential", "sql-concatenation"])
+        self.assertEqual(self._findings('exec(`rm -rf ${dir}`);\n', "javascript"),
+                         [("security_vulnerability", 1, "shell-injection")])
+        self.assertEqual(self._findings('eval "$cmd"\n', "shell"),
+                         [("security_vulnerability", 1, "shell-injection")])
+
+    def test_prefixed_credential_names(self):
+        for line in ['DB_PASSWORD = "hunter2222"', 'GITHUB_TOKEN = "abcdef123456"', 'db_pass = "hunter2222"',
+                     'SECRET_KEY = "abcdef123456"', 'dbPassword: "hunter2222"', '"client_secret": "abcdef123456"']:
+            self.assertEqual(self._findings(line + "\n"), [("security_vulnerability", 1, "hardcoded-credential")],
+                             msg=line)
+        for line in ['bypass = "abcdefgh"', 'compass = "abcdefgh"', 'tokenizer = "abcdefgh"', 'PASSWORD_HASH = "abcdefgh"']:
+            self.assertEqual(self._findings(line + "\n"), [], msg=line)
+
+    def test_message_does_not_contain_secret(self):
+        issues = scan_blocks([f'token = "{_GITHUB_TOKEN}"\n'.encode("utf-8")], "sample", "ruby")
+        self.assertEqual(len(issues), 2)
+        for issue in issues:
+            self.assertNotIn(_GITHUB_TOKEN, issue["message"])
+            self.assertEqual(issue["severity"], "critical" if "github-token" in issue["message"] else "high")
+
+    def test_max_findings(self):
+        source = f'KEY = "{_AWS_KEY}"\n' * 50
+        self.assertEqual(len(self._findings(source, max_findings=10)), 10)
+
+    def test_chunked_file_matches_single_block(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(("x = 1\n" * 37 + _SOURCE) * 20)
+            expected = scan_blocks([open(path, "rb").read()], path, "python", max_findings=1000)
+            # 很小的块大小使密钥行跨越读取边界
+            self.assertEqual(scan_file(path, "python", max_findings=1000, chunk_size=64), expected)
+            self.assertEqual(len(expected), 120)
+
+            binary = os.path.join(tmp, "blob.py")
+            with open(binary, "wb") as f:
+                f.write(b"\0\1" + f'KEY = "{_AWS_KEY}"\n'.encode("utf-8"))
+            self.assertEqual(scan_file(binary, "python"), [])
+
+    def test_long_line_is_split_into_blocks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bundle.js")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("var a=1;" * 1000 + "\n" + f'var key = "{_AWS_KEY}";\n')
+            issues = scan_file(path, "javascript", chunk_size=64)
+            self.assertEqual([issue["line"] for issue in issues], [2])
+            self.assertEqual(issues, scan_source(open(path, "rb").read(), path, "javascript"))
+
+
+if __name__ == "__main__":
+    unittest.main()
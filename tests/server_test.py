@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from src.server import AnalysisServer, AnalysisService, load_input_schema, validate_inputs
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.temp_dir.name, "project")
+        os.makedirs(self.project)
+        for i in range(6):
+            with open(os.path.join(self.project, f"module_{i}.py"), "w", encoding="utf-8") as f:
+                f.write("import os\n" * (i + 1))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_validate_inputs(self):
+        schema = load_input_schema()
+        validate_inputs({"target_path": "/tmp", "report_format": ["html"], "parallel_workers": 2}, schema)
+        for inputs, message in [
+            ({}, "缺少必填参数"),
+            ({"target_path": "/tmp", "unknown": 1}, "未知参数"),
+            ({"target_path": 1}, "应为string"),
+            ({"target_path": "/tmp", "parallel_workers": True}, "应为number"),
+            ({"target_path": "/tmp", "report_format": ["doc"]}, "不在允许范围内"),
+            ([], "应为JSON对象"),
+        ]:
+            with self.assertRaisesRegex(ValueError, message):
+                validate_inputs(inputs, schema)
+
+    def test_concurrent_requests_are_isolated(self):
+        async def run():
+            service = AnalysisService(workers=2, max_jobs=1)
+            await service.start()
+            server = await AnalysisServer(service).start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            base = f"http://127.0.0.1:{port}"
+            try:
+                async with httpx.AsyncClient(timeout=60) as client:
+                    def analyze(report_dir, detect_clones):
+                        return client.post(f"{base}/analyze", json={
+                            "target_path": self.project, "report_format": [], "use_llm_config": 1,
+                            "report_path": os.path.join(self.temp_dir.name, report_dir), "detect_clones": detect_clones,
+                        })
+                    first, second = await asyncio.gather(analyze("a", True), analyze("b", False))
+                    invalid = await client.post(f"{base}/analyze", json={"report_format": ["doc"]})
+                    health = (await client.get(f"{base}/health")).json()
+                    missing = await client.get(f"{base}/missing")
+            finally:
+                server.close()
+                await server.wait_closed()
+                await service.close()
+            return first.json(), second.json(), invalid, health, missing
+
+        first, second, invalid, health, missing = asyncio.run(run())
+        for result in (first, second):
+            self.assertTrue(result["success"])
+            self.assertEqual(result["summary"]["total_files"], 6)
+        # 每个请求使用独立的配置
+        self.assertIn("clones", first["summary"])
+        self.assertNotIn("clones", second["summary"])
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual((health["workers"], health["completed"], health["running"], health["queued"]), (2, 2, 0, 0))
+        self.assertEqual(missing.status_code, 404)
+
+    def test_job_events_stream(self):
+        async def run():
+            service = AnalysisService(workers=1, max_jobs=1)
+            await service.start()
+            app = AnalysisServer(service)
+            server = await app.start("127.0.0.1", 0)
+            base = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            try:
+                async with httpx.AsyncClient(timeout=60) as client:
+                    submitted = await client.post(f"{base}/jobs", json={
+                        "target_path": self.project, "report_format": [], "use_llm_config": 1,
+                        "report_path": os.path.join(self.temp_dir.name, "reports"),
+                    })
+                    job_id = submitted.json()["job_id"]
+                    names = []
+                    async with client.stream("GET", f"{base}/jobs/{job_id}/events") as response:
+                        content_type = response.headers["content-type"]
+                        async for line in response.aiter_lines():
+                            if line.startswith("event: "):
+                                names.append(line[len("event: "):])
+                    status = (await client.get(f"{base}/jobs/{job_id}")).json()
+                    cancel_finished = await client.delete(f"{base}/jobs/{job_id}")
+                    unknown = await client.get(f"{base}/jobs/missing/events")
+            finally:
+                server.close()
+                await server.wait_closed()
+                await app.jobs.close()
+                await service.close()
+            return submitted, content_type, names, status, cancel_finished, unknown
+
+        submitted, content_type, names, status, cancel_finished, unknown = asyncio.run(run())
+        self.assertEqual(submitted.status_code, 202)
+        self.assertTrue(content_type.startswith("text/event-stream"))
+        self.assertEqual(names[-1], "done")
+        # 任务可能在订阅前就已结束，此时只收到done
+        self.assertLessEqual(set(names[:-1]), {"progress"})
+        self.assertEqual(status["state"], "succeeded")
+        self.assertEqual(status["result"]["summary"]["total_files"], 6)
+        self.assertEqual(cancel_finished.json()["state"], "succeeded")
+        self.assertEqual(unknown.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
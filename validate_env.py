@@ -8,8 +8,8 @@ import os
 
 def check_python_version():
     """检查Python版本"""
-    if sys.version_info < (3, 8):
-        print("错误: 需要Python 3.8或更高版本")
+    if sys.version_info < (3, 9):
+        print("错误: 需要Python 3.9或更高版本")
         return False
     print("✓ Python版本检查通过")
     return True